@@ -0,0 +1,118 @@
+"""
+Concurrent traversal of a storage addon's file tree through WaterButler.
+
+Folders are listed breadth first by a bounded pool of threads, so the listings of sibling
+folders are fetched at the same time while results are still handed out in a stable order.
+The workers share one rate limit, so a crawl sends no more requests to WaterButler than a
+sequential one would.
+The folders that have not been fully handed out yet are available as a checkpoint, from
+which a later crawl can resume.
+"""
+import collections
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from website import settings
+
+
+class FileTreeCrawler(object):
+    """Crawl the file tree of ``addon`` below ``filenode``.
+
+    :param addon: BaseStorageAddon instance
+    :param filenode: metadata of the folder to start from; defaults to the addon's root
+    :param checkpoint: a previous crawler's ``checkpoint``; the crawl resumes from it
+    instead of ``filenode``
+    """
+
+    def __init__(self, addon, filenode=None, user=None, cookie=None, version=None, checkpoint=None, max_workers=None):
+        self.addon = addon
+        self.user = user
+        self.version = version
+        if not cookie and user:
+            cookie = user.get_or_create_cookie().decode()
+        self.cookie = cookie
+        self.max_workers = max_workers or settings.FILE_TREE_CRAWLER_MAX_WORKERS
+        if checkpoint is not None:
+            self.root = None
+            self.pending = collections.deque(dict(folder) for folder in checkpoint)
+        else:
+            self.root = filenode or addon.root_filenode
+            self.pending = collections.deque([self.root] if self.root.get('kind') != 'file' else [])
+        # (folder, future) pairs in the order they are handed out
+        self.listing = collections.deque()
+        self.owner_guid = None
+        self._throttle_lock = threading.Lock()
+        self._next_request_at = 0
+
+    @property
+    def checkpoint(self):
+        """Folders that have not been fully handed out yet, with their children stripped.
+
+        Folders whose listing was being handed out when the crawl stopped are listed again
+        on resume, so every file is handed out at least once.
+        """
+        folders = [folder for folder, _ in self.listing] + list(self.pending)
+        return [
+            {key: value for key, value in folder.items() if key != 'children'}
+            for folder in folders
+        ]
+
+    def _throttle(self):
+        """Wait for the next of the ``FILE_TREE_CRAWLER_REQUESTS_PER_SECOND`` request slots
+        shared by all workers.
+        """
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request_at - now
+            self._next_request_at = max(now, self._next_request_at) + 1.0 / settings.FILE_TREE_CRAWLER_REQUESTS_PER_SECOND
+        if wait > 0:
+            time.sleep(wait)
+
+    def _list_folder(self, folder):
+        self._throttle()
+        return self.addon._get_fileobj_child_metadata(
+            folder, self.user, cookie=self.cookie, version=self.version, owner_guid=self.owner_guid
+        )
+
+    def walk(self):
+        """Yield ``(folder, children)`` for every folder of the tree, breadth first.
+
+        Up to ``max_workers`` folders are listed at once. The folders among ``children``
+        are only queued once the consumer moves past them, so the ``checkpoint`` taken
+        while handling a folder still includes it.
+        """
+        if not self.pending:
+            return
+        # Anything the listings need from the database is loaded here, not in the workers
+        self.addon.waterbutler_base_url
+        self.owner_guid = self.addon.owner._id
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while self.pending or self.listing:
+                while self.pending and len(self.listing) < self.max_workers:
+                    folder = self.pending.popleft()
+                    self.listing.append((folder, executor.submit(self._list_folder, folder)))
+                folder, future = self.listing[0]
+                children = future.result()
+                yield folder, children
+                self.listing.popleft()
+                self.pending.extend(child for child in children if child.get('kind') != 'file')
+
+    def iter_files(self):
+        """Yield the metadata of every file of the tree as the folders are listed."""
+        if self.root is not None and self.root.get('kind') == 'file':
+            yield self.root
+            return
+        for _, children in self.walk():
+            for child in children:
+                if child.get('kind') == 'file':
+                    yield child
+
+    def get_tree(self):
+        """Crawl the whole tree and return its root, with each folder's ``children`` filled in.
+        Not available when resuming from a checkpoint.
+        """
+        assert self.root is not None, 'Cannot build a tree from a checkpoint'
+        for folder, children in self.walk():
+            folder['children'] = children
+        return self.root
@@ -1,6 +1,5 @@
 import abc
 import os
-import time
 
 import markupsafe
 import requests
@@ -18,6 +17,7 @@ from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import NonNaiveDateTimeField
 from website import settings
 from addons.base import logger, serializer
+from addons.base.crawler import FileTreeCrawler
 from website.oauth.signals import oauth_complete
 
 lookup = TemplateLookup(
@@ -54,6 +54,14 @@ class BaseAddonSettings(ObjectIDMixin, BaseModel):
     def short_name(self):
         return self.config.short_name
 
+    def save(self, *args, **kwargs):
+        ret = super(BaseAddonSettings, self).save(*args, **kwargs)
+        # Keep the settings cached on a loaded owner current, see AddonModelMixin.get_addon
+        owner_descriptor = getattr(type(self), 'owner', None)
+        if owner_descriptor is not None and owner_descriptor.is_cached(self) and self.owner is not None:
+            self.owner._get_addon_settings_cache()[self._meta.app_config.short_name] = self
+        return ret
+
     def delete(self, save=True):
         self.is_deleted = True
         self.deleted = timezone.now()
@@ -564,7 +572,22 @@ class BaseStorageAddon(object):
             name = name + ': {folder}'.format(folder=folder_name)
         return name
 
-    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None):
+    @property
+    def root_filenode(self):
+        """Metadata of the root folder, as the start of a file tree traversal"""
+        return {
+            'path': '/',
+            'kind': 'folder',
+            'name': self.root_node.name,
+        }
+
+    @property
+    def waterbutler_base_url(self):
+        if getattr(self, '_waterbutler_base_url', None) is None:
+            self._waterbutler_base_url = self.owner.osfstorage_region.waterbutler_url
+        return self._waterbutler_base_url
+
+    def _get_fileobj_child_metadata(self, filenode, user, cookie=None, version=None, owner_guid=None):
         from api.base.utils import waterbutler_api_url_for
 
         kwargs = {}
@@ -576,13 +599,13 @@ class BaseStorageAddon(object):
             kwargs['cookie'] = user.get_or_create_cookie().decode()
 
         metadata_url = waterbutler_api_url_for(
-            self.owner._id,
+            owner_guid or self.owner._id,
             self.config.short_name,
             path=filenode.get('path', '/'),
             user=user,
             view_only=True,
             _internal=True,
-            base_url=self.owner.osfstorage_region.waterbutler_url,
+            base_url=self.waterbutler_base_url,
             **kwargs
         )
 
@@ -591,35 +614,35 @@ class BaseStorageAddon(object):
         if res.status_code != 200:
             raise HTTPError(res.status_code, data={'error': res.json()})
 
-        # TODO: better throttling?
-        time.sleep(1.0 / 5.0)
-
         data = res.json().get('data', None)
         if data:
             return [child['attributes'] for child in data]
         return []
 
+    def crawl_file_tree(self, filenode=None, user=None, cookie=None, version=None, checkpoint=None):
+        """
+        Return a FileTreeCrawler over the files below ``filenode``, listing sibling folders concurrently
+        """
+        return FileTreeCrawler(self, filenode=filenode, user=user, cookie=cookie, version=version, checkpoint=checkpoint)
+
     def _get_file_tree(self, filenode=None, user=None, cookie=None, version=None):
         """
-        Recursively get file metadata
+        Get file metadata, with the children of each folder under 'children'.
+
+        The tree is crawled once per instance, so archiving, stat collection and file maps of the
+        same addon share one traversal.
         """
-        filenode = filenode or {
-            'path': '/',
-            'kind': 'folder',
-            'name': self.root_node.name,
-        }
+        filenode = filenode or self.root_filenode
         if filenode.get('kind') == 'file':
             return filenode
 
-        kwargs = {
-            'version': version,
-            'cookie': cookie,
-        }
-        filenode['children'] = [
-            self._get_file_tree(child, user, cookie=cookie)
-            for child in self._get_fileobj_child_metadata(filenode, user, **kwargs)
-        ]
-        return filenode
+        if not hasattr(self, '_file_tree_cache'):
+            self._file_tree_cache = {}
+        key = (filenode.get('path', '/'), version)
+        if key not in self._file_tree_cache:
+            crawler = self.crawl_file_tree(filenode, user=user, cookie=cookie, version=version)
+            self._file_tree_cache[key] = crawler.get_tree()
+        return self._file_tree_cache[key]
 
 
 class BaseOAuthNodeSettings(BaseNodeSettings):
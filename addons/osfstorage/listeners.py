@@ -23,6 +23,7 @@ def checkin_files_task(node_id, user_id):
         Preprint = apps.get_model('osf.Preprint')
         Guid = apps.get_model('osf.Guid')
         OSFUser = apps.get_model('osf.OSFUser')
+        OsfStorageFolder = apps.get_model('osf.OsfStorageFolder')
 
         node = Guid.load(node_id).referent
         assert isinstance(node, (AbstractNode, Preprint))
@@ -31,7 +32,9 @@ def checkin_files_task(node_id, user_id):
         # If user doesn't have any permissions through their OSF group or through contributorship,
         # check their files back in
         if not node.is_contributor_or_group_member(user):
-            node.files.filter(checkout=user).update(checkout=None)
+            checked_out = node.files.filter(checkout=user)
+            OsfStorageFolder.update_checkout_counts(list(checked_out.values_list('parent_id', flat=True)), -1)
+            checked_out.update(checkout=None)
 
 
 @node_deleted.connect
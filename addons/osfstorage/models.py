@@ -33,6 +33,17 @@ logger = logging.getLogger(__name__)
 
 class OsfStorageFolderManager(BaseFileNodeManager):
 
+    def get_folders_with_checkouts(self, folder_ids):
+        """Folders among ``folder_ids`` that are checked out or contain a checked-out file,
+        in one query. Folders whose count has never been computed are counted first.
+        """
+        for folder in self.filter(id__in=folder_ids, checked_out_descendant_count__isnull=True):
+            count = folder.compute_checked_out_descendant_count()
+            self.filter(id=folder.id, checked_out_descendant_count__isnull=True).update(checked_out_descendant_count=count)
+        return self.filter(id__in=folder_ids).filter(
+            models.Q(checkout__isnull=False) | models.Q(checked_out_descendant_count__gt=0)
+        )
+
     def get_root(self, target):
         # Get the root folder that the target file belongs to
         content_type = ContentType.objects.get_for_model(target)
@@ -44,6 +55,14 @@ class OsfStorageFileNode(BaseFileNode):
 
     @property
     def materialized_path(self):
+        """The stored path, which is kept up to date on save and when a folder moves.
+        Rows that have not been backfilled fall back to computing it from the parent chain.
+        """
+        if self._materialized_path:
+            return self._materialized_path
+        return self.compute_materialized_path_from_db()
+
+    def compute_materialized_path_from_db(self):
         sql = """
             WITH RECURSIVE materialized_path_cte(parent_id, GEN_PATH) AS (
               SELECT
@@ -225,10 +244,61 @@ class OsfStorageFileNode(BaseFileNode):
             if save:
                 self.save()
 
+    def build_materialized_path(self):
+        suffix = '' if self.is_file else '/'
+        if self.parent is None:
+            return self.name + suffix
+        return self.parent.materialized_path + self.name + suffix
+
+    def clean_fields(self, exclude=None):
+        # Validating a deferred field would load it only for save() to leave it out again
+        exclude = set(exclude or []) | self.get_deferred_fields()
+        return super(OsfStorageFileNode, self).clean_fields(exclude=exclude)
+
     def save(self):
         self._path = ''
-        self._materialized_path = ''
-        return super(OsfStorageFileNode, self).save()
+        # Compare against the stored row rather than the loaded one, as instances loaded through
+        # BaseFileNode or a guid never went through this class when they were read
+        stored = None
+        if self.pk is not None:
+            stored = BaseFileNode.objects.filter(pk=self.pk).values_list(
+                'parent_id', 'name', 'checkout_id', '_materialized_path'
+            ).first()
+        adding = stored is None
+        if adding:
+            # Children add themselves to the count as they are saved
+            self.checked_out_descendant_count = None if self.is_file else 0
+            old_parent_id = old_name = old_checkout_id = old_path = None
+        else:
+            old_parent_id, old_name, old_checkout_id, old_path = stored
+        was_checked_out = old_checkout_id is not None
+        path_changed = False
+        # The count is only ever written with relative updates
+        excluded = {'checked_out_descendant_count'} | self.get_deferred_fields()
+        if adding or not old_path or (old_parent_id, old_name) != (self.parent_id, self.name):
+            materialized_path = self.build_materialized_path()
+            path_changed = not adding and materialized_path != old_path
+            self._materialized_path = materialized_path
+        else:
+            # A folder above may have moved since this was loaded, so keep the stored path
+            self._materialized_path = old_path
+            excluded.add('_materialized_path')
+        update_fields = None
+        if not adding:
+            update_fields = [
+                field.attname for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in excluded
+            ]
+        ret = super(OsfStorageFileNode, self).save(update_fields=update_fields)
+        if path_changed and not self.is_file:
+            # Renamed or moved folder, so everything below it moved too
+            self.update_descendant_paths()
+        is_checked_out = self.checkout_id is not None
+        if was_checked_out and (not is_checked_out or old_parent_id != self.parent_id):
+            OsfStorageFolder.update_checkout_counts([old_parent_id], -1)
+        if is_checked_out and (not was_checked_out or old_parent_id != self.parent_id):
+            OsfStorageFolder.update_checkout_counts([self.parent_id], 1)
+        return ret
 
 
 class OsfStorageFile(OsfStorageFileNode, File):
@@ -412,41 +482,75 @@ class OsfStorageFile(OsfStorageFileNode, File):
 class OsfStorageFolder(OsfStorageFileNode, Folder):
 
     is_root = models.BooleanField(null=True, blank=True)
+    checked_out_descendant_count = models.PositiveIntegerField(null=True, blank=True)
 
     objects = OsfStorageFolderManager()
 
     @property
     def is_checked_out(self):
+        """Whether this folder or anything below it is checked out. Read from the database on
+        every call, since the count is maintained with relative updates.
+        """
+        if self.pk is None:
+            return False
+        return OsfStorageFolder.objects.get_folders_with_checkouts([self.pk]).exists()
+
+    def compute_checked_out_descendant_count(self):
         sql = """
-            WITH RECURSIVE is_checked_out_cte(id, parent_id, checkout_id) AS (
+            WITH RECURSIVE descendants_cte(id, checkout_id) AS (
               SELECT
                 T.id,
-                T.parent_id,
                 T.checkout_id
               FROM %s AS T
-              WHERE T.id = %s
+              WHERE T.parent_id = %s
               UNION ALL
               SELECT
                 T.id,
-                T.parent_id,
                 T.checkout_id
-              FROM is_checked_out_cte AS R
+              FROM descendants_cte AS R
                 JOIN %s AS T ON T.parent_id = R.id
             )
-            SELECT N.checkout_id
-            FROM is_checked_out_cte as N
-            WHERE N.checkout_id IS NOT NULL
-            LIMIT 1;
+            SELECT COUNT(*)
+            FROM descendants_cte AS N
+            WHERE N.checkout_id IS NOT NULL;
         """
-
         with connection.cursor() as cursor:
             cursor.execute(sql, [AsIs(self._meta.db_table), self.pk, AsIs(self._meta.db_table)])
-            row = cursor.fetchone()
+            return cursor.fetchone()[0]
 
-            if row and row[0]:
-                return True
-
-        return False
+    @classmethod
+    def update_checkout_counts(cls, parent_ids, delta):
+        """Add ``delta`` to the checked-out descendant count of each folder in ``parent_ids``
+        and of every folder above it, once per occurrence in ``parent_ids``. Counts that were
+        never computed stay NULL.
+        """
+        parent_ids = [parent_id for parent_id in parent_ids if parent_id is not None]
+        if not parent_ids:
+            return
+        sql = """
+            WITH RECURSIVE ancestors_cte(id, parent_id) AS (
+              SELECT
+                T.id,
+                T.parent_id
+              FROM %s AS T
+                JOIN unnest(%s) AS P(id) ON T.id = P.id
+              UNION ALL
+              SELECT
+                T.id,
+                T.parent_id
+              FROM ancestors_cte AS R
+                JOIN %s AS T ON T.id = R.parent_id
+            )
+            UPDATE %s AS T
+            SET checked_out_descendant_count = GREATEST(T.checked_out_descendant_count + %s * A.occurrences, 0)
+            FROM (
+              SELECT id, COUNT(*) AS occurrences FROM ancestors_cte GROUP BY id
+            ) AS A
+            WHERE T.id = A.id;
+        """
+        table = AsIs(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table, parent_ids, table, table, delta])
 
     @property
     def is_preprint_primary(self):
@@ -457,6 +561,42 @@ class OsfStorageFolder(OsfStorageFileNode, Folder):
                         return True
         return False
 
+    def update_descendant_paths(self):
+        """Rewrite the stored materialized path of every file and folder below this one
+        with a single statement, starting from this folder's own stored path.
+        """
+        sql = """
+            WITH RECURSIVE descendants_cte(id, gen_path) AS (
+              SELECT
+                T.id,
+                (%s || T.name || CASE WHEN T.type = %s THEN '/' ELSE '' END) AS gen_path
+              FROM %s AS T
+              WHERE T.parent_id = %s
+                AND T.type IN (%s, %s)
+              UNION ALL
+              SELECT
+                T.id,
+                (R.gen_path || T.name || CASE WHEN T.type = %s THEN '/' ELSE '' END) AS gen_path
+              FROM descendants_cte AS R
+                JOIN %s AS T ON T.parent_id = R.id
+              WHERE T.type IN (%s, %s)
+            )
+            UPDATE %s AS T
+            SET _materialized_path = D.gen_path
+            FROM descendants_cte AS D
+            WHERE T.id = D.id;
+        """
+        folder_type = OsfStorageFolder._typedmodels_type
+        file_type = OsfStorageFile._typedmodels_type
+        table = AsIs(self._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [
+                self.materialized_path, folder_type, table, self.pk, folder_type, file_type,
+                folder_type, table, folder_type, file_type,
+                table,
+            ])
+            return cursor.rowcount
+
     def serialize(self, include_full=False, version=None):
         # Versions just for compatibility
         ret = super(OsfStorageFolder, self).serialize()
@@ -37,3 +37,6 @@ MAX_UPLOAD_SIZE = 5 * 1024  # 5 GB
 
 # Max file size permitted by frontend in megabytes for verified users
 HIGH_MAX_UPLOAD_SIZE = 5 * 1024  # 5 GB
+
+# Largest page of children returned by a paginated osfstorage_get_children listing
+MAX_CHILDREN_PAGE_SIZE = 1000
@@ -5,6 +5,8 @@ import unittest
 
 import pytest
 import pytz
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 from nose.tools import *  # noqa
 
@@ -305,6 +307,61 @@ class TestOsfstorageFileNode(StorageTestCase):
         child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
         assert_equals('/Cloud/Carp', child.materialized_path)
 
+    def test_materialized_path_is_stored(self):
+        child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
+        stored = OsfStorageFileNode.objects.filter(id=child.id).values_list('_materialized_path', flat=True)[0]
+        assert_equals('/Cloud/Carp', stored)
+
+    def test_materialized_path_not_stored(self):
+        child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
+        OsfStorageFileNode.objects.filter(id=child.id).update(_materialized_path='')
+        child.reload()
+        assert_equals('/Cloud/Carp', child.materialized_path)
+
+    def test_materialized_path_updated_on_folder_move(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        nested = folder.append_folder('Carp')
+        child = nested.append_file('A dee um')
+        move_to = root.append_folder('Sky')
+
+        folder.move_under(move_to, name='Storm')
+
+        for file_node, expected in ((folder, '/Sky/Storm/'), (nested, '/Sky/Storm/Carp/'), (child, '/Sky/Storm/Carp/A dee um')):
+            file_node.reload()
+            assert_equals(expected, file_node.materialized_path)
+            assert_equals(expected, file_node.compute_materialized_path_from_db())
+
+    def test_save_keeps_path_of_moved_folder_descendant(self):
+        root = self.node_settings.get_root()
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        stale = OsfStorageFileNode.objects.get(id=child.id)
+        assert_equals('/Cloud/Carp', stale.materialized_path)
+
+        folder.move_under(root.append_folder('Sky'))
+        with CaptureQueriesContext(connection) as ctx:
+            stale.save(skip_search=True)
+
+        stored = OsfStorageFileNode.objects.filter(id=child.id).values_list('_materialized_path', flat=True)[0]
+        assert_equals('/Sky/Cloud/Carp', stored)
+        assert_equals('/Sky/Cloud/Carp', stale.materialized_path)
+        updates = [query['sql'] for query in ctx.captured_queries if query['sql'].startswith('UPDATE')]
+        assert_equals(len(updates), 1)
+        assert_not_in('_materialized_path', updates[0])
+
+    def test_save_does_not_load_deferred_path(self):
+        child = self.node_settings.get_root().append_folder('Cloud').append_file('Carp')
+        loaded = OsfStorageFileNode.objects.get(id=child.id)
+        deferred = OsfStorageFileNode.objects.defer('_materialized_path').get(id=child.id)
+
+        with CaptureQueriesContext(connection) as loaded_ctx:
+            loaded.save(skip_search=True)
+        with CaptureQueriesContext(connection) as deferred_ctx:
+            deferred.save(skip_search=True)
+        assert_equals(len(deferred_ctx.captured_queries), len(loaded_ctx.captured_queries))
+        assert_in('_materialized_path', deferred.get_deferred_fields())
+
     def test_copy(self):
         to_copy = self.node_settings.get_root().append_file('Carp')
         copy_to = self.node_settings.get_root().append_folder('Cloud')
@@ -982,6 +1039,69 @@ class TestOsfStorageCheckout(StorageTestCase):
         with assert_raises(FileNodeCheckedOutError):
             folder.delete()
 
+    def test_checked_out_descendant_count(self):
+        folder = self.root_node.append_folder('folder')
+        subfolder = folder.append_folder('subfolder')
+        file = subfolder.append_file('file')
+
+        def counts():
+            return dict(OsfStorageFolder.objects.filter(
+                id__in=[self.root_node.id, folder.id, subfolder.id]
+            ).values_list('id', 'checked_out_descendant_count'))
+
+        assert_false(folder.is_checked_out)
+        file.check_in_or_out(self.user, self.user, save=True)
+        self.file.check_in_or_out(self.user, self.user, save=True)
+        assert_equal(counts(), {self.root_node.id: 2, folder.id: 1, subfolder.id: 1})
+        assert_true(folder.is_checked_out)
+
+        file.check_in_or_out(self.user, None, save=True)
+        assert_equal(counts(), {self.root_node.id: 1, folder.id: 0, subfolder.id: 0})
+        assert_false(folder.is_checked_out)
+        assert_true(self.root_node.is_checked_out)
+
+    def test_checked_out_descendant_count_loaded_through_base_class(self):
+        folder = self.root_node.append_folder('folder')
+        file = folder.append_file('file')
+
+        def counts():
+            return dict(OsfStorageFolder.objects.filter(
+                id__in=[self.root_node.id, folder.id]
+            ).values_list('id', 'checked_out_descendant_count'))
+
+        for _ in range(2):
+            BaseFileNode.load(file._id).check_in_or_out(self.user, self.user, save=True)
+            assert_equal(counts(), {self.root_node.id: 1, folder.id: 1})
+            BaseFileNode.load(file._id).check_in_or_out(self.user, None, save=True)
+            assert_equal(counts(), {self.root_node.id: 0, folder.id: 0})
+        assert_false(folder.is_checked_out)
+
+    def test_save_does_not_write_checked_out_descendant_count(self):
+        folder = self.root_node.append_folder('folder')
+        stale = BaseFileNode.load(folder._id)
+        folder.append_file('file').check_in_or_out(self.user, self.user, save=True)
+
+        stale.name = 'renamed'
+        stale.save()
+        assert_equal(OsfStorageFolder.objects.get(id=folder.id).checked_out_descendant_count, 1)
+
+    def test_checked_out_descendant_count_not_computed(self):
+        folder = self.root_node.append_folder('folder')
+        folder.append_file('file').check_in_or_out(self.user, self.user, save=True)
+        OsfStorageFolder.objects.filter(id=folder.id).update(checked_out_descendant_count=None)
+
+        assert_true(folder.is_checked_out)
+        assert_equal(OsfStorageFolder.objects.get(id=folder.id).checked_out_descendant_count, 1)
+
+    def test_get_folders_with_checkouts(self):
+        checked_out = self.root_node.append_folder('checked out')
+        checked_out.append_file('file').check_in_or_out(self.user, self.user, save=True)
+        empty = self.root_node.append_folder('empty')
+        empty.append_file('file')
+
+        folders = OsfStorageFolder.objects.get_folders_with_checkouts([checked_out.id, empty.id])
+        assert_equal(list(folders), [checked_out])
+
     def test_move_checked_out_file(self):
         self.file.check_in_or_out(self.user, self.user, save=True)
         self.file.reload()
@@ -177,6 +177,54 @@ class TestGetMetadataHook(HookTestCase):
         assert_equal(res_date_modified, expected_date_modified)
         assert_equal(res_date_created, expected_date_created)
 
+    def test_children_paginated(self):
+        root = self.node_settings.get_root()
+        names = ['a.txt', 'b.txt', 'c', 'd.txt', 'e.txt']
+        for name in names:
+            if name == 'c':
+                root.append_folder(name)
+            else:
+                root.append_file(name)
+
+        seen = []
+        cursor = None
+        for _ in range(3):
+            view_kwargs = {'fid': root._id, 'user_id': self.user._id, 'page_size': 2}
+            if cursor:
+                view_kwargs['cursor'] = cursor
+            res = self.send_hook('osfstorage_get_children', view_kwargs, {}, self.node)
+            seen.extend(child['name'] for child in res.json['data'])
+            cursor = res.json['next']
+        assert_equal(seen, names)
+        assert_is_none(cursor)
+
+    def test_children_fields(self):
+        root = self.node_settings.get_root()
+        root.append_file('a.txt')
+        res = self.send_hook(
+            'osfstorage_get_children',
+            {'fid': root._id, 'user_id': self.user._id, 'fields': 'checkout'},
+            {},
+            self.node
+        )
+        res_data = res.json[0]
+        assert_in('checkout', res_data)
+        assert_in('size', res_data)
+        assert_not_in('downloads', res_data)
+        assert_not_in('latestVersionSeen', res_data)
+
+    def test_children_invalid_params(self):
+        root = self.node_settings.get_root()
+        for view_kwargs in ({'fields': 'nope'}, {'page_size': 0}, {'page_size': 2, 'cursor': 'nope'}):
+            res = self.send_hook(
+                'osfstorage_get_children',
+                dict(view_kwargs, fid=root._id, user_id=self.user._id),
+                {},
+                self.node,
+                expect_errors=True,
+            )
+            assert_equal(res.status_code, 400)
+
     def test_osf_storage_root(self):
         auth = Auth(self.project.creator)
         result = osf_storage_root(self.node_settings.config, self.node_settings, auth)
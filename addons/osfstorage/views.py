@@ -1,6 +1,8 @@
 from __future__ import unicode_literals
 
 from rest_framework import status as http_status
+import base64
+import json
 import logging
 
 from django.core.exceptions import ValidationError
@@ -8,7 +10,7 @@ from django.db import IntegrityError
 from django.db import connection
 from django.db import transaction
 
-from flask import request
+from flask import request, Response, stream_with_context
 
 from framework.auth import Auth
 from framework.sessions import get_session
@@ -186,112 +188,233 @@ def osfstorage_get_metadata(file_node, **kwargs):
     return file_node.serialize(version=version, include_full=True)
 
 
+# Read the documentation on FileVersion's fields before reading this code
+CHILD_LATEST_VERSION_JOIN = """
+    LEFT JOIN LATERAL (
+        SELECT * FROM osf_fileversion
+        JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+        WHERE osf_basefileversionsthrough.basefilenode_id = F.id
+        ORDER BY created DESC
+        LIMIT 1
+    ) LATEST_VERSION ON TRUE
+"""
+
+# Properties of file children that need their own subquery or lateral join, and so can be
+# left out of a listing with the `fields` query parameter
+CHILD_OPTIONAL_JOINS = {
+    'created': """
+        LEFT JOIN LATERAL (
+            SELECT * FROM osf_fileversion
+            JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+            WHERE osf_basefileversionsthrough.basefilenode_id = F.id
+            ORDER BY created ASC
+            LIMIT 1
+        ) EARLIEST_VERSION ON TRUE
+    """,
+    'checkout': """
+        LEFT JOIN LATERAL (
+            SELECT _id from osf_guid
+            WHERE object_id = F.checkout_id
+            AND content_type_id = %(user_content_type_id)s
+            LIMIT 1
+        ) CHECKOUT_GUID ON TRUE
+    """,
+    'downloads': """
+        LEFT JOIN LATERAL (
+            SELECT P.total AS DOWNLOAD_COUNT FROM osf_pagecounter AS P
+            WHERE P.resource_id = %(target_guid_id)s
+            AND P.file_id = F.id
+            AND P.action = 'download'
+            AND P.version ISNULL
+            LIMIT 1
+        ) DOWNLOAD_COUNT ON TRUE
+    """,
+    'version': '',
+    'latestVersionSeen': """
+        LEFT JOIN LATERAL (
+          SELECT EXISTS(
+            SELECT (1) FROM osf_fileversionusermetadata
+              INNER JOIN osf_fileversion ON osf_fileversionusermetadata.file_version_id = osf_fileversion.id
+              INNER JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
+              WHERE osf_fileversionusermetadata.user_id = %(user_pk)s
+              AND osf_basefileversionsthrough.basefilenode_id = F.id
+            LIMIT 1
+          )
+        ) SEEN_FILE ON TRUE
+        LEFT JOIN LATERAL (
+            SELECT CASE WHEN SEEN_FILE.exists
+            THEN
+                CASE WHEN EXISTS(
+                  SELECT (1) FROM osf_fileversionusermetadata
+                  WHERE osf_fileversionusermetadata.file_version_id = LATEST_VERSION.fileversion_id
+                  AND osf_fileversionusermetadata.user_id = %(user_pk)s
+                  LIMIT 1
+                )
+                THEN
+                  json_build_object('user', %(user_id)s, 'seen', TRUE)
+                ELSE
+                  json_build_object('user', %(user_id)s, 'seen', FALSE)
+                END
+            ELSE
+              NULL
+            END
+        ) SEEN_LATEST_VERSION ON TRUE
+    """,
+}
+
+# (key, SQL value) of every property of a file child, in the order they are serialized
+CHILD_FILE_PROPERTIES = (
+    ('id', 'F._id'),
+    ('path', "'/' || F._id"),
+    ('name', 'F.name'),
+    ('kind', "'file'"),
+    ('size', 'LATEST_VERSION.size'),
+    ('downloads', 'COALESCE(DOWNLOAD_COUNT, 0)'),
+    ('version', '(SELECT COUNT(*) FROM osf_basefileversionsthrough WHERE osf_basefileversionsthrough.basefilenode_id = F.id)'),
+    ('contentType', 'LATEST_VERSION.content_type'),
+    ('modified', 'LATEST_VERSION.created'),
+    ('created', 'EARLIEST_VERSION.created'),
+    ('checkout', 'CHECKOUT_GUID'),
+    ('md5', "LATEST_VERSION.metadata ->> 'md5'"),
+    ('sha256', "LATEST_VERSION.metadata ->> 'sha256'"),
+    ('latestVersionSeen', 'SEEN_LATEST_VERSION.case'),
+)
+
+
+def build_children_query(fields=None):
+    """Return the SELECT expression serializing one child of folder F, and the joins it needs.
+
+    :param set fields: Optional properties of file children to include, or None for all of them
+    """
+    if fields is None:
+        fields = set(CHILD_OPTIONAL_JOINS)
+    file_properties = '\n, '.join(
+        "'{}', {}".format(key, value)
+        for key, value in CHILD_FILE_PROPERTIES
+        if key not in CHILD_OPTIONAL_JOINS or key in fields
+    )
+    child = """
+        CASE
+        WHEN F.type = 'osf.osfstoragefile' THEN
+            json_build_object(
+                {}
+            )
+        ELSE
+            json_build_object(
+                'id', F._id
+                , 'path', '/' || F._id || '/'
+                , 'name', F.name
+                , 'kind', 'folder'
+            )
+        END
+    """.format(file_properties)
+    joins = CHILD_LATEST_VERSION_JOIN + ''.join(
+        join for key, join in CHILD_OPTIONAL_JOINS.items() if key in fields
+    )
+    return child, joins
+
+
+def get_children_query_params(file_node):
+    from django.contrib.contenttypes.models import ContentType
+    user_id = request.args.get('user_id')
+    return {
+        'user_content_type_id': ContentType.objects.get_for_model(OSFUser).id,
+        'target_guid_id': file_node.target.guids.first().id,
+        'user_pk': OSFUser.objects.filter(guids___id=user_id, guids___id__isnull=False).values_list('pk', flat=True).first(),
+        'user_id': user_id,
+        'parent_id': file_node.id,
+    }
+
+
+def encode_children_cursor(name, pk):
+    return base64.urlsafe_b64encode(json.dumps([name, pk]).encode('utf-8')).decode('ascii')
+
+
+def decode_children_cursor(cursor):
+    try:
+        name, pk = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return name, int(pk)
+    except (TypeError, ValueError, UnicodeError):
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST, data={
+            'message_long': 'Invalid cursor.'
+        })
+
+
 @must_be_signed
 @decorators.autoload_filenode(must_be='folder')
 def osfstorage_get_children(file_node, **kwargs):
-    from django.contrib.contenttypes.models import ContentType
-    user_id = request.args.get('user_id')
-    user_content_type_id = ContentType.objects.get_for_model(OSFUser).id
-    user_pk = OSFUser.objects.filter(guids___id=user_id, guids___id__isnull=False).values_list('pk', flat=True).first()
+    """List the children of a folder.
+
+    Without a ``page_size`` query parameter, returns every child in a single JSON array. With
+    one, streams a page of children ordered by name, as ``{"data": [...], "next": cursor}``;
+    pass ``cursor`` back to get the next page. ``fields``, a comma separated list of
+    optional properties of file children, leaves out the ones that are not needed.
+    """
+    fields = request.args.get('fields')
+    if fields is not None:
+        fields = set(field for field in fields.split(',') if field)
+        invalid = fields.difference(CHILD_OPTIONAL_JOINS)
+        if invalid:
+            raise HTTPError(http_status.HTTP_400_BAD_REQUEST, data={
+                'message_long': 'Invalid fields: {}.'.format(', '.join(sorted(invalid)))
+            })
+    child, joins = build_children_query(fields)
+    params = get_children_query_params(file_node)
+
+    page_size = request.args.get('page_size')
+    if page_size is None:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT json_agg({child})
+                FROM osf_basefilenode AS F
+                {joins}
+                WHERE parent_id = %(parent_id)s
+                AND (NOT F.type IN ('osf.trashedfilenode', 'osf.trashedfile', 'osf.trashedfolder'))
+            """.format(child=child, joins=joins), params)
+            return cursor.fetchone()[0] or []
+
+    try:
+        page_size = min(int(page_size), osf_storage_settings.MAX_CHILDREN_PAGE_SIZE)
+        if page_size < 1:
+            raise ValueError
+    except ValueError:
+        raise HTTPError(http_status.HTTP_400_BAD_REQUEST, data={
+            'message_long': 'page_size must be a positive integer.'
+        })
+    keyset = ''
+    cursor_param = request.args.get('cursor')
+    if cursor_param:
+        params['after_name'], params['after_id'] = decode_children_cursor(cursor_param)
+        keyset = 'AND (F.name, F.id) > (%(after_name)s, %(after_id)s)'
+    params['limit'] = page_size + 1
+    sql = """
+        SELECT {child}::text, F.name, F.id
+        FROM osf_basefilenode AS F
+        {joins}
+        WHERE parent_id = %(parent_id)s
+        AND (NOT F.type IN ('osf.trashedfilenode', 'osf.trashedfile', 'osf.trashedfolder'))
+        {keyset}
+        ORDER BY F.name, F.id
+        LIMIT %(limit)s
+    """.format(child=child, joins=joins, keyset=keyset)
+
+    # The page is read before returning so the database is not used after the request ends;
+    # serializing it is streamed
     with connection.cursor() as cursor:
-        # Read the documentation on FileVersion's fields before reading this code
-        cursor.execute("""
-            SELECT json_agg(CASE
-                WHEN F.type = 'osf.osfstoragefile' THEN
-                    json_build_object(
-                        'id', F._id
-                        , 'path', '/' || F._id
-                        , 'name', F.name
-                        , 'kind', 'file'
-                        , 'size', LATEST_VERSION.size
-                        , 'downloads',  COALESCE(DOWNLOAD_COUNT, 0)
-                        , 'version', (SELECT COUNT(*) FROM osf_basefileversionsthrough WHERE osf_basefileversionsthrough.basefilenode_id = F.id)
-                        , 'contentType', LATEST_VERSION.content_type
-                        , 'modified', LATEST_VERSION.created
-                        , 'created', EARLIEST_VERSION.created
-                        , 'checkout', CHECKOUT_GUID
-                        , 'md5', LATEST_VERSION.metadata ->> 'md5'
-                        , 'sha256', LATEST_VERSION.metadata ->> 'sha256'
-                        , 'latestVersionSeen', SEEN_LATEST_VERSION.case
-                    )
-                ELSE
-                    json_build_object(
-                        'id', F._id
-                        , 'path', '/' || F._id || '/'
-                        , 'name', F.name
-                        , 'kind', 'folder'
-                    )
-                END
-            )
-            FROM osf_basefilenode AS F
-            LEFT JOIN LATERAL (
-                SELECT * FROM osf_fileversion
-                JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                WHERE osf_basefileversionsthrough.basefilenode_id = F.id
-                ORDER BY created DESC
-                LIMIT 1
-            ) LATEST_VERSION ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT * FROM osf_fileversion
-                JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                WHERE osf_basefileversionsthrough.basefilenode_id = F.id
-                ORDER BY created ASC
-                LIMIT 1
-            ) EARLIEST_VERSION ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT _id from osf_guid
-                WHERE object_id = F.checkout_id
-                AND content_type_id = %s
-                LIMIT 1
-            ) CHECKOUT_GUID ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT P.total AS DOWNLOAD_COUNT FROM osf_pagecounter AS P
-                WHERE P.resource_id = %s
-                AND P.file_id = F.id
-                AND P.action = 'download'
-                AND P.version ISNULL
-                LIMIT 1
-            ) DOWNLOAD_COUNT ON TRUE
-            LEFT JOIN LATERAL (
-              SELECT EXISTS(
-                SELECT (1) FROM osf_fileversionusermetadata
-                  INNER JOIN osf_fileversion ON osf_fileversionusermetadata.file_version_id = osf_fileversion.id
-                  INNER JOIN osf_basefileversionsthrough ON osf_fileversion.id = osf_basefileversionsthrough.fileversion_id
-                  WHERE osf_fileversionusermetadata.user_id = %s
-                  AND osf_basefileversionsthrough.basefilenode_id = F.id
-                LIMIT 1
-              )
-            ) SEEN_FILE ON TRUE
-            LEFT JOIN LATERAL (
-                SELECT CASE WHEN SEEN_FILE.exists
-                THEN
-                    CASE WHEN EXISTS(
-                      SELECT (1) FROM osf_fileversionusermetadata
-                      WHERE osf_fileversionusermetadata.file_version_id = LATEST_VERSION.fileversion_id
-                      AND osf_fileversionusermetadata.user_id = %s
-                      LIMIT 1
-                    )
-                    THEN
-                      json_build_object('user', %s, 'seen', TRUE)
-                    ELSE
-                      json_build_object('user', %s, 'seen', FALSE)
-                    END
-                ELSE
-                  NULL
-                END
-            ) SEEN_LATEST_VERSION ON TRUE
-            WHERE parent_id = %s
-            AND (NOT F.type IN ('osf.trashedfilenode', 'osf.trashedfile', 'osf.trashedfolder'))
-        """, [
-            user_content_type_id,
-            file_node.target.guids.first().id,
-            user_pk,
-            user_pk,
-            user_id,
-            user_id,
-            file_node.id
-        ])
-        return cursor.fetchone()[0] or []
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_children_cursor(rows[-1][1], rows[-1][2])
+
+    def stream_children():
+        yield '{"data": ['
+        for i, row in enumerate(rows):
+            yield row[0] if i == 0 else ',' + row[0]
+        yield '], "next": {}}}'.format(json.dumps(next_cursor))
+
+    return Response(stream_with_context(stream_children()), mimetype='application/json')
 
 
 @must_be_signed
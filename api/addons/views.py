@@ -21,15 +21,17 @@ class AddonSettingsMixin(object):
     current URL. By default, fetches the settings based on the user or node available in self context.
     """
 
-    def get_addon_settings(self, provider=None, fail_if_absent=True, check_object_permissions=True):
-        owner = None
+    def get_addon_settings(self, provider=None, fail_if_absent=True, check_object_permissions=True, owner=None):
+        """
+        :param owner: The user or node to read the settings of, if it is already loaded
+        """
         provider = provider or self.kwargs['provider']
 
         if hasattr(self, 'get_user'):
-            owner = self.get_user()
+            owner = owner or self.get_user()
             owner_type = 'user'
         elif hasattr(self, 'get_node'):
-            owner = self.get_node()
+            owner = owner or self.get_node()
             owner_type = 'node'
 
         try:
@@ -16,8 +16,9 @@ from api.base.exceptions import (
 )
 from framework.auth import cas
 from framework.auth.core import get_user
+from framework.sessions.backends import get_session_backend
 from osf import features
-from osf.models import OSFUser, Session
+from osf.models import OSFUser
 from osf.utils.fields import ensure_str
 from website import settings
 
@@ -34,11 +35,7 @@ def get_session_from_cookie(cookie_val):
         session_id = ensure_str(itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie_val))
     except itsdangerous.BadSignature:
         return None
-    try:
-        session = Session.objects.get(_id=session_id)
-        return session
-    except Session.DoesNotExist:
-        return None
+    return get_session_backend().load(session_id)
 
 
 def check_user(user):
@@ -1,5 +1,7 @@
+import collections
 import datetime
 import functools
+import logging
 import operator
 import re
 
@@ -20,7 +22,9 @@ from rest_framework import serializers as ser
 from rest_framework.filters import OrderingFilter
 from osf.models import Subject, Preprint
 from osf.models.base import GuidMixin
-from functools import cmp_to_key
+
+logger = logging.getLogger(__name__)
+
 
 def lowercase(lower):
     if hasattr(lower, '__call__'):
@@ -47,6 +51,35 @@ def sort_multiple(fields):
     return sort_fn
 
 
+def sort_by_fields(items, fields):
+    """Sort a list of objects on ``fields`` (prefixed with '-' for descending order).
+
+    Each attribute is read once per item into a column, then the items are stably sorted on
+    each column from the last field to the first, so no comparator callbacks are needed.
+    Objects missing a value (None) sort after the others.
+    """
+    items = list(items)
+    order = list(range(len(items)))
+    for field in reversed(list(fields)):
+        descending = field.startswith('-')
+        column = [getattr(item, field.lstrip('-')) for item in items]
+        if descending:
+            order.sort(key=lambda i: (column[i] is not None, column[i]), reverse=True)
+        else:
+            order.sort(key=lambda i: (column[i] is None, column[i]))
+    return [items[i] for i in order]
+
+
+def log_in_memory_list(view, action, size):
+    """Record that ``view`` had to ``action`` its results in Python because they were a list,
+    so views that materialize their querysets can be found and converted.
+    """
+    logger.info(
+        'In-memory %s of %s items for view %s',
+        action, size, getattr(view, 'view_fqn', type(view).__name__),
+    )
+
+
 class OSFOrderingFilter(OrderingFilter):
     """Adaptation of rest_framework.filters.OrderingFilter to work with modular-odm."""
     # override
@@ -62,8 +95,8 @@ class OSFOrderingFilter(OrderingFilter):
             return super(OSFOrderingFilter, self).filter_queryset(request, queryset, view)
         if ordering:
             if isinstance(ordering, (list, tuple)):
-                sorted_list = sorted(queryset, key=cmp_to_key(sort_multiple(ordering)))
-                return sorted_list
+                log_in_memory_list(view, 'sort', len(queryset))
+                return sort_by_fields(queryset, ordering)
             return queryset.sort(*ordering)
         return queryset
 
@@ -133,11 +166,61 @@ class ElasticOSFOrderingFilter(OSFOrderingFilter):
         return sorted_list
 
 
+QUERY_PATTERN = re.compile(r'^filter\[(?P<fields>((?:,*\s*\w+)*))\](\[(?P<op>\w+)\])?$')
+FILTER_FIELDS = re.compile(r'(?:,*\s*(\w+)+)')
+
+
+@functools.lru_cache(maxsize=1024)
+def parse_filter_key(key):
+    """Split a ``filter[<fields>][<op>]`` query param name into its field names and operator.
+
+    :return tuple: (field names, operator or None), or None if ``key`` is not a filter param
+    """
+    match = QUERY_PATTERN.match(key)
+    if not match:
+        return None
+    match_dict = match.groupdict()
+    return tuple(re.findall(FILTER_FIELDS, match_dict['fields'].strip())), match_dict.get('op')
+
+
+FilterSchemaField = collections.namedtuple(
+    'FilterSchemaField', ['field', 'source_field_name', 'default_operator', 'allowed_operators'],
+)
+
+
+class FilterSchema(object):
+    """Everything about the filterable fields of a view's serializer that does not depend on
+    the filter values, so turning ``filter[...]`` params into queries is a dictionary lookup.
+    """
+
+    def __init__(self, fields, unfilterable_fields):
+        # field name -> FilterSchemaField
+        self.fields = fields
+        # serializer fields that exist but may not be filtered on
+        self.unfilterable_fields = unfilterable_fields
+
+    def get_field(self, field_name):
+        """
+        :raises InvalidFilterError: If the filter field is not valid
+        """
+        try:
+            return self.fields[field_name]
+        except KeyError:
+            pass
+        if field_name in self.unfilterable_fields:
+            raise InvalidFilterFieldError(parameter='filter', value=field_name)
+        raise InvalidFilterError(detail="'{0}' is not a valid field for this endpoint.".format(field_name))
+
+
+# (view class, serializer class, API version) -> FilterSchema
+_filter_schemas = {}
+
+
 class FilterMixin(object):
     """ View mixin with helper functions for filtering. """
 
-    QUERY_PATTERN = re.compile(r'^filter\[(?P<fields>((?:,*\s*\w+)*))\](\[(?P<op>\w+)\])?$')
-    FILTER_FIELDS = re.compile(r'(?:,*\s*(\w+)+)')
+    QUERY_PATTERN = QUERY_PATTERN
+    FILTER_FIELDS = FILTER_FIELDS
 
     MATCH_OPERATORS = ('contains', 'icontains')
     MATCHABLE_FIELDS = (ser.CharField, ser.ListField)
@@ -175,27 +258,69 @@ class FilterMixin(object):
         else:
             return self.DEFAULT_OPERATORS
 
-    def _get_field_or_error(self, field_name):
-        """
-        Check that the attempted filter field is valid
+    def _get_allowed_operators(self, field):
+        allowed_operators = set(self.DEFAULT_OPERATORS)
+        if isinstance(field, self.COMPARABLE_FIELDS):
+            allowed_operators.update(self.COMPARISON_OPERATORS)
+        if isinstance(field, self.MATCHABLE_FIELDS):
+            allowed_operators.update(self.MATCH_OPERATORS)
+        return frozenset(allowed_operators)
 
-        :raises InvalidFilterError: If the filter field is not valid
-        """
+    def compile_filter_schema(self):
+        """Build the FilterSchema for this view's serializer and the requested API version."""
         predeclared_fields = self.serializer_class._declared_fields
         initialized_fields = self.get_serializer().fields if hasattr(self, 'get_serializer') else {}
         serializer_fields = predeclared_fields.copy()
         # Merges fields that were declared on serializer with fields that may have been dynamically added
         serializer_fields.update(initialized_fields)
 
-        if field_name not in serializer_fields:
-            raise InvalidFilterError(detail="'{0}' is not a valid field for this endpoint.".format(field_name))
-        if field_name not in getattr(self.serializer_class, 'filterable_fields', set()):
-            raise InvalidFilterFieldError(parameter='filter', value=field_name)
-        field = serializer_fields[field_name]
-        # You cannot filter on deprecated fields.
-        if isinstance(field, ShowIfVersion) and utils.is_deprecated(self.request.version, field.min_version, field.max_version):
-            raise InvalidFilterFieldError(parameter='filter', value=field_name)
-        return serializer_fields[field_name]
+        filterable_fields = getattr(self.serializer_class, 'filterable_fields', set())
+        version = getattr(getattr(self, 'request', None), 'version', None)
+        fields = {}
+        unfilterable_fields = set()
+        for field_name, field in serializer_fields.items():
+            if field_name not in filterable_fields:
+                unfilterable_fields.add(field_name)
+                continue
+            # You cannot filter on deprecated fields.
+            if isinstance(field, ShowIfVersion) and utils.is_deprecated(version, field.min_version, field.max_version):
+                unfilterable_fields.add(field_name)
+                continue
+            source_field_name = field_name
+            if not isinstance(field, ser.SerializerMethodField):
+                source_field_name = self.convert_key(field_name, field)
+            fields[field_name] = FilterSchemaField(
+                field=field,
+                source_field_name=source_field_name,
+                default_operator=self._get_default_operator(field),
+                allowed_operators=self._get_allowed_operators(field),
+            )
+        return FilterSchema(fields, unfilterable_fields)
+
+    def get_filter_schema(self):
+        """Return the FilterSchema for this view, compiling it once per (view, serializer, API version).
+
+        Requests with sparse fieldsets are compiled without caching, since they may hide
+        dynamically added serializer fields.
+        """
+        request = getattr(self, 'request', None)
+        query_params = getattr(request, 'query_params', {})
+        if any(param.startswith('fields[') for param in query_params):
+            return self.compile_filter_schema()
+
+        cache_key = (type(self), self.serializer_class, getattr(request, 'version', None))
+        schema = _filter_schemas.get(cache_key)
+        if schema is None:
+            schema = _filter_schemas[cache_key] = self.compile_filter_schema()
+        return schema
+
+    def _get_field_or_error(self, field_name):
+        """
+        Check that the attempted filter field is valid
+
+        :raises InvalidFilterError: If the filter field is not valid
+        """
+        return self.get_filter_schema().get_field(field_name).field
 
     def _validate_operator(self, field, field_name, op):
         """
@@ -274,22 +399,23 @@ class FilterMixin(object):
         }
         """
         query = {}
+        schema = None
         for key, value in query_params.items():
-            match = self.QUERY_PATTERN.match(key)
-            if match:
-                match_dict = match.groupdict()
-                fields = match_dict['fields']
-                field_names = re.findall(self.FILTER_FIELDS, fields.strip())
+            parsed_key = parse_filter_key(key)
+            if parsed_key:
+                field_names, key_op = parsed_key
                 query.update({key: {}})
+                schema = schema or self.get_filter_schema()
 
                 for field_name in field_names:
-                    field = self._get_field_or_error(field_name)
-                    op = match_dict.get('op') or self._get_default_operator(field)
-                    self._validate_operator(field, field_name, op)
+                    schema_field = schema.get_field(field_name)
+                    field = schema_field.field
+                    op = key_op or schema_field.default_operator
+                    if op not in schema_field.allowed_operators:
+                        # raises the appropriate error
+                        self._validate_operator(field, field_name, op)
 
-                    source_field_name = field_name
-                    if not isinstance(field, ser.SerializerMethodField):
-                        source_field_name = self.convert_key(field_name, field)
+                    source_field_name = schema_field.source_field_name
 
                     # Special case date(time)s to allow for ambiguous date matches
                     if isinstance(field, self.DATE_FIELDS):
@@ -439,33 +565,101 @@ class ListFilterMixin(FilterMixin):
         query_parts = []
 
         if filters:
+            if isinstance(queryset, list):
+                log_in_memory_list(self, 'filter', len(queryset))
+                return self.filter_list(filters, queryset)
+
             for key, field_names in filters.items():
 
                 sub_query_parts = []
                 for field_name, data in field_names.items():
                     operations = data if isinstance(data, list) else [data]
-                    if isinstance(queryset, list):
-                        for operation in operations:
-                            queryset = self.get_filtered_queryset(field_name, operation, queryset)
-                    else:
-                        sub_query_parts.append(
-                            functools.reduce(
-                                operator.and_, [
-                                    self.build_query_from_field(field_name, operation)
-                                    for operation in operations
-                                ],
-                            ),
-                        )
-                if not isinstance(queryset, list):
-                    sub_query = functools.reduce(operator.or_, sub_query_parts)
-                    query_parts.append(sub_query)
-
-            if not isinstance(queryset, list):
-                for query in query_parts:
-                    queryset = queryset.filter(query)
+                    sub_query_parts.append(
+                        functools.reduce(
+                            operator.and_, [
+                                self.build_query_from_field(field_name, operation)
+                                for operation in operations
+                            ],
+                        ),
+                    )
+                sub_query = functools.reduce(operator.or_, sub_query_parts)
+                query_parts.append(sub_query)
+
+            for query in query_parts:
+                queryset = queryset.filter(query)
 
         return queryset
 
+    def filter_list(self, filters, items):
+        """Apply parsed query params to a list of objects. Every operation must match.
+
+        Each attribute that is filtered on is read once per item into a column, and all of the
+        operations are evaluated against those columns in a single pass per operation.
+        """
+        columns = {}
+        keep = [True] * len(items)
+        for key, field_names in filters.items():
+            for field_name, data in field_names.items():
+                operations = data if isinstance(data, list) else [data]
+                for operation in operations:
+                    column_key = (field_name, operation['source_field_name'])
+                    if column_key not in columns:
+                        columns[column_key] = self.get_list_filter_column(field_name, operation, items)
+                    keep = self.apply_list_filter(field_name, operation, columns[column_key], keep)
+        return [item for item, kept in zip(items, keep) if kept]
+
+    def get_list_filter_column(self, field_name, params, items):
+        """Return the value of every item in items that field_name is filtered on."""
+        field = self.serializer_class._declared_fields[field_name]
+        source_field_name = params['source_field_name']
+
+        if isinstance(field, ser.SerializerMethodField):
+            serializer_method = self.get_serializer_method(field_name)
+            return [serializer_method(item) for item in items]
+        elif isinstance(field, ser.CharField):
+            return [getattr(item, source_field_name, '') for item in items]
+        elif isinstance(field, ser.ListField):
+            return [getattr(item, source_field_name, []) for item in items]
+        return [getattr(item, source_field_name, None) for item in items]
+
+    def apply_list_filter(self, field_name, params, column, keep=None):
+        """Evaluate one parsed filter operation against a column of values.
+
+        :param list column: values returned by get_list_filter_column
+        :param list keep: optional mask of items that are still included
+        :return list: updated mask of included items
+        """
+        field = self.serializer_class._declared_fields[field_name]
+        source_field_name = params['source_field_name']
+
+        if isinstance(field, ser.SerializerMethodField):
+            compare = self.FILTERS[params['op']]
+            value = params['value']
+            matches = lambda item_value: compare(item_value, value)
+        elif isinstance(field, ser.CharField):
+            if source_field_name in ('_id', 'root'):
+                # Param parser treats certain ID fields as bulk queries: a list of options, instead of just one
+                # Respect special-case behavior, and enforce exact match for these list fields.
+                options = set(item.lower() for item in params['value'])
+                matches = lambda item_value: item_value in options
+            else:
+                value = params['value'].lower()
+                matches = lambda item_value: value in item_value.lower()
+        elif isinstance(field, ser.ListField):
+            value = params['value'].lower()
+            matches = lambda item_value: value in [lowercase(i.lower) for i in item_value]
+        else:
+            compare = self.FILTERS[params['op']]
+            value = params['value']
+            matches = lambda item_value: compare(item_value, value)
+
+        if keep is None:
+            keep = [True] * len(column)
+        try:
+            return [kept and matches(item_value) for kept, item_value in zip(keep, column)]
+        except TypeError:
+            raise InvalidFilterValue(detail='Could not apply filter to specified field')
+
     def build_query_from_field(self, field_name, operation):
         query_field_name = operation['source_field_name']
         if operation['op'] == 'ne':
@@ -521,45 +715,9 @@ class ListFilterMixin(FilterMixin):
 
     def get_filtered_queryset(self, field_name, params, default_queryset):
         """filters default queryset based on the serializer field type"""
-        field = self.serializer_class._declared_fields[field_name]
-        source_field_name = params['source_field_name']
-
-        if isinstance(field, ser.SerializerMethodField):
-            return_val = [
-                item for item in default_queryset
-                if self.FILTERS[params['op']](self.get_serializer_method(field_name)(item), params['value'])
-            ]
-        elif isinstance(field, ser.CharField):
-            if source_field_name in ('_id', 'root'):
-                # Param parser treats certain ID fields as bulk queries: a list of options, instead of just one
-                # Respect special-case behavior, and enforce exact match for these list fields.
-                options = set(item.lower() for item in params['value'])
-                return_val = [
-                    item for item in default_queryset
-                    if getattr(item, source_field_name, '') in options
-                ]
-            else:
-                return_val = [
-                    item for item in default_queryset
-                    if params['value'].lower() in getattr(item, source_field_name, '').lower()
-                ]
-        elif isinstance(field, ser.ListField):
-            return_val = [
-                item for item in default_queryset
-                if params['value'].lower() in [
-                    lowercase(i.lower) for i in getattr(item, source_field_name, [])
-                ]
-            ]
-        else:
-            try:
-                return_val = [
-                    item for item in default_queryset
-                    if self.FILTERS[params['op']](getattr(item, source_field_name, None), params['value'])
-                ]
-            except TypeError:
-                raise InvalidFilterValue(detail='Could not apply filter to specified field')
-
-        return return_val
+        column = self.get_list_filter_column(field_name, params, default_queryset)
+        keep = self.apply_list_filter(field_name, params, column)
+        return [item for item, kept in zip(default_queryset, keep) if kept]
 
     def get_serializer_method(self, field_name):
         """
@@ -1,8 +1,14 @@
+import base64
+import datetime
+import json
+
 import six
 from collections import OrderedDict
 from django.urls import reverse
+from django.core.exceptions import FieldDoesNotExist
 from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
-from django.db.models import QuerySet
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q, QuerySet
 
 from rest_framework import pagination
 from rest_framework.exceptions import NotFound
@@ -12,23 +18,54 @@ from rest_framework.utils.urls import (
 )
 from api.base.serializers import is_anonymized
 from api.base.settings import MAX_PAGE_SIZE
-from api.base.utils import absolute_reverse
+from api.base.utils import absolute_reverse, is_truthy
 
 from osf.models import AbstractNode, Comment, Preprint, Guid, DraftRegistration
+from osf.utils.permission_cache import prefetch_permissions
 from website.search.elastic_search import DOC_TYPE_TO_MODEL
 
 
+class CursorJSONEncoder(DjangoJSONEncoder):
+    """Keeps the microseconds of datetimes and times, which DjangoJSONEncoder cuts to
+    milliseconds, so that cursors on timestamps do not skip or repeat rows.
+    """
+    def default(self, o):
+        if isinstance(o, (datetime.datetime, datetime.time)):
+            return o.isoformat()
+        return super(CursorJSONEncoder, self).default(o)
+
+
+class CursorPage(object):
+    """A page of results fetched by keyset, along with the cursors of its neighbouring pages."""
+
+    def __init__(self, results, per_page, next_cursor=None, previous_cursor=None, total=None):
+        self.results = results
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.total = total
+
+
 class JSONAPIPagination(pagination.PageNumberPagination):
     """
     Custom paginator that formats responses in a JSON-API compatible format.
 
     Properly handles pagination of embedded objects.
 
+    Passing ``page[cursor]`` (empty for the first page) switches to keyset pagination: pages are
+    fetched with ``WHERE (sort_key, id) > (last seen values)`` instead of an OFFSET, and the total
+    count is only computed if ``meta[total]=true`` is passed as well. Lists whose ordering is not
+    a single field of the model, optionally followed by its primary key, keep page number pagination.
     """
 
     page_size_query_param = 'page[size]'
     max_page_size = MAX_PAGE_SIZE
 
+    cursor_query_param = 'page[cursor]'
+    cursor_total_query_param = 'meta[total]'
+    invalid_cursor_message = 'Invalid cursor'
+    cursor_page = None
+
     def page_number_query(self, url, page_number):
         """
         Builds uri and adds page param.
@@ -123,7 +160,9 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         if embedded:
             reversed_url = reverse(view_name, kwargs=kwargs)
 
-        if self.request.version < '2.1':
+        if self.cursor_page is not None:
+            response_dict = self.get_cursor_response_dict(data, reversed_url)
+        elif self.request.version < '2.1':
             response_dict = self.get_response_dict_deprecated(data, reversed_url)
         else:
             response_dict = self.get_response_dict(data, reversed_url)
@@ -140,7 +179,18 @@ class JSONAPIPagination(pagination.PageNumberPagination):
         Custom pagination of queryset. Returns page object or `None` if not configured for view.
 
         If this is an embedded resource, returns first page, ignoring query params.
+        The requesting user's permissions on the page's objects, and the addons of the
+        page's nodes, are loaded up front, so serializing them does not query object by object.
         """
+        page = self._paginate_queryset(queryset, request, view=view)
+        if page is not None:
+            prefetch_permissions(request.user, page)
+            nodes = [obj for obj in page if isinstance(obj, AbstractNode)]
+            if nodes:
+                AbstractNode.prefetch_addons(nodes)
+        return page
+
+    def _paginate_queryset(self, queryset, request, view=None):
         if request.parser_context['kwargs'].get('is_embedded'):
             # Pagination requires an order by clause, especially when using Postgres.
             # see: https://docs.djangoproject.com/en/1.10/topics/pagination/#required-arguments
@@ -164,9 +214,153 @@ class JSONAPIPagination(pagination.PageNumberPagination):
             self.request = request
             return list(self.page)
 
+        elif self.cursor_query_param in request.query_params and self.supports_cursor(queryset):
+            return self.paginate_queryset_by_cursor(queryset, request)
+
         else:
             return super(JSONAPIPagination, self).paginate_queryset(queryset, request, view=None)
 
+    def supports_cursor(self, queryset):
+        # DISTINCT ON requires the ordering to start with the distinct fields, which keyset ordering would break
+        return (
+            isinstance(queryset, QuerySet) and
+            not queryset.query.distinct_fields and
+            self.get_cursor_ordering(queryset) is not None
+        )
+
+    def get_cursor_ordering(self, queryset):
+        """
+        Returns the (field name, descending) pair that keyset pagination sorts on, ties broken by pk,
+        or None if the queryset's ordering cannot be keyed on that way.
+
+        Only a single field of the model, optionally followed by the primary key in the same direction,
+        can be represented. Any other ordering (several fields, related lookups, expressions, random)
+        would come back in a different order than the same list without a cursor.
+        """
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering)
+        if not ordering:
+            return 'pk', False
+        if not all(isinstance(field_name, str) for field_name in ordering):
+            return None
+        pk_names = ('pk', queryset.model._meta.pk.name)
+        field_name = ordering[0]
+        descending = field_name.startswith('-')
+        field_name = field_name.lstrip('-')
+        if field_name in pk_names:
+            return 'pk', descending
+        if field_name == '?' or '__' in field_name:
+            return None
+        ties = ordering[1:]
+        if ties and ties[0].lstrip('-') in pk_names and ties[0].startswith('-') == descending:
+            ties = ties[1:]
+        if ties:
+            return None
+        return field_name, descending
+
+    def get_position(self, obj, field_name):
+        try:
+            attname = obj._meta.get_field(field_name).attname
+        except FieldDoesNotExist:
+            # pk or annotations
+            attname = field_name
+        return [getattr(obj, attname), obj.pk]
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': reverse}, cls=CursorJSONEncoder)
+        return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, cursor):
+        """
+        Returns the (position, reverse) pair encoded in cursor, or (None, False) for the first page.
+        """
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+            position, reverse = payload['p'], bool(payload['r'])
+            value, pk = position
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return [value, pk], reverse
+
+    def get_position_filter(self, field_name, position, descending):
+        """
+        Builds the ``(field, pk) > position`` filter for the given sort direction, matching
+        Postgres' default NULLS LAST for ascending and NULLS FIRST for descending sorts.
+        """
+        value, pk = position
+        pk_lookup = 'pk__lt' if descending else 'pk__gt'
+        if field_name == 'pk':
+            return Q(**{pk_lookup: pk})
+        value_lookup = '{}__{}'.format(field_name, 'lt' if descending else 'gt')
+        isnull_lookup = '{}__isnull'.format(field_name)
+        if descending:
+            if value is None:
+                return Q(**{isnull_lookup: True, pk_lookup: pk}) | Q(**{isnull_lookup: False})
+            return Q(**{value_lookup: value}) | Q(**{field_name: value, pk_lookup: pk})
+        if value is None:
+            return Q(**{isnull_lookup: True, pk_lookup: pk})
+        return Q(**{value_lookup: value}) | Q(**{field_name: value, pk_lookup: pk}) | Q(**{isnull_lookup: True})
+
+    def paginate_queryset_by_cursor(self, queryset, request):
+        page_size = self.get_page_size(request)
+        field_name, descending = self.get_cursor_ordering(queryset)
+        position, reverse = self.decode_cursor(request.query_params.get(self.cursor_query_param))
+
+        total = None
+        if is_truthy(request.query_params.get(self.cursor_total_query_param, False)):
+            total = queryset.count()
+
+        # Walking backwards from a cursor is the same as walking forwards in the opposite order
+        sort_descending = descending != reverse
+        direction = '-' if sort_descending else ''
+        if field_name == 'pk':
+            ordered = queryset.order_by('{}pk'.format(direction))
+        else:
+            ordered = queryset.order_by('{}{}'.format(direction, field_name), '{}pk'.format(direction))
+        if position is not None:
+            ordered = ordered.filter(self.get_position_filter(field_name, position, sort_descending))
+
+        results = list(ordered[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        next_cursor = previous_cursor = None
+        if results and has_next:
+            next_cursor = self.encode_cursor(self.get_position(results[-1], field_name), False)
+        if results and has_previous:
+            previous_cursor = self.encode_cursor(self.get_position(results[0], field_name), True)
+
+        self.cursor_page = CursorPage(results, page_size, next_cursor, previous_cursor, total)
+        self.request = request
+        return results
+
+    def cursor_query(self, url, cursor):
+        url = remove_query_param(self.request.build_absolute_uri(url), '_')
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_cursor_response_dict(self, data, url):
+        meta = OrderedDict([('per_page', self.cursor_page.per_page)])
+        if self.cursor_page.total is not None:
+            meta['total'] = self.cursor_page.total
+        links = OrderedDict([
+            ('self', self.cursor_query(url, self.request.query_params.get(self.cursor_query_param, ''))),
+            ('first', self.cursor_query(url, '')),
+            ('last', None),
+            ('prev', self.cursor_query(url, self.cursor_page.previous_cursor) if self.cursor_page.previous_cursor else None),
+            ('next', self.cursor_query(url, self.cursor_page.next_cursor) if self.cursor_page.next_cursor else None),
+        ])
+        if self.request.version < '2.1':
+            links.pop('self')
+            links['meta'] = meta
+            return OrderedDict([('data', data), ('links', links)])
+        return OrderedDict([('data', data), ('meta', meta), ('links', links)])
+
 
 class MaxSizePagination(JSONAPIPagination):
     page_size = 1000
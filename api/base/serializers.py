@@ -50,6 +50,11 @@ def get_meta_type(serializer_class, request):
         return None
 
 
+def get_related_count_annotation_name(count_method_name):
+    """Name of the annotation that holds the precomputed value of a ``related_meta`` count method."""
+    return 'annotated_{}'.format(count_method_name)
+
+
 def format_relationship_links(related_link=None, self_link=None, rel_meta=None, self_meta=None):
     """
     Properly handles formatting of self and related links according to JSON API.
@@ -718,11 +723,11 @@ class RelationshipField(ser.HyperlinkedIdentityField):
                 field_counts_requested = self.process_related_counts_parameters(show_related_counts, value)
 
                 if utils.is_truthy(show_related_counts):
-                    meta[key] = functional.rapply(meta_data[key], _url_val, obj=value, serializer=self.parent, request=self.context['request'])
+                    meta[key] = self.get_count_meta(meta_data[key], value)
                 elif utils.is_falsy(show_related_counts):
                     continue
                 elif self.field_name in field_counts_requested:
-                    meta[key] = functional.rapply(meta_data[key], _url_val, obj=value, serializer=self.parent, request=self.context['request'])
+                    meta[key] = self.get_count_meta(meta_data[key], value)
                 else:
                     continue
             elif key == 'projects_in_common':
@@ -735,6 +740,17 @@ class RelationshipField(ser.HyperlinkedIdentityField):
                 meta[key] = functional.rapply(meta_data[key], _url_val, obj=value, serializer=self.parent, request=self.context['request'])
         return meta
 
+    def get_count_meta(self, count_method, obj):
+        """
+        Returns the value annotated onto obj by the list view for this count method if present,
+        otherwise calls the count method.
+        """
+        if isinstance(count_method, str):
+            annotation_name = get_related_count_annotation_name(count_method)
+            if hasattr(obj, annotation_name):
+                return getattr(obj, annotation_name)
+        return functional.rapply(count_method, _url_val, obj=obj, serializer=self.parent, request=self.context['request'])
+
     def lookup_attribute(self, obj, lookup_field):
         """
         Returns attribute from target object unless attribute surrounded in angular brackets where it returns the lookup field.
@@ -1289,6 +1305,12 @@ class JSONAPIListSerializer(ser.ListSerializer):
         if isinstance(data, collections.Mapping):
             errors = data.get('errors', None)
             data = data.get('data', None)
+        if not enable_esi and data:
+            # Let embedded views load their results for the whole page at once
+            for embed_partial in self.context.get('embed', {}).values():
+                prefetch = getattr(embed_partial, 'prefetch', None)
+                if prefetch:
+                    prefetch(data)
         if enable_esi:
             ret = [
                 self.child.to_esi_representation(item, envelope=None) for item in data
@@ -1404,6 +1426,11 @@ class JSONAPISerializer(BaseAPISerializer):
     """
     writeable_method_fields = frozenset([])
 
+    # Maps the names of ``related_meta`` count methods to query expressions that compute the same value
+    # for every object of a queryset. List views annotate the requested ones onto each page so that
+    # counts are not queried once per object.
+    related_count_annotations = {}
+
     # Don't serialize relationships that use these views
     # when viewing thru an anonymous VOL
     views_to_hide_if_anonymous = {
@@ -332,6 +332,11 @@ ELASTICSEARCH_METRICS_DATE_FORMAT = '%Y'
 WAFFLE_CACHE_NAME = 'waffle_cache'
 STORAGE_USAGE_CACHE_NAME = 'storage_usage'
 STORAGE_USAGE_MAX_ENTRIES = 10000000
+SEARCH_REINDEX_CACHE_NAME = 'search_reindex'
+SESSION_CACHE_NAME = 'sessions'
+NODE_PERMISSIONS_CACHE_NAME = 'node_permissions'
+# How long a node id set is kept; sets are never served once a permission change invalidated them
+NODE_PERMISSIONS_CACHE_TIMEOUT = 60 * 60
 
 
 CACHES = {
@@ -348,6 +353,17 @@ CACHES = {
     WAFFLE_CACHE_NAME: {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     },
+    SESSION_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    SEARCH_REINDEX_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'osf_search_reindex_cache_table',
+    },
+    NODE_PERMISSIONS_CACHE_NAME: {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'osf_node_permissions_cache_table',
+    },
 }
 
 EGAP_PROVIDER_NAME = 'EGAP'
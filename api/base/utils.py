@@ -7,7 +7,8 @@ from hashids import Hashids
 
 from django.utils.http import urlquote
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models import QuerySet
+from django.db.models import F, Func, IntegerField, QuerySet, Subquery
+from django.db.models.functions import Coalesce
 from rest_framework import fields
 from rest_framework.exceptions import NotFound
 from rest_framework.reverse import reverse
@@ -163,6 +164,19 @@ def default_node_list_permission_queryset(user, model_cls, **annotations):
         qs = qs.annotate(**annotations)
     return qs
 
+def count_subquery(queryset):
+    """Build an annotation that counts the rows of ``queryset``, which is usually filtered on an ``OuterRef``.
+
+    Uses a bare COUNT so no GROUP BY is added to the subquery.
+    """
+    return Coalesce(
+        Subquery(
+            queryset.order_by().annotate(_count=Func(F('pk'), function='COUNT')).values('_count'),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
 def extend_querystring_params(url, params):
     scheme, netloc, path, query, _ = urlsplit(url)
     orig_params = parse_qs(query)
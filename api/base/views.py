@@ -6,8 +6,9 @@ from distutils.version import StrictVersion
 from django_bulk_update.helper import bulk_update
 from django.conf import settings as django_settings
 from django.db import transaction
-from django.db.models import F, Q
+from django.db.models import F, Q, QuerySet
 from django.http import JsonResponse
+from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 from rest_framework import generics
 from rest_framework import permissions as drf_permissions
@@ -26,6 +27,7 @@ from api.base.parsers import JSONAPIRelationshipParserForRegularJSON
 from api.base.requests import EmbeddedRequest
 from api.base.serializers import (
     get_meta_type,
+    get_related_count_annotation_name,
     MaintenanceStateSerializer,
     LinkedNodesRelationshipSerializer,
     LinkedRegistrationsRelationshipSerializer,
@@ -46,6 +48,10 @@ from waffle.models import Flag, Switch, Sample
 from waffle import sample_is_active
 
 
+# Key of the page-level map in the request's embed cache that holds results loaded by ``bulk_get_embedded``
+EMBED_PREFETCH_CACHE_KEY = 'prefetched_embeds'
+
+
 class JSONAPIBaseView(generics.GenericAPIView):
 
     def __init__(self, **kwargs):
@@ -54,10 +60,55 @@ class JSONAPIBaseView(generics.GenericAPIView):
         self.view_fqn = ':'.join([self.view_category, self.view_name])
         super(JSONAPIBaseView, self).__init__(**kwargs)
 
+    #: Name of the URL kwarg that embedded requests to this view are grouped by when a whole
+    #: page of embeds is prefetched. Views that set this must implement ``bulk_get_embedded``.
+    embed_prefetch_kwarg = None
+
+    def bulk_get_embedded(self, keys):
+        """Load the default results of this (list) view for every ``embed_prefetch_kwarg`` value
+        in ``keys`` using a fixed number of queries.
+
+        :return dict: mapping of key -> list of results
+        """
+        raise NotImplementedError
+
+    def get_prefetched_embed(self):
+        """Return the results loaded for this embedded view by ``bulk_get_embedded``, or None if
+        this view was not prefetched.
+        """
+        if not self.kwargs.get('is_embedded') or not self.embed_prefetch_kwarg:
+            return None
+        cache = getattr(self.request._request, '_embed_cache', {})
+        return cache.get(EMBED_PREFETCH_CACHE_KEY, {}).get((type(self), self.kwargs.get(self.embed_prefetch_kwarg)))
+
+    def _get_embedded_view(self, v, view_args, view_kwargs, item):
+        """Set up an instance of the embedded view ``v`` as if it had been requested for ``item``."""
+        request = EmbeddedRequest(self.request)
+        request.parents.setdefault(type(item), {})[item._id] = item
+
+        view_kwargs.update({
+            'request': request,
+            'is_embedded': True,
+        })
+
+        # Setup a view ourselves to avoid all the junk DRF throws in
+        # v is a function that hides everything v.cls is the actual view class
+        view = v.cls()
+        view.args = view_args
+        view.kwargs = view_kwargs
+        view.request = request
+        view.request.parser_context['kwargs'] = view_kwargs
+        view.format_kwarg = view.get_format_suffix(**view_kwargs)
+        return view
+
     def _get_embed_partial(self, field_name, field):
         """Create a partial function to fetch the values of an embedded field. A basic
         example is to include a Node's children in a single response.
 
+        The partial has a ``prefetch`` attribute which list serializers call with the whole page
+        before serializing it, so that embedded list views implementing ``bulk_get_embedded`` are
+        loaded with one grouped query instead of one query per item.
+
         :param str field_name: Name of field of the view's serializer_class to load
         results for
         :return function object -> dict:
@@ -65,33 +116,50 @@ class JSONAPIBaseView(generics.GenericAPIView):
         if getattr(field, 'field', None):
             field = field.field
 
+        def get_cache():
+            if not hasattr(self.request._request, '_embed_cache'):
+                self.request._request._embed_cache = {}
+            return self.request._request._embed_cache
+
+        def prefetch(items):
+            if field is None or not hasattr(field, 'resolve'):
+                return
+            prefetch_map = get_cache().setdefault(EMBED_PREFETCH_CACHE_KEY, {})
+
+            grouped_views = defaultdict(list)
+            for item in items:
+                try:
+                    v, view_args, view_kwargs = field.resolve(item, field_name, self.request)
+                except Exception:
+                    # Prefetching is best-effort, the partial will surface any error for this item
+                    continue
+                if not v or not getattr(v.cls, 'embed_prefetch_kwarg', None) or not issubclass(v.cls, ListModelMixin):
+                    continue
+                view = self._get_embedded_view(v, view_args, view_kwargs, item)
+                key = view.kwargs.get(view.embed_prefetch_kwarg)
+                if key is not None and (v.cls, key) not in prefetch_map:
+                    grouped_views[v.cls].append((key, view))
+
+            for view_class, keyed_views in grouped_views.items():
+                keys = {key for key, _ in keyed_views}
+                results = keyed_views[0][1].bulk_get_embedded(keys)
+                for key in keys:
+                    prefetch_map[(view_class, key)] = results.get(key, [])
+
         def partial(item):
             # resolve must be implemented on the field
             v, view_args, view_kwargs = field.resolve(item, field_name, self.request)
             if not v:
                 return None
 
-            request = EmbeddedRequest(self.request)
-
-            if not hasattr(request._request, '_embed_cache'):
-                request._request._embed_cache = {}
-            cache = request._request._embed_cache
-
-            request.parents.setdefault(type(item), {})[item._id] = item
+            cache = get_cache()
+            # Items that embed the same resource (e.g. a shared parent or provider) resolve it once per page
+            _target_key = (v.cls, field_name, tuple(sorted(view_kwargs.items())))
+            if _target_key in cache:
+                return cache[_target_key]
 
-            view_kwargs.update({
-                'request': request,
-                'is_embedded': True,
-            })
-
-            # Setup a view ourselves to avoid all the junk DRF throws in
-            # v is a function that hides everything v.cls is the actual view class
-            view = v.cls()
-            view.args = view_args
-            view.kwargs = view_kwargs
-            view.request = request
-            view.request.parser_context['kwargs'] = view_kwargs
-            view.format_kwarg = view.get_format_suffix(**view_kwargs)
+            view = self._get_embedded_view(v, view_args, view_kwargs, item)
+            request = view.request
 
             if not isinstance(view, ListModelMixin):
                 try:
@@ -104,6 +172,7 @@ class JSONAPIBaseView(generics.GenericAPIView):
             _cache_key = (v.cls, field_name, view.get_serializer_class(), (type(item), item.id))
             if _cache_key in cache:
                 # We already have the result for this embed, return it
+                cache[_target_key] = cache[_cache_key]
                 return cache[_cache_key]
 
             # Cache serializers. to_representation of a serializer should NOT augment it's fields so resetting the context
@@ -134,11 +203,68 @@ class JSONAPIBaseView(generics.GenericAPIView):
 
             # Cache our final result
             cache[_cache_key] = ret
+            cache[_target_key] = ret
 
             return ret
 
+        partial.prefetch = prefetch
         return partial
 
+    # overrides GenericAPIView
+    def paginate_queryset(self, queryset):
+        page = super(JSONAPIBaseView, self).paginate_queryset(queryset)
+        if page and isinstance(queryset, QuerySet) and isinstance(page[0], queryset.model):
+            self.annotate_related_counts(queryset.model, page)
+        return page
+
+    def get_related_count_methods(self):
+        """Return the names of the count methods of the relationship fields whose counts were
+        requested with the ``related_counts`` query param.
+        """
+        if self.kwargs.get('is_embedded'):
+            return set()
+        related_counts = self.request.query_params.get('related_counts', False)
+        if utils.is_falsy(related_counts):
+            return set()
+        requested_fields = None if utils.is_truthy(related_counts) else set(related_counts.split(','))
+
+        count_methods = set()
+        for field_name, field in self.get_serializer_class()._declared_fields.items():
+            if requested_fields is not None and field_name not in requested_fields:
+                continue
+            field = getattr(field, 'field', None) or field
+            for meta in (getattr(field, 'related_meta', None), getattr(field, 'self_meta', None)):
+                count_method = (meta or {}).get('count')
+                if isinstance(count_method, str):
+                    count_methods.add(count_method)
+        return count_methods
+
+    def annotate_related_counts(self, model, page):
+        """Load the requested related counts for every object in ``page`` with one annotated query.
+        The serializer reads the annotated values, falling back to its count methods for counts
+        that have no entry in its ``related_count_annotations``.
+        """
+        available = getattr(self.get_serializer_class(), 'related_count_annotations', {})
+        annotations = {
+            get_related_count_annotation_name(count_method): available[count_method]
+            for count_method in self.get_related_count_methods()
+            if count_method in available
+        }
+        if not annotations:
+            return
+
+        annotation_names = list(annotations.keys())
+        counts = {
+            row[0]: row[1:]
+            for row in model._default_manager.filter(
+                pk__in=[obj.pk for obj in page],
+            ).annotate(**annotations).values_list('pk', *annotation_names)
+        }
+        for obj in page:
+            if obj.pk in counts:
+                for annotation_name, count in zip(annotation_names, counts[obj.pk]):
+                    setattr(obj, annotation_name, count)
+
     def get_serializer_context(self):
         """Inject request into the serializer context. Additionally, inject partial functions
         (request, object -> embed items) if the query string contains embeds.  Allows
@@ -506,12 +632,28 @@ class BaseContributorDetail(JSONAPIBaseView, generics.RetrieveAPIView):
 class BaseContributorList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin):
 
     ordering = ('-modified',)
+    embed_prefetch_kwarg = 'node_id'
 
     def get_default_queryset(self):
         node = self.get_node()
+        prefetched = self.get_prefetched_embed()
+        if prefetched is not None:
+            return prefetched
 
         return node.contributor_set.all().prefetch_related('user__guids')
 
+    # overrides JSONAPIBaseView
+    def bulk_get_embedded(self, keys):
+        contributors = defaultdict(list)
+        queryset = Contributor.objects.filter(
+            node__guids___id__in=keys,
+        ).annotate(
+            node_guid=F('node__guids___id'),
+        ).select_related('node').prefetch_related('user__guids', 'node__guids').order_by('node_id', '_order')
+        for contributor in queryset:
+            contributors[contributor.node_guid].append(contributor)
+        return contributors
+
     def get_queryset(self):
         queryset = self.get_queryset_from_request()
         # If bulk request, queryset only contains contributors in request
@@ -622,53 +764,78 @@ class WaterButlerMixin(object):
         This function mirrors all the actions of get_file_node_from_wb_resp except the create and updates are done in bulk.
         The bulk_update and bulk_create do not call the base class update and create so the actions of those functions are
         done here where needed
+
+        Existing file nodes for the whole listing are loaded with one query. Only new nodes and nodes whose metadata
+        changed are written; the rest just have last_touched bumped.
         """
         node = self.get_node(check_object_permissions=False)
         content_type = ContentType.objects.get_for_model(node)
 
-        objs_to_create = defaultdict(lambda: [])
-        file_objs = []
-
-        for item in files_list:
+        keys = [
+            (item['attributes']['provider'], BaseFileNode.FOLDER if item['attributes']['kind'] == 'folder' else BaseFileNode.FILE)
+            for item in files_list
+        ]
+        resolved_classes = BaseFileNode.resolve_classes(keys)
+        items = []
+        for key, item in zip(keys, files_list):
             attrs = item['attributes']
-            base_class = BaseFileNode.resolve_class(
-                attrs['provider'],
-                BaseFileNode.FOLDER if attrs['kind'] == 'folder'
-                else BaseFileNode.FILE,
-            )
-
             # mirrors BaseFileNode get_or_create
             _path = '/' + attrs['path'].lstrip('/')
-            query = {
-                'target_object_id': node.id,
-                'target_content_type': content_type,
-                '_path': _path,
-            }
-
+            items.append((resolved_classes[key], _path, attrs))
+
+        existing = {}
+        if items:
+            existing_objs = BaseFileNode.objects.filter(
+                target_object_id=node.id,
+                target_content_type=content_type,
+                type__in={base_class._typedmodels_type for base_class in resolved_classes.values()},
+                _path__in={_path for _, _path, _ in items},
+            ).order_by('id')
+            for file_obj in existing_objs:
+                existing.setdefault(self._wb_file_node_key(file_obj), file_obj)
+
+        objs_to_create = defaultdict(list)
+        changed_objs = []
+        touched_ids = []
+        for base_class, _path, attrs in items:
             # Dataverse provides us two sets of files with the same path, so we disambiguate the paths, this
             # preserves legacy behavior by distingishing them by version (Draft/Published).
-            if attrs['provider'] == 'dataverse':
-                query.update({'_history__0__extra__datasetVersion': attrs['extra']['datasetVersion']})
-
-            try:
-                file_obj = base_class.objects.get(**query)
-            except base_class.DoesNotExist:
+            dataset_version = attrs['extra']['datasetVersion'] if attrs['provider'] == 'dataverse' else None
+            file_obj = existing.get((base_class._typedmodels_type, _path, dataset_version))
+            if file_obj is None:
                 # create method on BaseFileNode appends provider, bulk_create bypasses this step so it is added here
                 file_obj = base_class(target=node, _path=_path, provider=base_class._provider)
+                file_obj.update(None, attrs, user=self.request.user, save=False)
                 objs_to_create[base_class].append(file_obj)
-            else:
-                file_objs.append(file_obj)
+                continue
 
+            before = (file_obj.name, file_obj._materialized_path, len(file_obj._history))
             file_obj.update(None, attrs, user=self.request.user, save=False)
+            if (file_obj.name, file_obj._materialized_path, len(file_obj._history)) != before:
+                changed_objs.append(file_obj)
+            else:
+                touched_ids.append(file_obj.id)
 
-        bulk_update(file_objs)
+        if changed_objs:
+            bulk_update(changed_objs, update_fields=['name', '_materialized_path', '_history', 'last_touched'])
+        if touched_ids:
+            BaseFileNode.objects.filter(id__in=touched_ids).update(last_touched=timezone.now())
 
+        file_ids = [file_obj.id for file_obj in changed_objs] + touched_ids
         for base_class in objs_to_create:
             base_class.objects.bulk_create(objs_to_create[base_class])
-            file_objs += objs_to_create[base_class]
+            file_ids += [file_obj.id for file_obj in objs_to_create[base_class]]
 
         # stuff list into QuerySet
-        return BaseFileNode.objects.filter(id__in=[item.id for item in file_objs])
+        return BaseFileNode.objects.filter(id__in=file_ids)
+
+    @staticmethod
+    def _wb_file_node_key(file_obj):
+        """Key matching an existing file node to a wb listing item, see bulk_get_file_nodes_from_wb_resp"""
+        dataset_version = None
+        if file_obj.provider == 'dataverse' and file_obj._history:
+            dataset_version = file_obj._history[0].get('extra', {}).get('datasetVersion')
+        return file_obj.type, file_obj._path, dataset_version
 
     def get_file_node_from_wb_resp(self, item):
         """Takes file data from wb response, touches/updates metadata for it, and returns file object"""
@@ -1,6 +1,7 @@
 from future.moves.urllib.parse import urlparse
-from django.db import connection
+from django.db import connection, transaction
 from django.db.models import Sum
+from django.utils import timezone
 
 import requests
 import logging
@@ -103,33 +104,98 @@ def ban_url(instance):
                     ))
 
 
-@app.task(max_retries=5, default_retry_delay=10)
-def update_storage_usage_cache(target_id, target_guid, per_page=500000):
-    if not settings.ENABLE_STORAGE_USAGE_CACHE:
-        return
+def compute_storage_usages(target_ids):
+    """Sum the sizes of every version of the live osfstorage files of each node in ``target_ids``
+    with one aggregate query
+    :returns: dict mapping each node id to its usage in bytes
+    """
     sql = """
-        SELECT count(size), sum(size) from
-        (SELECT size FROM osf_basefileversionsthrough AS obfnv
-        LEFT JOIN osf_basefilenode file ON obfnv.basefilenode_id = file.id
-        LEFT JOIN osf_fileversion version ON obfnv.fileversion_id = version.id
-        LEFT JOIN django_content_type type on file.target_content_type_id = type.id
+        SELECT file.target_object_id, sum(version.size) FROM osf_basefileversionsthrough AS obfnv
+        JOIN osf_basefilenode file ON obfnv.basefilenode_id = file.id
+        JOIN osf_fileversion version ON obfnv.fileversion_id = version.id
+        JOIN django_content_type type on file.target_content_type_id = type.id
         WHERE file.provider = 'osfstorage'
         AND type.model = 'abstractnode'
         AND file.deleted_on IS NULL
-        AND file.target_object_id=%s
-        ORDER BY version.id
-        LIMIT %s OFFSET %s) file_page
+        AND file.target_object_id = ANY(%s)
+        GROUP BY file.target_object_id
     """
-    count = per_page
-    offset = 0
-    storage_usage_total = 0
+    target_ids = list(target_ids)
+    usages = dict.fromkeys(target_ids, 0)
     with connection.cursor() as cursor:
-        while count:
-            cursor.execute(sql, [target_id, per_page, offset])
-            result = cursor.fetchall()
-            storage_usage_total += int(result[0][1]) if result[0][1] else 0
-            count = int(result[0][0]) if result[0][0] else 0
-            offset += count
+        cursor.execute(sql, [target_ids])
+        for target_id, total in cursor.fetchall():
+            usages[target_id] = int(total) if total else 0
+    return usages
+
+
+def compute_storage_usage(target_id):
+    return compute_storage_usages([target_id])[target_id]
+
+
+def get_storage_usages(nodes, compute_missing=True):
+    """Return the storage usage of many nodes with one cache get_many, one ledger query and,
+    for nodes with neither, one aggregate query whose results are saved to the ledger and cache.
+
+    :param bool compute_missing: If False, nodes with neither a cached nor a ledger usage are
+        left uncalculated (None) and queued for recomputation instead
+    :returns: dict mapping node id to usage in bytes, or None if not calculated
+    """
+    NodeStorageUsage = apps.get_model('osf.NodeStorageUsage')
+    nodes = [node for node in nodes if not node.is_quickfiles]
+    keys = {cache_settings.STORAGE_USAGE_KEY.format(target_id=node._id): node for node in nodes}
+    usages = {node.id: None for node in nodes}
+
+    for key, usage in storage_usage_cache.get_many(list(keys)).items():
+        usages[keys[key].id] = usage
+
+    missing = {node.id: node for node in nodes if usages[node.id] is None}
+    if missing:
+        to_cache = {}
+        for target_id, total in NodeStorageUsage.objects.filter(target_id__in=list(missing)).values_list('target_id', 'total'):
+            usages[target_id] = total
+            to_cache[cache_settings.STORAGE_USAGE_KEY.format(target_id=missing.pop(target_id)._id)] = total
+        if missing and compute_missing and settings.ENABLE_STORAGE_USAGE_CACHE:
+            computed = compute_storage_usages(missing)
+            now = timezone.now()
+            NodeStorageUsage.objects.bulk_create([
+                NodeStorageUsage(target_id=target_id, total=total, modified=now, reconciled=now)
+                for target_id, total in computed.items()
+            ], ignore_conflicts=True)
+            for target_id, total in computed.items():
+                usages[target_id] = total
+                to_cache[cache_settings.STORAGE_USAGE_KEY.format(target_id=missing[target_id]._id)] = total
+        elif missing:
+            for node in missing.values():
+                update_storage_usage(node)
+        storage_usage_cache.set_many(to_cache, settings.STORAGE_USAGE_CACHE_TIMEOUT)
+    return usages
+
+
+def get_storage_limit_statuses(nodes, compute_missing=True):
+    """Return the StorageLimits status of many nodes, see get_storage_usages
+    :returns: dict mapping node id to its status
+    """
+    nodes = list(nodes)
+    usages = get_storage_usages(nodes, compute_missing=compute_missing)
+    return {
+        node.id: settings.StorageLimits.from_node_usage(
+            usages.get(node.id),
+            node.custom_storage_usage_limit_private,
+            node.custom_storage_usage_limit_public,
+        )
+        for node in nodes
+    }
+
+
+@app.task(max_retries=5, default_retry_delay=10)
+def update_storage_usage_cache(target_id, target_guid):
+    if not settings.ENABLE_STORAGE_USAGE_CACHE:
+        return
+    NodeStorageUsage = apps.get_model('osf.NodeStorageUsage')
+
+    storage_usage_total = compute_storage_usage(target_id)
+    NodeStorageUsage.set_total(target_id, storage_usage_total)
 
     key = cache_settings.STORAGE_USAGE_KEY.format(target_id=target_guid)
     storage_usage_cache.set(key, storage_usage_total, settings.STORAGE_USAGE_CACHE_TIMEOUT)
@@ -141,6 +207,35 @@ def update_storage_usage(target):
     if settings.ENABLE_STORAGE_USAGE_CACHE and not isinstance(target, Preprint) and not target.is_quickfiles:
         enqueue_postcommit_task(update_storage_usage_cache, (target.id, target._id,), {}, celery=True)
 
+
+def adjust_storage_usage(target, delta, exact=True):
+    """Add ``delta`` bytes to ``target``'s storage usage ledger and cache.
+
+    A target without a ledger row is seeded from its cached usage, marked stale so it is
+    verified by the next reconciliation. With neither, the usage is recomputed in full.
+    :param bool exact: False if ``delta`` is an estimate, which marks the ledger row stale
+    """
+    NodeStorageUsage = apps.get_model('osf.NodeStorageUsage')
+    key = cache_settings.STORAGE_USAGE_KEY.format(target_id=target._id)
+
+    with transaction.atomic():
+        total = NodeStorageUsage.adjust(target.id, delta, exact=exact)
+        if total is None:
+            cached_usage = storage_usage_cache.get(key)
+            if cached_usage is None:
+                return update_storage_usage(target)
+            _, created = NodeStorageUsage.objects.get_or_create(
+                target_id=target.id,
+                defaults={'total': max(cached_usage + delta, 0), 'stale': True},
+            )
+            if created:
+                total = max(cached_usage + delta, 0)
+            else:
+                total = NodeStorageUsage.adjust(target.id, delta, exact=exact)
+
+    storage_usage_cache.set(key, total, settings.STORAGE_USAGE_CACHE_TIMEOUT)
+
+
 def update_storage_usage_with_size(payload):
     BaseFileNode = apps.get_model('osf.basefilenode')
     AbstractNode = apps.get_model('osf.abstractnode')
@@ -163,18 +258,21 @@ def update_storage_usage_with_size(payload):
     if target_node.storage_limit_status is settings.StorageLimits.NOT_CALCULATED:
         return update_storage_usage(target_node)
 
-    current_usage = target_node.storage_usage
     target_file = BaseFileNode.load(target_file_id)
+    # Sizes from the payload only approximate the stored versions of copied, deleted and moved files
+    exact = action in ['create', 'update']
 
     if target_file and action in ['copy', 'delete', 'move']:
-
-        target_file_size = target_file.versions.aggregate(Sum('size'))['size__sum'] or target_file_size
+        versions_size = target_file.versions.aggregate(Sum('size'))['size__sum']
+        if versions_size:
+            target_file_size = versions_size
+            exact = True
 
     if action in ['create', 'update', 'copy'] and provider == 'osfstorage':
-        current_usage += target_file_size
+        adjust_storage_usage(target_node, target_file_size, exact=exact)
 
     elif action == 'delete' and provider == 'osfstorage':
-        current_usage = max(current_usage - target_file_size, 0)
+        adjust_storage_usage(target_node, -target_file_size, exact=exact)
 
     elif action in 'move':
         source_node = AbstractNode.load(payload['source']['nid'])  # Getting the 'from' node
@@ -186,18 +284,9 @@ def update_storage_usage_with_size(payload):
             if source_node.storage_limit_status is settings.StorageLimits.NOT_CALCULATED:
                 return update_storage_usage(source_node)
 
-            source_node_usage = source_node.storage_usage
-            source_node_usage = max(source_node_usage - target_file_size, 0)
-
-            key = cache_settings.STORAGE_USAGE_KEY.format(target_id=source_node._id)
-            storage_usage_cache.set(key, source_node_usage, settings.STORAGE_USAGE_CACHE_TIMEOUT)
-
-        current_usage += target_file_size
+            adjust_storage_usage(source_node, -target_file_size, exact=exact)
 
         if provider != 'osfstorage':
             return  # We don't want to update the destination node if the provider isn't osfstorage
-    else:
-        return
 
-    key = cache_settings.STORAGE_USAGE_KEY.format(target_id=target_node._id)
-    storage_usage_cache.set(key, current_usage, settings.STORAGE_USAGE_CACHE_TIMEOUT)
+        adjust_storage_usage(target_node, target_file_size, exact=exact)
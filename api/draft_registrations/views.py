@@ -171,6 +171,7 @@ class DraftContributorsList(NodeContributorsList, DraftRegistrationMixin):
     view_category = 'draft_registrations'
     view_name = 'draft-registration-contributors'
     serializer_class = DraftRegistrationContributorsSerializer
+    embed_prefetch_kwarg = None
 
     def get_default_queryset(self):
         # Overrides NodeContributorsList
@@ -1,4 +1,5 @@
 from django.db import connection
+from django.db.models import OuterRef
 from distutils.version import StrictVersion
 
 from api.base.exceptions import (
@@ -18,6 +19,7 @@ from api.base.serializers import (
 )
 from api.base.settings import ADDONS_FOLDER_CONFIGURABLE
 from api.base.utils import (
+    count_subquery,
     absolute_reverse, get_object_or_error,
     get_user_auth, is_truthy,
 )
@@ -38,10 +40,12 @@ from osf.models import (
     Comment, DraftRegistration, ExternalAccount, Institution,
     RegistrationSchema, AbstractNode, PrivateLink, Preprint,
     RegistrationProvider, OSFGroup, NodeLicense, DraftNode,
-    Registration, Node,
+    Registration, Node, NodeLog, NodeRelation, Contributor,
 )
+from addons.wiki.models import WikiPage
 from website.project import new_private_link
 from website.project.model import NodeUpdateError
+from website.settings import StorageLimits
 from osf.utils import permissions as osf_permissions
 
 
@@ -295,6 +299,27 @@ class NodeSerializer(TaxonomizableSerializerMixin, JSONAPISerializer):
         'wikis',
     ]
 
+    # Only counts that do not depend on the requesting user can be annotated
+    related_count_annotations = {
+        'get_logs_count': count_subquery(NodeLog.objects.filter(node=OuterRef('pk'))),
+        'get_contrib_count': count_subquery(Contributor.objects.filter(node=OuterRef('pk'))),
+        'get_pointers_count': count_subquery(NodeRelation.objects.filter(parent=OuterRef('pk'), is_node_link=True)),
+        'get_wiki_page_count': count_subquery(WikiPage.objects.filter(node=OuterRef('pk'), deleted__isnull=True)),
+        'get_forks_count': count_subquery(
+            AbstractNode.objects.filter(forked_from=OuterRef('pk'), is_deleted=False).exclude(type='osf.registration'),
+        ),
+        'get_linked_by_nodes_count': count_subquery(
+            NodeRelation.objects.filter(
+                child=OuterRef('pk'), is_node_link=True, parent__is_deleted=False, parent__type='osf.node',
+            ),
+        ),
+        'get_linked_by_registrations_count': count_subquery(
+            NodeRelation.objects.filter(
+                child=OuterRef('pk'), is_node_link=True, parent__type='osf.registration', parent__retraction__isnull=True,
+            ),
+        ),
+    }
+
     id = IDField(source='_id', read_only=True)
     type = TypeField()
 
@@ -1371,8 +1396,8 @@ class NodeLinksSerializer(JSONAPISerializer):
 
 class NodeStorageSerializer(JSONAPISerializer):
     id = IDField(source='_id', required=True)
-    storage_limit_status = ser.CharField(source='storage_limit_status.name', read_only=True, allow_null=True)
-    storage_usage = ser.CharField(read_only=True, allow_null=True)
+    storage_limit_status = ser.SerializerMethodField()
+    storage_usage = ser.SerializerMethodField()
 
     class Meta:
         type_ = 'node-storage'
@@ -1381,6 +1406,24 @@ class NodeStorageSerializer(JSONAPISerializer):
         'self': 'get_absolute_url',
     })
 
+    def _get_storage_usage(self, obj):
+        # Usages loaded in bulk with api.caching.tasks.get_storage_usages
+        storage_usages = self.context.get('storage_usages') or {}
+        if obj.id in storage_usages:
+            return storage_usages[obj.id]
+        return obj.storage_usage
+
+    def get_storage_usage(self, obj):
+        storage_usage = self._get_storage_usage(obj)
+        return str(storage_usage) if storage_usage is not None else None
+
+    def get_storage_limit_status(self, obj):
+        return StorageLimits.from_node_usage(
+            self._get_storage_usage(obj),
+            obj.custom_storage_usage_limit_private,
+            obj.custom_storage_usage_limit_public,
+        ).name
+
     def get_absolute_url(self, obj):
         return absolute_reverse(
             'nodes:node-storage',
@@ -45,6 +45,7 @@ from api.base.utils import default_node_list_permission_queryset
 from api.base.utils import get_object_or_error, is_bulk_request, get_user_auth, is_truthy
 from api.base.versioning import DRAFT_REGISTRATION_SERIALIZERS_UPDATE_VERSION
 from api.base.views import JSONAPIBaseView
+from api.caching.tasks import get_storage_usages
 from api.base.views import (
     BaseChildrenList,
     BaseContributorDetail,
@@ -153,7 +154,7 @@ from osf.models import (
 )
 from addons.osfstorage.models import Region
 from osf.utils.permissions import ADMIN, WRITE_NODE
-from website import mails, settings
+from website import mails
 
 # This is used to rethrow v1 exceptions as v2
 HTTP_CODE_MAP = {
@@ -612,8 +613,19 @@ class NodeBibliographicContributorsList(BaseContributorList, NodeMixin):
 
     def get_default_queryset(self):
         contributors = super(NodeBibliographicContributorsList, self).get_default_queryset()
+        if isinstance(contributors, list):
+            # Prefetched by bulk_get_embedded, already bibliographic only
+            return contributors
         return contributors.filter(visible=True)
 
+    # overrides BaseContributorList
+    def bulk_get_embedded(self, keys):
+        contributors = super(NodeBibliographicContributorsList, self).bulk_get_embedded(keys)
+        return {
+            key: [contributor for contributor in node_contributors if contributor.visible]
+            for key, node_contributors in contributors.items()
+        }
+
 
 class NodeDraftRegistrationsList(JSONAPIBaseView, generics.ListCreateAPIView, NodeMixin):
     """
@@ -1362,8 +1374,11 @@ class NodeAddonList(JSONAPIBaseView, generics.ListAPIView, ListFilterMixin, Node
 
     def get_default_queryset(self):
         qs = []
+        node = self.get_node()
+        # Loads every addon of the node at once rather than one query per provider
+        node.get_addons()
         for addon in ADDONS_OAUTH:
-            obj = self.get_addon_settings(provider=addon, fail_if_absent=False, check_object_permissions=False)
+            obj = self.get_addon_settings(provider=addon, fail_if_absent=False, check_object_permissions=False, owner=node)
             if obj:
                 qs.append(obj)
         sorted(qs, key=lambda addon: addon.id, reverse=True)
@@ -1776,8 +1791,10 @@ class NodeStorage(JSONAPIBaseView, generics.RetrieveAPIView, NodeMixin):
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
-        serializer = self.get_serializer(instance)
-        if instance.storage_limit_status is settings.StorageLimits.NOT_CALCULATED:
+        storage_usages = get_storage_usages([instance], compute_missing=False)
+        context = dict(self.get_serializer_context(), storage_usages=storage_usages)
+        serializer = self.get_serializer(instance, context=context)
+        if storage_usages.get(instance.id) is None:
             return Response(serializer.data, status=HTTP_202_ACCEPTED)
         else:
             return Response(serializer.data)
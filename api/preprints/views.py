@@ -352,6 +352,7 @@ class PreprintContributorsList(NodeContributorsList, PreprintMixin):
     view_category = 'preprints'
     view_name = 'preprint-contributors'
     serializer_class = PreprintContributorsSerializer
+    embed_prefetch_kwarg = None
 
     def get_default_queryset(self):
         preprint = self.get_preprint()
@@ -273,6 +273,7 @@ class RegistrationContributorsList(BaseContributorList, RegistrationMixin, UserM
 
     pagination_class = NodeContributorPagination
     serializer_class = RegistrationContributorsSerializer
+    ordering = ('_order',)  # default ordering
 
     required_read_scopes = [CoreScopes.NODE_REGISTRATIONS_READ]
     required_write_scopes = [CoreScopes.NODE_REGISTRATIONS_WRITE]
@@ -286,6 +287,9 @@ class RegistrationContributorsList(BaseContributorList, RegistrationMixin, UserM
 
     def get_default_queryset(self):
         node = self.get_node(check_object_permissions=False)
+        prefetched = self.get_prefetched_embed()
+        if prefetched is not None:
+            return prefetched
         return node.contributor_set.all().prefetch_related('user__guids')
 
 
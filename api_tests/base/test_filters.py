@@ -19,6 +19,7 @@ from api.base.filters import ListFilterMixin
 import api.base.filters as filters
 from api.base.exceptions import (
     InvalidFilterError,
+    InvalidFilterFieldError,
     InvalidFilterOperator,
     InvalidFilterComparisonType,
     InvalidFilterMatchType,
@@ -324,6 +325,25 @@ class TestFilterMixin(ApiTestCase):
         with assert_raises(InvalidFilterOperator):
             self.view.parse_query_params(query_params)
 
+    def test_filter_schema_is_compiled_once(self):
+        schema = self.view.get_filter_schema()
+        assert_is(FakeListView().get_filter_schema(), schema)
+        assert_equal(schema.get_field('bool_field').source_field_name, 'foobar')
+        assert_equal(schema.get_field('string_field').default_operator, 'icontains')
+        assert_in('gte', schema.get_field('int_field').allowed_operators)
+        assert_not_in('contains', schema.get_field('int_field').allowed_operators)
+
+    def test_filter_schema_unfilterable_field(self):
+        with assert_raises(InvalidFilterFieldError):
+            self.view.get_filter_schema().get_field('float_field')
+        with assert_raises(InvalidFilterError):
+            self.view.get_filter_schema().get_field('not_a_field')
+
+    def test_parse_filter_key(self):
+        assert_equal(filters.parse_filter_key('filter[name, id][ne]'), (('name', 'id'), 'ne'))
+        assert_equal(filters.parse_filter_key('filter[name]'), (('name',), None))
+        assert_is_none(filters.parse_filter_key('page[size]'))
+
 
 class TestListFilterMixin(ApiTestCase):
 
@@ -400,6 +420,20 @@ class TestListFilterMixin(ApiTestCase):
         assert_equal(parsed_field['value'], False)
         assert_equal(parsed_field['op'], 'eq')
 
+    def test_param_queryset_filters_list_on_every_param(self):
+        default_queryset = [
+            FakeRecord(_id='1', string_field='foo', foobar=True),
+            FakeRecord(_id='2', string_field='food', foobar=False),
+            FakeRecord(_id='3', string_field='bar', foobar=True),
+        ]
+        query_params = {
+            'filter[string_field]': 'FOO',
+            'filter[bool_field]': 'true',
+        }
+        filtered = self.view.param_queryset(query_params, default_queryset)
+        assert_equal([record._id for record in filtered], ['1'])
+
+
 @pytest.mark.django_db
 class TestOSFOrderingFilter(ApiTestCase):
     class query:
@@ -473,6 +507,22 @@ class TestOSFOrderingFilter(ApiTestCase):
             )]
         assert_equal(actual, [40, 30, 10, 20])
 
+    def test_sort_by_fields_handles_multiple_fields(self):
+        objs = [self.query_with_num(title='NewProj', number=10),
+                self.query_with_num(title='Zip', number=20),
+                self.query_with_num(title='Activity', number=30),
+                self.query_with_num(title='Activity', number=40)]
+        actual = [x.number for x in filters.sort_by_fields(objs, ['title', '-number'])]
+        assert_equal(actual, [40, 30, 10, 20])
+
+        actual = [x.number for x in filters.sort_by_fields(objs, ['-title', 'number'])]
+        assert_equal(actual, [20, 10, 30, 40])
+
+    def test_sort_by_fields_puts_none_last(self):
+        objs = [self.query(title=None), self.query(title='Zip'), self.query(title='Activity')]
+        assert_equal([x.title for x in filters.sort_by_fields(objs, ['title'])], ['Activity', 'Zip', None])
+        assert_equal([x.title for x in filters.sort_by_fields(objs, ['-title'])], ['Zip', 'Activity', None])
+
     def get_node_sort_url(self, field, ascend=True):
         if not ascend:
             field = '-' + field
@@ -1,11 +1,15 @@
 # -*- coding: utf-8 -*-
+import datetime
+
+import pytz
 from nose.tools import *  # noqa:
 
 from osf_tests import factories
 from tests.base import ApiTestCase
 
 from api.base import settings
-from api.base.pagination import MaxSizePagination
+from api.base.pagination import JSONAPIPagination, MaxSizePagination
+from osf.models import AbstractNode
 
 
 class TestMaxPagination(ApiTestCase):
@@ -54,3 +58,82 @@ class TestJSONAPIPagination(ApiTestCase):
         assert_not_in('meta', links)
         assert_in('total', meta)
         assert_in('per_page', meta)
+
+
+class TestJSONAPICursorPagination(ApiTestCase):
+
+    def setUp(self):
+        super(TestJSONAPICursorPagination, self).setUp()
+
+        self.url = '/{}users/me/nodes/?version=2.1&page[size]=4&page[cursor]='.format(settings.API_BASE)
+        self.user = factories.AuthUserFactory()
+
+        self.projects = [factories.ProjectFactory(creator=self.user) for i in range(0, 11)]
+
+    def test_cursor_pagination_walks_all_pages(self):
+        ids = []
+        url = self.url
+        pages = 0
+        while url:
+            res = self.app.get(url, auth=self.user.auth)
+            assert_equal(res.status_code, 200)
+            assert_not_in('total', res.json['meta'])
+            assert_equal(res.json['meta']['per_page'], 4)
+            ids.extend(node['id'] for node in res.json['data'])
+            url = res.json['links']['next']
+            pages += 1
+
+        assert_equal(pages, 3)
+        assert_equal(len(ids), len(set(ids)))
+        assert_equal(set(ids), set(project._id for project in self.projects))
+
+    def test_cursor_pagination_keeps_microseconds(self):
+        # Timestamps that only differ below the millisecond
+        base = datetime.datetime(2020, 1, 1, tzinfo=pytz.utc)
+        for i, project in enumerate(self.projects):
+            AbstractNode.objects.filter(pk=project.pk).update(last_logged=base + datetime.timedelta(microseconds=i))
+
+        ids = []
+        url = self.url
+        while url:
+            res = self.app.get(url, auth=self.user.auth)
+            assert_equal(res.status_code, 200)
+            ids.extend(node['id'] for node in res.json['data'])
+            url = res.json['links']['next']
+
+        assert_equal(ids, [project._id for project in reversed(self.projects)])
+
+    def test_cursor_pagination_prev_link(self):
+        first_page = self.app.get(self.url, auth=self.user.auth)
+        assert_is_none(first_page.json['links']['prev'])
+
+        second_page = self.app.get(first_page.json['links']['next'], auth=self.user.auth)
+        assert_is_not_none(second_page.json['links']['prev'])
+
+        res = self.app.get(second_page.json['links']['prev'], auth=self.user.auth)
+        assert_equal(
+            [node['id'] for node in res.json['data']],
+            [node['id'] for node in first_page.json['data']],
+        )
+
+    def test_cursor_pagination_total_on_request(self):
+        res = self.app.get(self.url + '&meta[total]=true', auth=self.user.auth)
+        assert_equal(res.json['meta']['total'], 11)
+
+    def test_invalid_cursor(self):
+        res = self.app.get(self.url + 'notacursor', auth=self.user.auth, expect_errors=True)
+        assert_equal(res.status_code, 404)
+
+    def test_get_cursor_ordering(self):
+        paginator = JSONAPIPagination()
+        nodes = AbstractNode.objects.all()
+        assert_equal(paginator.get_cursor_ordering(nodes.order_by('-modified')), ('modified', True))
+        assert_equal(paginator.get_cursor_ordering(nodes.order_by('-modified', '-id')), ('modified', True))
+        assert_equal(paginator.get_cursor_ordering(nodes.order_by('-id', 'title')), ('pk', True))
+        assert_is_none(paginator.get_cursor_ordering(nodes.order_by('-modified', 'id')))
+        assert_is_none(paginator.get_cursor_ordering(nodes.order_by('title', '-modified')))
+        assert_is_none(paginator.get_cursor_ordering(nodes.order_by('creator__fullname')))
+        assert_is_none(paginator.get_cursor_ordering(nodes.order_by('?')))
+        # Those lists keep page number pagination rather than changing order under a cursor
+        assert_true(paginator.supports_cursor(nodes.order_by('-modified')))
+        assert_false(paginator.supports_cursor(nodes.order_by('title', '-modified')))
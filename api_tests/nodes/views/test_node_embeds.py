@@ -155,3 +155,32 @@ class TestNodeEmbeds:
         res = app.get(url, auth=write_contrib_one.auth)
         assert res.status_code == 200
         assert res.json['data']['embeds']['contributors']['meta']['total_bibliographic'] == 3
+
+    def test_node_list_embeds_contributors_per_node(
+            self, app, user, write_contribs, root_node,
+            child_one, child_two):
+        url = '/{}nodes/?filter[id]={},{},{}&embed=contributors&embed=bibliographic_contributors'.format(
+            API_BASE, root_node._id, child_one._id, child_two._id)
+
+        res = app.get(url, auth=user.auth)
+        assert res.status_code == 200
+        embeds = {node['id']: node['embeds'] for node in res.json['data']}
+        for node in (root_node, child_one, child_two):
+            expected_ids = [
+                '{}-{}'.format(node._id, contrib._id) for contrib in node.contributors
+            ]
+            contributors = embeds[node._id]['contributors']['data']
+            bibliographic_contributors = embeds[node._id]['bibliographic_contributors']['data']
+            assert [contrib['id'] for contrib in contributors] == expected_ids
+            assert [contrib['id'] for contrib in bibliographic_contributors] == expected_ids
+            assert embeds[node._id]['contributors']['links']['meta']['total'] == len(expected_ids)
+
+    def test_node_list_embeds_shared_parent(
+            self, app, user, root_node, child_one, child_two):
+        url = '/{}nodes/?filter[parent]={}&embed=parent'.format(API_BASE, root_node._id)
+
+        res = app.get(url, auth=user.auth)
+        assert res.status_code == 200
+        assert len(res.json['data']) == 2
+        for node in res.json['data']:
+            assert node['embeds']['parent']['data']['id'] == root_node._id
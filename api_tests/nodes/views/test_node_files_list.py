@@ -8,7 +8,7 @@ from nose.tools import *  # noqa:
 
 from framework.auth.core import Auth
 
-from addons.github.models import GithubFolder
+from addons.github.models import GithubFile, GithubFolder
 from addons.github.tests.factories import GitHubAccountFactory
 from addons.osfstorage.tests.factories import FileVersionFactory
 from api.base.settings.defaults import API_BASE
@@ -302,6 +302,25 @@ class TestNodeFilesList(ApiTestCase):
         assert_equal(res.json['data'][0]['attributes']['name'], 'NewFile')
         assert_equal(res.json['data'][0]['attributes']['provider'], 'github')
 
+    @responses.activate
+    def test_node_files_list_reconciles_existing_files(self):
+        existing = GithubFile(name='OldName', target=self.project, path='/NewFile')
+        existing.save()
+        self._prepare_mock_wb_response(
+            provider='github', files=[{'name': 'NewFile'}, {'name': 'Other', 'path': '/Other'}])
+        self.add_github()
+        url = '/{}nodes/{}/files/github/'.format(API_BASE, self.project._id)
+
+        res = self.app.get(url, auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(
+            sorted(each['attributes']['name'] for each in res.json['data']),
+            ['NewFile', 'Other']
+        )
+        existing.reload()
+        assert_equal(existing.name, 'NewFile')
+        assert_equal(GithubFile.objects.filter(target_object_id=self.project.id, _path='/NewFile').count(), 1)
+
     @responses.activate
     def test_returns_folder_metadata_not_children(self):
         folder = GithubFolder(
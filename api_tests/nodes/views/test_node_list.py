@@ -323,6 +323,24 @@ class TestNodeList:
         assert res.json['data'][0]['attributes']['current_user_is_contributor'] is False
         assert res.json['data'][0]['attributes']['current_user_is_contributor_or_group_member'] is False
 
+    def test_node_list_related_counts(self, app, user, non_contrib, public_project, url):
+        public_project.add_contributor(non_contrib, auth=Auth(user), save=True)
+        public_project.fork_node(Auth(user))
+        other_project = ProjectFactory(is_public=True, creator=user)
+
+        res = app.get(
+            '{}?filter[id]={},{}&related_counts=contributors,logs,forks'.format(url, public_project._id, other_project._id),
+            auth=user.auth,
+        )
+        assert res.status_code == 200
+        relationships = {node['id']: node['relationships'] for node in res.json['data']}
+        for node in (public_project, other_project):
+            node_relationships = relationships[node._id]
+            assert node_relationships['contributors']['links']['related']['meta']['count'] == len(node.contributors)
+            assert node_relationships['logs']['links']['related']['meta']['count'] == node.logs.count()
+            assert node_relationships['forks']['links']['related']['meta']['count'] == node.forks.filter(is_deleted=False).count()
+            assert 'count' not in node_relationships['linked_by_nodes']['links']['related']['meta']
+
 
 @pytest.mark.django_db
 @pytest.mark.enable_bookmark_creation
@@ -113,6 +113,17 @@ class TestRegistrationList(ApiTestCase):
             res.json['data']['embeds']['contributors']['links']['meta']['total_bibliographic'], 2
         )
 
+    def test_registration_list_embed_contributors(self):
+        self.public_registration_project.add_contributor(self.user_two, auth=Auth(self.user), save=True)
+        res = self.app.get('{}?embed=contributors'.format(self.url), auth=self.user.auth)
+        assert_equal(res.status_code, 200)
+        assert_equal(len(res.json['data']), 2)
+        for registration in res.json['data']:
+            assert_not_in('errors', registration['embeds']['contributors'])
+        public = next(each for each in res.json['data'] if each['id'] == self.public_registration_project._id)
+        contributor_ids = [each['embeds']['users']['data']['id'] for each in public['embeds']['contributors']['data']]
+        assert_equal(contributor_ids, [self.user._id, self.user_two._id])
+
     def test_exclude_nodes_from_registrations_endpoint(self):
         res = self.app.get(self.url, auth=self.user.auth)
         ids = [each['id'] for each in res.json['data']]
@@ -7,9 +7,13 @@ import threading
 import binascii
 from collections import OrderedDict
 import os
+import time
 
+from celery import group
 from celery.canvas import Signature
 from celery.local import PromiseProxy
+from django.conf import settings as django_settings
+from gevent.lock import BoundedSemaphore
 from gevent.pool import Pool
 from flask import _app_ctx_stack as context_stack
 
@@ -18,6 +22,11 @@ from website import settings
 _local = threading.local()
 logger = logging.getLogger(__name__)
 
+# Per-task timing and failure counts, keyed by task name. See get_postcommit_stats
+_stats = {}
+_stats_lock = threading.Lock()
+_connection_budget = None
+
 def postcommit_queue():
     if not hasattr(_local, 'postcommit_queue'):
         _local.postcommit_queue = OrderedDict()
@@ -39,17 +48,22 @@ def postcommit_after_request(response, base_status_error_code=500):
         return response
     try:
         if postcommit_queue():
-            number_of_threads = 30  # one db connection per greenlet, let's share
-            pool = Pool(number_of_threads)
-            for func in postcommit_queue().values():
-                pool.spawn(func)
-            pool.join(timeout=5.0, raise_error=True)  # 5 second timeout and reraise exceptions
+            pool = Pool(get_postcommit_concurrency())
+            greenlets = [
+                (get_task_name(func), pool.spawn(run_postcommit_task, func))
+                for func in postcommit_queue().values()
+            ]
+            pool.join(timeout=settings.POSTCOMMIT_TIMEOUT, raise_error=True)  # reraise exceptions
+            for name, greenlet in greenlets:
+                if not greenlet.ready():
+                    logger.warning('Postcommit task {} still running after {}s'.format(name, settings.POSTCOMMIT_TIMEOUT))
 
         if postcommit_celery_queue():
             if settings.USE_CELERY:
-                for task_dict in postcommit_celery_queue().values():
-                    task = Signature.from_dict(task_dict)
-                    task.apply_async()
+                tasks = [Signature.from_dict(task_dict) for task_dict in postcommit_celery_queue().values()]
+                start = time.time()
+                group(tasks).apply_async()
+                record_task_run('celery.group', time.time() - start)
             else:
                 for task in postcommit_celery_queue().values():
                     task()
@@ -59,6 +73,62 @@ def postcommit_after_request(response, base_status_error_code=500):
             logger.error('Post commit task queue not initialized: {}'.format(ex))
     return response
 
+def get_postcommit_concurrency():
+    """Number of postcommit functions that may run at once. Each may hold a database
+    connection, so this never exceeds the connection pool size when one is configured.
+    """
+    max_conns = django_settings.DATABASES['default'].get('OPTIONS', {}).get('MAX_CONNS')
+    if max_conns:
+        return min(settings.POSTCOMMIT_MAX_CONCURRENCY, max_conns)
+    return settings.POSTCOMMIT_MAX_CONCURRENCY
+
+def get_connection_budget():
+    """Semaphore shared by every request in the process, so that concurrent postcommit
+    flushes together stay within the connection budget.
+    """
+    global _connection_budget
+    if _connection_budget is None:
+        _connection_budget = BoundedSemaphore(get_postcommit_concurrency())
+    return _connection_budget
+
+def get_task_name(task):
+    if isinstance(task, Signature):
+        return task.task
+    func = getattr(task, 'func', task)
+    return '{}.{}'.format(getattr(func, '__module__', None), getattr(func, '__name__', repr(func)))
+
+def record_task_run(name, duration, failed=False):
+    with _stats_lock:
+        stats = _stats.setdefault(name, {'calls': 0, 'failures': 0, 'total_time': 0.0, 'max_time': 0.0})
+        stats['calls'] += 1
+        stats['failures'] += int(failed)
+        stats['total_time'] += duration
+        stats['max_time'] = max(stats['max_time'], duration)
+    if duration >= settings.POSTCOMMIT_SLOW_TASK_THRESHOLD:
+        logger.warning('Postcommit task {} took {:.2f}s'.format(name, duration))
+
+def get_postcommit_stats():
+    """Return a snapshot of call counts, failure counts and durations for each postcommit task
+    run by this process, e.g. ``{'website.project.tasks.on_node_updated': {'calls': 3, ...}}``.
+    """
+    with _stats_lock:
+        return {name: dict(stats) for name, stats in _stats.items()}
+
+def reset_postcommit_stats():
+    with _stats_lock:
+        _stats.clear()
+
+def run_postcommit_task(func):
+    name = get_task_name(func)
+    with get_connection_budget():
+        start = time.time()
+        try:
+            func()
+        except Exception:
+            record_task_run(name, time.time() - start, failed=True)
+            raise
+        record_task_run(name, time.time() - start)
+
 def get_task_from_postcommit_queue(name, predicate, celery=True):
     queue = postcommit_celery_queue() if celery else postcommit_queue()
     matches = [task for key, task in queue.items() if task.type.name == name and predicate(task)]
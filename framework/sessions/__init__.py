@@ -14,6 +14,7 @@ from werkzeug.local import LocalProxy
 from framework.celery_tasks.handlers import enqueue_task
 from osf.utils.fields import ensure_str
 from framework.flask import redirect
+from framework.sessions.backends import get_session_backend
 from framework.sessions.utils import remove_session
 from website import settings
 
@@ -160,7 +161,7 @@ def before_request():
     if cookie:
         try:
             session_id = ensure_str(itsdangerous.Signer(settings.SECRET_KEY).unsign(cookie))
-            user_session = Session.load(session_id) or Session(_id=session_id)
+            user_session = get_session_backend().load(session_id) or Session(_id=session_id)
         except itsdangerous.BadData:
             return None
         if not throttle_period_expired(user_session.created, settings.OSF_SESSION_TIMEOUT):
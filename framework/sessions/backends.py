@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""Storage backends for ``osf.models.Session``.
+
+The backend is chosen with ``settings.SESSION_BACKEND``. ``'db'`` reads and writes every
+session from Postgres. ``'cache'`` serves sessions from the Django cache named by
+``SESSION_CACHE_NAME`` and falls back to Postgres on a miss. Writes are held in the cache
+and copied to Postgres only when a session is created, when its authenticated user
+changes, or when the database copy is older than ``SESSION_WRITE_BEHIND_INTERVAL``, so
+the database always knows which sessions belong to which user.
+"""
+import time
+
+from django.apps import apps
+from django.conf import settings as django_settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from website import settings
+
+
+class DatabaseSessionBackend(object):
+
+    def load(self, session_id):
+        Session = apps.get_model('osf.Session')
+        return Session.load(session_id)
+
+    def save(self, session):
+        session.save_to_database()
+
+    def delete(self, session):
+        Session = apps.get_model('osf.Session')
+        Session.objects.filter(id=session.id).delete()
+
+    def delete_for_user(self, user_id):
+        Session = apps.get_model('osf.Session')
+        Session.objects.filter(data__auth_user_id=user_id).delete()
+
+
+class CacheSessionBackend(DatabaseSessionBackend):
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def get_cache_key(self, session_id):
+        return 'session:{}'.format(session_id)
+
+    def load(self, session_id):
+        session = self.cache.get(self.get_cache_key(session_id))
+        if session is None:
+            session = super(CacheSessionBackend, self).load(session_id)
+            if session is not None:
+                self._mark_synced(session)
+                self._set(session)
+        return session
+
+    def save(self, session):
+        if self._needs_database_write(session):
+            session.save_to_database()
+            self._mark_synced(session)
+        else:
+            session.modified = timezone.now()
+        self._set(session)
+
+    def delete(self, session):
+        self.cache.delete(self.get_cache_key(session._id))
+        super(CacheSessionBackend, self).delete(session)
+
+    def delete_for_user(self, user_id):
+        Session = apps.get_model('osf.Session')
+        sessions = Session.objects.filter(data__auth_user_id=user_id)
+        self.cache.delete_many([self.get_cache_key(_id) for _id in sessions.values_list('_id', flat=True)])
+        sessions.delete()
+
+    def _set(self, session):
+        self.cache.set(self.get_cache_key(session._id), session, timeout=settings.OSF_SESSION_TIMEOUT)
+
+    def _mark_synced(self, session):
+        session.synced_at = time.time()
+        session.synced_user_id = session.data.get('auth_user_id')
+
+    def _needs_database_write(self, session):
+        synced_at = getattr(session, 'synced_at', None)
+        return (
+            session.pk is None or
+            synced_at is None or
+            session.data.get('auth_user_id') != session.synced_user_id or
+            time.time() - synced_at >= settings.SESSION_WRITE_BEHIND_INTERVAL
+        )
+
+
+def get_session_backend():
+    if settings.SESSION_BACKEND == 'cache':
+        return CacheSessionBackend(caches[django_settings.SESSION_CACHE_NAME])
+    return DatabaseSessionBackend()
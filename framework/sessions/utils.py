@@ -8,18 +8,18 @@ def remove_sessions_for_user(user):
     :param user: User
     :return:
     """
-    from osf.models import Session
+    from framework.sessions.backends import get_session_backend
 
     if user._id:
-        Session.objects.filter(data__auth_user_id=user._id).delete()
+        get_session_backend().delete_for_user(user._id)
 
 
 def remove_session(session):
     """
-    Remove a session from database
+    Remove a session from the session store
 
     :param session: Session
     :return:
     """
-    from osf.models import Session
-    Session.objects.filter(id=session.id).delete()
+    from framework.sessions.backends import get_session_backend
+    get_session_backend().delete(session)
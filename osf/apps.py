@@ -65,3 +65,7 @@ class AppConfig(BaseAppConfig):
             update_storage_regions,
             dispatch_uid='osf.apps.update_storage_regions'
         )
+
+        # Every addon's file node classes are loaded by now
+        from osf.models import BaseFileNode
+        BaseFileNode.get_class_registry()
@@ -0,0 +1,119 @@
+# -*- coding: utf-8 -*-
+"""Rebuild the node closure table from NodeRelation, or report where the two disagree."""
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from osf.models import NodeClosure, NodeRelation
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+# Rows missing from, or unexpected in, osf_nodeclosure compared to what NodeRelation implies
+CLOSURE_MISMATCH_SQL = """
+    WITH RECURSIVE pairs AS (
+      SELECT
+        parent_id AS ancestor_id,
+        child_id AS descendant_id,
+        1 AS depth,
+        ARRAY[child_id] AS cids
+      FROM osf_noderelation
+      WHERE is_node_link IS FALSE
+      UNION ALL
+      SELECT
+        R.parent_id,
+        P.descendant_id,
+        P.depth + 1,
+        P.cids || R.child_id
+      FROM pairs AS P
+        JOIN osf_noderelation AS R
+          ON P.ancestor_id = R.child_id
+      WHERE R.is_node_link IS FALSE
+        AND NOT R.parent_id = ANY(P.cids)
+    ), expected AS (
+      SELECT DISTINCT ON (ancestor_id, descendant_id) ancestor_id, descendant_id, depth
+      FROM pairs
+      ORDER BY ancestor_id, descendant_id, depth
+    ), stored AS (
+      SELECT ancestor_id, descendant_id, depth FROM osf_nodeclosure
+    )
+    SELECT 'missing', M.* FROM (SELECT * FROM expected EXCEPT SELECT * FROM stored) AS M
+    UNION ALL
+    SELECT 'unexpected', U.* FROM (SELECT * FROM stored EXCEPT SELECT * FROM expected) AS U;
+"""
+
+
+def get_top_level_ids():
+    """Ids of nodes that have primary children but no primary parent"""
+    child_ids = NodeRelation.objects.filter(is_node_link=False).values('child_id')
+    return NodeRelation.objects.filter(
+        is_node_link=False,
+    ).exclude(
+        parent_id__in=child_ids,
+    ).order_by('parent_id').values_list('parent_id', flat=True).distinct()
+
+
+def backfill_node_closure():
+    """Rebuild the closure rows of every tree, and drop rows for nodes that no longer
+    have a primary parent.
+
+    :return int: Number of rows written
+    """
+    child_ids = NodeRelation.objects.filter(is_node_link=False).values('child_id')
+    deleted, _ = NodeClosure.objects.exclude(descendant_id__in=child_ids).delete()
+    if deleted:
+        logger.info('Removed {} rows for nodes without a parent'.format(deleted))
+    total = 0
+    for i, root_id in enumerate(get_top_level_ids().iterator(), 1):
+        total += NodeClosure.rebuild(root_id)
+        if i % 1000 == 0:
+            logger.info('Rebuilt {} trees, {} rows'.format(i, total))
+    logger.info('Wrote {} node closure rows'.format(total))
+    return total
+
+
+def find_closure_mismatches(limit=100):
+    """Compare the closure table with NodeRelation.
+
+    :return list: ``(kind, ancestor_id, descendant_id, depth)`` for every mismatched row
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(CLOSURE_MISMATCH_SQL)
+        mismatches = cursor.fetchall()
+    for kind, ancestor_id, descendant_id, depth in mismatches[:limit]:
+        logger.warning('{} node closure row: ancestor={} descendant={} depth={}'.format(kind, ancestor_id, descendant_id, depth))
+    logger.info('{} mismatched node closure rows found'.format(len(mismatches)))
+    return mismatches
+
+
+class Command(BaseCommand):
+    """
+    Backfill or check osf_nodeclosure against osf_noderelation.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--dry',
+            action='store_true',
+            dest='dry_run',
+            help='Run backfill and roll back changes to db',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            dest='check',
+            help='Only report rows that are missing or unexpected',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run', False)
+        if options.get('check'):
+            find_closure_mismatches()
+            return
+        if not dry_run:
+            script_utils.add_file_logger(logger, __file__)
+        with transaction.atomic():
+            backfill_node_closure()
+            if dry_run:
+                raise RuntimeError('Dry run, transaction rolled back.')
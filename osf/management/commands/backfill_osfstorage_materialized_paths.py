@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""Store materialized paths on OsfStorage file nodes that predate persisted paths, and
+check stored paths against the ones computed from the parent chain.
+"""
+import logging
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from addons.osfstorage.models import OsfStorageFileNode, OsfStorageFolder
+from scripts import utils as script_utils
+
+logger = logging.getLogger(__name__)
+
+
+def backfill_materialized_paths(batch_size=1000):
+    """Rewrite the stored paths below every OsfStorage root folder, one root at a time.
+
+    :return int: Number of file nodes updated
+    """
+    roots = OsfStorageFolder.objects.filter(is_root=True).order_by('id')
+    total = 0
+    for i, root in enumerate(roots.iterator(chunk_size=batch_size), 1):
+        with transaction.atomic():
+            root_path = root.build_materialized_path()
+            if root._materialized_path != root_path:
+                OsfStorageFolder.objects.filter(id=root.id).update(_materialized_path=root_path)
+                root._materialized_path = root_path
+                total += 1
+            total += root.update_descendant_paths()
+        if i % batch_size == 0:
+            logger.info('Backfilled {} root folders, {} file nodes'.format(i, total))
+    logger.info('Backfilled {} file nodes'.format(total))
+    return total
+
+
+def verify_materialized_paths(sample_size=None):
+    """Compare stored paths with the paths computed from the parent chain.
+
+    :return list: ``_id``s of the file nodes whose stored path is wrong
+    """
+    file_nodes = OsfStorageFileNode.objects.exclude(_materialized_path='').exclude(_materialized_path=None).order_by('?' if sample_size else 'id')
+    if sample_size:
+        file_nodes = file_nodes[:sample_size]
+    mismatched = []
+    for file_node in file_nodes.iterator():
+        expected = file_node.compute_materialized_path_from_db()
+        if file_node._materialized_path != expected:
+            logger.warning('{} has materialized path {!r}, expected {!r}'.format(file_node._id, file_node._materialized_path, expected))
+            mismatched.append(file_node._id)
+    logger.info('{} mismatched materialized paths found'.format(len(mismatched)))
+    return mismatched
+
+
+class Command(BaseCommand):
+    """
+    Backfill or verify OsfStorageFileNode._materialized_path.
+    """
+    def add_arguments(self, parser):
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            '--dry',
+            action='store_true',
+            dest='dry_run',
+            help='Run backfill and roll back changes to db',
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            dest='verify',
+            help='Check stored paths instead of writing them',
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            dest='sample_size',
+            default=None,
+            help='With --verify, only check this many randomly chosen file nodes',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            dest='batch_size',
+            default=1000,
+            help='Number of root folders loaded at a time',
+        )
+
+    def handle(self, *args, **options):
+        dry_run = options.get('dry_run', False)
+        if options.get('verify'):
+            verify_materialized_paths(sample_size=options.get('sample_size'))
+            return
+        if not dry_run:
+            script_utils.add_file_logger(logger, __file__)
+        with transaction.atomic():
+            backfill_materialized_paths(batch_size=options.get('batch_size'))
+            if dry_run:
+                raise RuntimeError('Dry run, transaction rolled back.')
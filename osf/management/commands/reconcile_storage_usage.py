@@ -0,0 +1,53 @@
+import logging
+
+from django.core.management.base import BaseCommand
+
+from api.caching.tasks import update_storage_usage_cache
+from framework.celery_tasks import app as celery_app
+from osf.models import NodeStorageUsage
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+
+
+@celery_app.task(name='management.commands.reconcile_storage_usage')
+def reconcile_storage_usage(batch_size=BATCH_SIZE, dry_run=False):
+    """Recompute the storage usage of nodes whose ledger total is marked stale."""
+    stale = NodeStorageUsage.objects.filter(stale=True).select_related('target').order_by('target_id')
+    logger.info('{} stale storage usage totals'.format(stale.count()))
+    if dry_run:
+        return
+
+    reconciled = 0
+    last_id = 0
+    while True:
+        batch = list(stale.filter(target_id__gt=last_id)[:batch_size])
+        if not batch:
+            break
+        for ledger in batch:
+            update_storage_usage_cache(ledger.target_id, ledger.target._id)
+        reconciled += len(batch)
+        last_id = batch[-1].target_id
+    logger.info('Reconciled {} storage usage totals'.format(reconciled))
+
+
+class Command(BaseCommand):
+    help = '''Recomputes the storage usage of nodes whose ledger total may have drifted from their files'''
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry',
+            action='store_true',
+            dest='dry_run',
+            help='Only count the stale totals',
+        )
+        parser.add_argument(
+            '--batch_size',
+            type=int,
+            default=BATCH_SIZE,
+            help='How many nodes to load at a time',
+        )
+
+    def handle(self, *args, **options):
+        reconcile_storage_usage(batch_size=options['batch_size'], dry_run=options['dry_run'])
@@ -11,16 +11,26 @@ logger = logging.getLogger(__name__)
 logging.basicConfig(level=logging.INFO)
 
 
+def load_nodes(targets):
+    """Load every node listed in ``targets`` with one query, keyed by guid"""
+    node_ids = set()
+    for n_dict in targets.values():
+        node_ids.update(n_dict.get('private', []))
+        node_ids.update(n_dict.get('public', []))
+    nodes = Node.objects.filter(guids___id__in=node_ids).prefetch_related('guids')
+    return {n._id: n for n in nodes}
+
 def obj_gen(targets):
+    nodes = load_nodes(targets)
     for u_id, n_dict in targets.items():
         try:
             u = OSFUser.load(u_id)
-            priv = [n for n in [Node.load(n_id) for n_id in n_dict.get('private', [])] if not n.is_public]
+            priv = [n for n in [nodes[n_id] for n_id in n_dict.get('private', [])] if not n.is_public]
             pub = []
             for n_id in n_dict.get('public', []):
                 # Add previously-public nodes to private list, as 50>5.
                 # Do not do the reverse.
-                n = Node.load(n_id)
+                n = nodes[n_id]
                 if n.is_public:
                     pub.append(n)
                 else:
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.15 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Every ancestor/descendant pair reachable through primary NodeRelations
+BACKFILL_NODE_CLOSURE = """
+WITH RECURSIVE pairs AS (
+  SELECT
+    parent_id AS ancestor_id,
+    child_id AS descendant_id,
+    1 AS depth,
+    ARRAY[child_id] AS cids
+  FROM osf_noderelation
+  WHERE is_node_link IS FALSE
+  UNION ALL
+  SELECT
+    R.parent_id,
+    P.descendant_id,
+    P.depth + 1,
+    P.cids || R.child_id
+  FROM pairs AS P
+    JOIN osf_noderelation AS R
+      ON P.ancestor_id = R.child_id
+  WHERE R.is_node_link IS FALSE
+    AND NOT R.parent_id = ANY(P.cids)
+)
+INSERT INTO osf_nodeclosure (ancestor_id, descendant_id, depth)
+SELECT DISTINCT ON (ancestor_id, descendant_id) ancestor_id, descendant_id, depth
+FROM pairs
+ORDER BY ancestor_id, descendant_id, depth;
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0006_collections_moderation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeClosure',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('depth', models.PositiveIntegerField()),
+                ('ancestor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='_descendant_closures', to='osf.abstractnode')),
+                ('descendant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='_ancestor_closures', to='osf.abstractnode')),
+            ],
+            options={
+                'unique_together': {('ancestor', 'descendant')},
+                'index_together': {('descendant', 'depth')},
+            },
+        ),
+        migrations.RunSQL(BACKFILL_NODE_CLOSURE, migrations.RunSQL.noop),
+    ]
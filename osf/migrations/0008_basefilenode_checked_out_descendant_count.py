@@ -0,0 +1,18 @@
+# Generated by Django 3.2.15 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0007_nodeclosure'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='basefilenode',
+            name='checked_out_descendant_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+    ]
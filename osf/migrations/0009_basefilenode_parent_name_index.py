@@ -0,0 +1,17 @@
+# Generated by Django 3.2.15 on 2026-10-18 13:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0008_basefilenode_checked_out_descendant_count'),
+    ]
+
+    operations = [
+        migrations.AlterIndexTogether(
+            name='basefilenode',
+            index_together={('target_content_type', 'target_object_id'), ('parent', 'name', 'id')},
+        ),
+    ]
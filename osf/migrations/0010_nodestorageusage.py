@@ -0,0 +1,26 @@
+# Generated by Django 3.2.15 on 2026-10-18 14:10
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+import osf.utils.fields
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('osf', '0009_basefilenode_parent_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NodeStorageUsage',
+            fields=[
+                ('target', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='storage_usage_ledger', serialize=False, to='osf.abstractnode')),
+                ('total', models.BigIntegerField(default=0)),
+                ('stale', models.BooleanField(db_index=True, default=False)),
+                ('modified', osf.utils.fields.NonNaiveDateTimeField(default=django.utils.timezone.now)),
+                ('reconciled', osf.utils.fields.NonNaiveDateTimeField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -38,7 +38,7 @@ from osf.models.files import (  # noqa
     FileVersion, TrashedFile, TrashedFileNode, TrashedFolder, FileVersionUserMetadata,  # noqa
 )  # noqa
 from osf.models.metadata import FileMetadataRecord  # noqa
-from osf.models.node_relation import NodeRelation  # noqa
+from osf.models.node_relation import NodeRelation, NodeClosure  # noqa
 from osf.models.analytics import UserActivityCounter, PageCounter  # noqa
 from osf.models.admin_profile import AdminProfile  # noqa
 from osf.models.admin_log_entry import AdminLogEntry  # noqa
@@ -49,6 +49,7 @@ from osf.models.dismissed_alerts import DismissedAlert  # noqa
 from osf.models.action import ReviewAction  # noqa
 from osf.models.action import NodeRequestAction, PreprintRequestAction, ReviewAction, RegistrationAction, SchemaResponseAction, BaseAction, CollectionSubmissionAction  # noqa
 from osf.models.storage import ProviderAssetFile  # noqa
+from osf.models.storage_usage import NodeStorageUsage  # noqa
 from osf.models.chronos import ChronosJournal, ChronosSubmission  # noqa
 from osf.models.notable_domain import NotableDomain, DomainReference  # noqa
 from osf.models.brand import Brand  # noqa
@@ -8,6 +8,8 @@ from dateutil.parser import parse as parse_date
 from django.apps import apps
 from django.db import models, IntegrityError
 from django.db.models import Manager
+from django.db.models.signals import class_prepared
+from django.dispatch import receiver
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
@@ -61,6 +63,11 @@ class ActiveFileNodeManager(Manager):
         qs = super(ActiveFileNodeManager, self).get_queryset()
         return qs.exclude(type__in=TrashedFileNode._typedmodels_subtypes)
 
+
+# Built on first use by BaseFileNode.get_class_registry, reset when a file node class is added
+_file_class_registry = None
+
+
 class UnableToResolveFileClass(Exception):
     pass
 
@@ -116,7 +123,9 @@ class BaseFileNode(TypedModel, CommentableMixin, OptionalGuidMixin, Taggable, Ob
     class Meta:
         base_manager_name = 'objects'
         index_together = (
-            ('target_content_type', 'target_object_id', )
+            ('target_content_type', 'target_object_id', ),
+            # Keyset pagination of a folder's children
+            ('parent', 'name', 'id', ),
         )
 
     @property
@@ -260,30 +269,41 @@ class BaseFileNode(TypedModel, CommentableMixin, OptionalGuidMixin, Taggable, Ob
         """
         return cls.objects.filter(checkout=user)
 
+    @classmethod
+    def get_class_registry(cls):
+        """Return the (provider, FOLDER/FILE/ANY) -> file node class mapping, building it if needed"""
+        global _file_class_registry
+        registry = _file_class_registry
+        if registry is None:
+            registry = {}
+            type_mapping = ((cls.FOLDER, Folder), (cls.FILE, File))
+            for subclass in BaseFileNode.__subclasses__():
+                registry.setdefault((subclass._provider, cls.ANY), subclass)
+                for subsubclass in subclass.__subclasses__():
+                    for type_integer, type_cls in type_mapping:
+                        if issubclass(subsubclass, type_cls):
+                            registry.setdefault((subsubclass._provider, type_integer), subsubclass)
+            _file_class_registry = registry
+        return registry
+
     @classmethod
     def resolve_class(cls, provider, type_integer):
-        type_mapping = {0: Folder, 1: File, 2: None}
-        type_cls = type_mapping[type_integer]
+        try:
+            return cls.get_class_registry()[(provider, type_integer)]
+        except KeyError:
+            type_cls = {0: Folder, 1: File, 2: None}[type_integer]
+            raise UnableToResolveFileClass('Could not resolve class for {} and {}'.format(provider, type_cls))
 
-        for subclass in BaseFileNode.__subclasses__():
-            if type_cls:
-                for subsubclass in subclass.__subclasses__():
-                    if issubclass(subsubclass, type_cls) and subsubclass._provider == provider:
-                        return subsubclass
-            else:
-                if subclass._provider == provider:
-                    return subclass
-        raise UnableToResolveFileClass('Could not resolve class for {} and {}'.format(provider, type_cls))
+    @classmethod
+    def resolve_classes(cls, keys):
+        """Resolve many (provider, type_integer) pairs at once
+        :returns: dict mapping each pair to its class
+        """
+        return {key: cls.resolve_class(*key) for key in set(keys)}
 
     def _resolve_class(self, type_cls):
-        for subclass in BaseFileNode.__subclasses__():
-            if type_cls:
-                for subsubclass in subclass.__subclasses__():
-                    if issubclass(subsubclass, type_cls) and subsubclass._provider == self.provider:
-                        return subsubclass
-            else:
-                if subclass._provider == self.provider:
-                    return subclass
+        type_integer = {Folder: self.FOLDER, File: self.FILE, None: self.ANY}[type_cls]
+        return self.get_class_registry().get((self.provider, type_integer))
 
     def get_version(self, revision, required=False):
         """Find a version with identifier revision
@@ -753,6 +773,13 @@ class TrashedFolder(TrashedFileNode):
         return tf
 
 
+@receiver(class_prepared)
+def reset_file_class_registry(sender, **kwargs):
+    global _file_class_registry
+    if issubclass(sender, BaseFileNode):
+        _file_class_registry = None
+
+
 class FileVersionUserMetadata(BaseModel):
     user = models.ForeignKey('OSFUser', on_delete=models.CASCADE)
     file_version = models.ForeignKey('FileVersion', on_delete=models.CASCADE)
@@ -1,14 +1,15 @@
 import pytz
 import markupsafe
 import logging
+from collections import defaultdict
 
 from django.apps import apps
 from django.contrib.auth.models import Group, AnonymousUser
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.db import models, transaction
+from django.db import connection, models, transaction
 from django.utils import timezone
 from django.utils.functional import cached_property
-from guardian.shortcuts import assign_perm, get_perms, remove_perm, get_group_perms
+from guardian.shortcuts import assign_perm, get_perms, remove_perm
 
 from api.providers.workflows import Workflows, PUBLIC_STATES
 from framework import status
@@ -49,6 +50,7 @@ from osf.utils.workflows import (
     ReviewTriggers,
 )
 
+from osf.utils.permission_cache import get_cached_group_perms
 from osf.utils.requests import get_request_and_user_id
 from website.project import signals as project_signals
 from website import settings, mails, language
@@ -480,11 +482,65 @@ class AddonModelMixin(models.Model):
         return self.get_addons()
 
     def get_addons(self):
+        addon_settings = self._get_addon_settings_cache()
+        if any(config.short_name not in addon_settings for config in self.ADDONS_AVAILABLE):
+            self.prefetch_addons([self])
         return [_f for _f in [
             self.get_addon(config.short_name)
             for config in self.ADDONS_AVAILABLE
         ] if _f]
 
+    @classmethod
+    def prefetch_addons(cls, owners):
+        """Load the settings of every addon of every owner in ``owners`` and cache them on the owners.
+
+        Takes one UNION query over the settings tables to find which addons the owners have,
+        then one query per addon found.
+        """
+        owners = [owner for owner in owners if owner.pk]
+        if not owners:
+            return
+        settings_models = {}
+        for config in cls.ADDONS_AVAILABLE:
+            settings_model = owners[0]._settings_model(config.short_name, config=config)
+            if settings_model:
+                settings_models[config.short_name] = settings_model
+
+        owners_by_id = {owner.pk: owner for owner in owners}
+        for owner in owners:
+            owner._addon_settings_cache = dict.fromkeys(config.short_name for config in cls.ADDONS_AVAILABLE)
+        if not settings_models:
+            return
+        selects = []
+        params = []
+        for name, settings_model in settings_models.items():
+            selects.append('SELECT %s::text, id FROM {} WHERE {} = ANY(%s)'.format(
+                settings_model._meta.db_table,
+                settings_model._meta.get_field('owner').column,
+            ))
+            params.extend([name, list(owners_by_id)])
+        settings_ids = defaultdict(list)
+        with connection.cursor() as cursor:
+            cursor.execute(' UNION ALL '.join(selects), params)
+            for name, settings_id in cursor.fetchall():
+                settings_ids[name].append(settings_id)
+
+        for name, ids in settings_ids.items():
+            for settings_obj in settings_models[name].objects.filter(id__in=ids):
+                owner = owners_by_id[settings_obj.owner_id]
+                settings_obj.owner = owner
+                owner._addon_settings_cache[name] = settings_obj
+
+    def _get_addon_settings_cache(self):
+        """Addon settings of this owner by addon short name, None for addons it does not have"""
+        if getattr(self, '_addon_settings_cache', None) is None:
+            self._addon_settings_cache = {}
+        return self._addon_settings_cache
+
+    def refresh_from_db(self, *args, **kwargs):
+        self._addon_settings_cache = None
+        return super(AddonModelMixin, self).refresh_from_db(*args, **kwargs)
+
     def get_oauth_addons(self):
         # TODO: Using hasattr is a dirty hack - we should be using issubclass().
         #       We can't, because importing the parent classes here causes a
@@ -513,12 +569,18 @@ class AddonModelMixin(models.Model):
             return None
         if not settings_model:
             return None
-        try:
-            settings_obj = settings_model.objects.get(owner=self)
-            if not settings_obj.is_deleted or is_deleted:
-                return settings_obj
-        except ObjectDoesNotExist:
-            pass
+        addon_settings = self._get_addon_settings_cache()
+        if name in addon_settings:
+            settings_obj = addon_settings[name]
+        else:
+            try:
+                settings_obj = settings_model.objects.get(owner=self)
+            except ObjectDoesNotExist:
+                settings_obj = None
+            if self.pk:
+                addon_settings[name] = settings_obj
+        if settings_obj and (not settings_obj.is_deleted or is_deleted):
+            return settings_obj
         return None
 
     def add_addon(self, addon_name, auth=None, override=False, _force=False):
@@ -1867,7 +1929,7 @@ class ContributorMixin(models.Model):
         perm = '{}_{}'.format(permission, object_type)
         # Using get_group_perms to get permissions that are inferred through
         # group membership - not inherited from superuser status
-        has_permission = perm in get_group_perms(user, self)
+        has_permission = perm in get_cached_group_perms(user, self)
         if object_type == 'node':
             if not has_permission and permission == READ and check_parent:
                 return self.is_admin_parent(user)
@@ -1896,7 +1958,7 @@ class ContributorMixin(models.Model):
             return []
         # If base_perms not on model, will error
         perms = self.base_perms
-        user_perms = sorted(set(get_group_perms(user, self)).intersection(perms), key=perms.index)
+        user_perms = sorted(set(get_cached_group_perms(user, self)).intersection(perms), key=perms.index)
         return [perm.split('_')[0] for perm in user_perms]
 
     def set_permissions(self, user, permissions, validate=True, save=False):
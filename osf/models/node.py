@@ -1,4 +1,5 @@
 from past.builtins import basestring
+import collections
 import functools
 import itertools
 import logging
@@ -23,7 +24,6 @@ from django.dispatch import receiver
 from django.utils import timezone
 from django.utils.functional import cached_property
 from keen import scoped_keys
-from psycopg2._psycopg import AsIs
 from typedmodels.models import TypedModel, TypedModelManager
 from guardian.models import (
     GroupObjectPermissionBase,
@@ -46,15 +46,18 @@ from osf.models.licenses import NodeLicenseRecord
 from osf.models.mixins import (AddonModelMixin, CommentableMixin, Loggable, GuardianMixin,
                                NodeLinkMixin, SpamOverrideMixin, RegistrationResponseMixin,
                                EditableFieldsMixin)
-from osf.models.node_relation import NodeRelation
+from osf.models.node_relation import NodeClosure, NodeRelation
 from osf.models.nodelog import NodeLog
 from osf.models.private_link import PrivateLink
+from osf.models.storage_usage import NodeStorageUsage
 from osf.models.tag import Tag
 from osf.models.user import OSFUser
 from osf.models.validators import validate_title, validate_doi
 from framework.auth.core import Auth
 from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 from osf.utils.fields import NonNaiveDateTimeField, ensure_str
+from osf.utils.node_permissions import READABLE, get_node_ids_for_user
+from osf.utils.permission_cache import get_ancestors, prefetch_permissions
 from osf.utils.requests import get_request_and_user_id, string_type_request_headers
 from osf.utils.workflows import CollectionSubmissionStates
 from osf.utils import sanitize
@@ -100,47 +103,14 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
             if active:
                 query = query.filter(is_deleted=False)
             return query
+        descendant_ids = NodeClosure.objects.filter(ancestor_id=root.pk).values('descendant_id')
+        if include_root:
+            query = AbstractNode.objects.filter(Q(id__in=descendant_ids) | Q(id=root.pk))
         else:
-            sql = """
-                WITH RECURSIVE descendants AS (
-                SELECT
-                    parent_id,
-                    child_id,
-                    1 AS LEVEL,
-                    ARRAY[parent_id] as pids
-                FROM %s
-                %s
-                WHERE is_node_link IS FALSE AND parent_id = %s %s
-                UNION ALL
-                SELECT
-                    d.parent_id,
-                    s.child_id,
-                    d.level + 1,
-                    d.pids || s.parent_id
-                FROM descendants AS d
-                    JOIN %s AS s
-                    ON d.child_id = s.parent_id
-                WHERE s.is_node_link IS FALSE AND %s = ANY(pids)
-                ) SELECT array_agg(DISTINCT child_id)
-                FROM descendants
-                WHERE parent_id = %s;
-            """
-            with connection.cursor() as cursor:
-                node_relation_table = AsIs(NodeRelation._meta.db_table)
-                cursor.execute(sql, [
-                    node_relation_table,
-                    AsIs('LEFT JOIN osf_abstractnode ON {}.child_id = osf_abstractnode.id'.format(node_relation_table) if active else ''),
-                    root.pk,
-                    AsIs('AND osf_abstractnode.is_deleted IS FALSE' if active else ''),
-                    node_relation_table,
-                    root.pk,
-                    root.pk])
-                row = cursor.fetchone()[0]
-                if not row:
-                    return AbstractNode.objects.filter(id=root.pk) if include_root else AbstractNode.objects.none()
-                if include_root:
-                    row.append(root.pk)
-                return AbstractNode.objects.filter(id__in=row)
+            query = AbstractNode.objects.filter(id__in=descendant_ids)
+        if active:
+            query = query.filter(is_deleted=False)
+        return query
 
     def can_view(self, user=None, private_link=None):
         qs = self.filter(is_public=True)
@@ -154,27 +124,7 @@ class AbstractNodeQuerySet(GuidMixinQuerySet):
             return self.filter(private_links__is_deleted=False, private_links__key=private_link).filter(is_deleted=False)
 
         if user is not None and not isinstance(user, AnonymousUser):
-            read_user_query = get_objects_for_user(user, READ_NODE, self, with_superuser=False)
-            qs |= read_user_query
-            qs |= self.extra(where=["""
-                "osf_abstractnode".id in (
-                    WITH RECURSIVE implicit_read AS (
-                        SELECT N.id as node_id
-                        FROM osf_abstractnode as N, auth_permission as P, osf_nodegroupobjectpermission as G, osf_osfuser_groups as UG
-                        WHERE P.codename = 'admin_node'
-                        AND G.permission_id = P.id
-                        AND UG.osfuser_id = %s
-                        AND G.group_id = UG.group_id
-                        AND G.content_object_id = N.id
-                        AND N.type = 'osf.node'
-                    UNION ALL
-                        SELECT "osf_noderelation"."child_id"
-                        FROM "implicit_read"
-                        LEFT JOIN "osf_noderelation" ON "osf_noderelation"."parent_id" = "implicit_read"."node_id"
-                        WHERE "osf_noderelation"."is_node_link" IS FALSE
-                    ) SELECT * FROM implicit_read
-                )
-            """], params=(user.id, ))
+            qs |= self.filter(id__in=get_node_ids_for_user(user, READABLE))
         return qs.filter(is_deleted=False)
 
 
@@ -208,7 +158,6 @@ class AbstractNodeManager(TypedModelManager):
         :param include_public: If True, will include public nodes in query that user may not have explicit perms to
         :returns node queryset that the user has perms to
         """
-        OSFUserGroup = apps.get_model('osf', 'osfuser_groups')
         if base_queryset is None:
             base_queryset = self
 
@@ -216,10 +165,7 @@ class AbstractNodeManager(TypedModelManager):
             raise ValueError('Permission must be one of {}, {}, or {}.'.format(PERMISSIONS[0], PERMISSIONS[1], PERMISSIONS[2]))
 
         nodes = base_queryset.filter(is_deleted=False)
-        permission_object_id = Permission.objects.get(codename=permission).id
-        user_groups = OSFUserGroup.objects.filter(osfuser_id=user.id if user else None).values_list('group_id', flat=True)
-        node_groups = NodeGroupObjectPermission.objects.filter(group_id__in=user_groups, permission_id=permission_object_id).values_list('content_object_id', flat=True)
-        query = Q(id__in=node_groups)
+        query = Q(id__in=get_node_ids_for_user(user, permission))
         if include_public:
             query |= Q(is_public=True)
         return nodes.filter(query)
@@ -839,10 +785,36 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         """
         if self.has_permission(user, permission):
             return True
-        for node in self.nodes_primary.filter(is_deleted=False):
-            if node.has_permission_on_children(user, permission):
-                return True
-        return False
+        return get_objects_for_user(
+            user,
+            '{}_{}'.format(permission, self.guardian_object_type),
+            self._get_active_descendants(),
+            with_superuser=False,
+        ).exists()
+
+    def _get_active_descendants(self):
+        """Descendants that are not deleted and not below a deleted node"""
+        deleted_branches = NodeClosure.objects.filter(
+            ancestor__is_deleted=True,
+            ancestor___ancestor_closures__ancestor_id=self.pk,
+        ).values('descendant_id')
+        return AbstractNode.objects.filter(
+            _ancestor_closures__ancestor_id=self.pk,
+            is_deleted=False,
+        ).exclude(id__in=deleted_branches)
+
+    def _get_primary_children_map(self):
+        """Maps the id of every node in this node's tree to its primary children, in order,
+        loading the whole tree with one query.
+        """
+        children = collections.defaultdict(list)
+        relations = NodeRelation.objects.filter(
+            is_node_link=False,
+            child___ancestor_closures__ancestor_id=self.pk,
+        ).select_related('child').order_by('parent_id', '_order')
+        for relation in relations:
+            children[relation.parent_id].append(relation.child)
+        return children
 
     def is_admin_parent(self, user, include_group_admin=True):
         """
@@ -851,30 +823,37 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
                                     Useful for checking parent permissions for non-group actions like registrations.
         :return: bool Does the user have admin permissions on this object or its parents?
         """
-        if self.has_permission(user, ADMIN, check_parent=False):
-            ret = True
-            if not include_group_admin and not self.is_contributor(user):
-                ret = False
-            return ret
-        parent = self.parent_node
-        if parent:
-            return parent.is_admin_parent(user, include_group_admin=include_group_admin)
+        if not user or user.is_anonymous:
+            return False
+        # The nearest node the user administers decides
+        nodes = [self] + get_ancestors(self)
+        prefetch_permissions(user, nodes)
+        for node in nodes:
+            if node.has_permission(user, ADMIN, check_parent=False):
+                return include_group_admin or node.is_contributor(user)
         return False
 
     def find_readable_descendants(self, auth):
         """ Returns a generator of first descendant node(s) readable by <user>
         in each descendant branch.
         """
-        new_branches = []
-        for node in self.nodes_primary.filter(is_deleted=False):
-            if node.can_view(auth):
-                yield node
-            else:
-                new_branches.append(node)
+        children = self._get_primary_children_map()
+
+        def find_readable(parent_id):
+            new_branches = []
+            for node in children[parent_id]:
+                if node.is_deleted:
+                    continue
+                if node.can_view(auth):
+                    yield node
+                else:
+                    new_branches.append(node)
+
+            for bnode in new_branches:
+                for node in find_readable(bnode.id):
+                    yield node
 
-        for bnode in new_branches:
-            for node in bnode.find_readable_descendants(auth):
-                yield node
+        return find_readable(self.id)
 
     @property
     def parents(self):
@@ -1306,39 +1285,10 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         return self.private_links.filter(is_deleted=True).values_list('key', flat=True)
 
     def get_root(self):
-        sql = """
-            WITH RECURSIVE ascendants AS (
-              SELECT
-                parent_id,
-                child_id,
-                1 AS LEVEL,
-                ARRAY[child_id] as cids
-              FROM %s
-              WHERE is_node_link IS FALSE and child_id = %s
-              UNION ALL
-              SELECT
-                S.parent_id,
-                D.child_id,
-                D.level + 1,
-                D.cids || S.child_id
-              FROM ascendants AS D
-                JOIN %s AS S
-                  ON D.parent_id = S.child_id
-              WHERE S.is_node_link IS FALSE
-                AND %s = ANY(cids)
-            ) SELECT parent_id
-              FROM ascendants
-              WHERE child_id = %s
-              ORDER BY level DESC
-              LIMIT 1;
-        """
-        with connection.cursor() as cursor:
-            node_relation_table = AsIs(NodeRelation._meta.db_table)
-            cursor.execute(sql, [node_relation_table, self.pk, node_relation_table, self.pk, self.pk])
-            res = cursor.fetchone()
-            if res:
-                return AbstractNode.objects.get(pk=res[0])
-            return self
+        # Top-level nodes have no ancestor rows and are their own root
+        return AbstractNode.objects.filter(
+            _descendant_closures__descendant_id=self.pk,
+        ).order_by('-_descendant_closures__depth').first() or self
 
     def find_readable_antecedent(self, auth):
         """ Returns first antecendant node readable by <user>.
@@ -1530,19 +1480,21 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
     def get_primary(self, node):
         return NodeRelation.objects.filter(parent=self, child=node, is_node_link=False).exists()
 
-    # TODO optimize me
     def get_descendants_recursive(self, primary_only=False):
-        query = self.nodes_primary if primary_only else self._nodes
-        for node in query.all():
-            yield node
-            if not primary_only:
-                primary = self.get_primary(node)
-                if primary:
-                    for descendant in node.get_descendants_recursive(primary_only=primary_only):
+        """Yields descendants depth first. Unless ``primary_only``, node links are yielded
+        too, but not followed.
+        """
+        children = self._get_primary_children_map()
+
+        def walk(node):
+            primary = children[node.id]
+            for child in (primary if primary_only else node._nodes.all()):
+                yield child
+                if primary_only or child in primary:
+                    for descendant in walk(child):
                         yield descendant
-            else:
-                for descendant in node.get_descendants_recursive(primary_only=primary_only):
-                    yield descendant
+
+        return walk(self)
 
     @property
     def nodes_primary(self):
@@ -2377,9 +2329,14 @@ class AbstractNode(DirtyFieldsMixin, TypedModel, AddonModelMixin, IdentifierMixi
         storage_usage_total = storage_usage_cache.get(key)
         if storage_usage_total is not None:
             return storage_usage_total
-        else:
-            update_storage_usage(self)  # sets cache
-            return storage_usage_cache.get(key)
+
+        storage_usage_total = NodeStorageUsage.objects.filter(target_id=self.id).values_list('total', flat=True).first()
+        if storage_usage_total is not None:
+            storage_usage_cache.set(key, storage_usage_total, settings.STORAGE_USAGE_CACHE_TIMEOUT)
+            return storage_usage_total
+
+        update_storage_usage(self)  # sets cache
+        return storage_usage_cache.get(key)
 
     # Overrides ContributorMixin
     # TODO: Deprecate this when we emberize contributors management for nodes
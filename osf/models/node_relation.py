@@ -1,4 +1,7 @@
-from django.db import models
+from django.db import models, connection
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from psycopg2._psycopg import AsIs
 
 from .base import BaseModel, ObjectIDMixin
 
@@ -25,3 +28,133 @@ class NodeRelation(ObjectIDMixin, BaseModel):
         index_together = (
             ('is_node_link', 'child', 'parent'),
         )
+
+
+class NodeClosure(models.Model):
+    """Closure table over the primary (non node link) NodeRelations: one row for every
+    ancestor/descendant pair, with the number of levels between them. A node is not
+    stored as its own ancestor. Kept in sync by the NodeRelation signals below.
+    """
+    ancestor = models.ForeignKey('AbstractNode', related_name='_descendant_closures', on_delete=models.CASCADE)
+    descendant = models.ForeignKey('AbstractNode', related_name='_ancestor_closures', on_delete=models.CASCADE)
+    depth = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ('ancestor', 'descendant')
+        index_together = (
+            ('descendant', 'depth'),
+        )
+
+    @classmethod
+    def add_subtree(cls, parent_id, child_id):
+        """Link every ancestor of ``parent_id``, and the parent itself, to every
+        descendant of ``child_id``, and the child itself.
+        """
+        sql = """
+            INSERT INTO %s (ancestor_id, descendant_id, depth)
+            SELECT A.ancestor_id, D.descendant_id, A.depth + D.depth + 1
+            FROM (
+              SELECT ancestor_id, depth FROM %s WHERE descendant_id = %s
+              UNION ALL SELECT %s, 0
+            ) AS A
+            CROSS JOIN (
+              SELECT descendant_id, depth FROM %s WHERE ancestor_id = %s
+              UNION ALL SELECT %s, 0
+            ) AS D
+            ON CONFLICT (ancestor_id, descendant_id) DO NOTHING;
+        """
+        table = AsIs(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table, table, parent_id, parent_id, table, child_id, child_id])
+
+    @classmethod
+    def remove_subtree(cls, child_id):
+        """Unlink ``child_id`` and everything below it from all of the child's ancestors."""
+        sql = """
+            DELETE FROM %s
+            WHERE descendant_id IN (
+                SELECT descendant_id FROM %s WHERE ancestor_id = %s
+                UNION ALL SELECT %s
+              )
+              AND ancestor_id IN (
+                SELECT ancestor_id FROM %s WHERE descendant_id = %s
+              );
+        """
+        table = AsIs(cls._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [table, table, child_id, child_id, table, child_id])
+
+    @classmethod
+    def rebuild(cls, root_id):
+        """Recompute the rows for the whole tree under the top-level node ``root_id``
+        from NodeRelation, replacing whatever was stored for it.
+
+        :return int: Number of rows written
+        """
+        tree_sql = """
+            WITH RECURSIVE tree AS (
+              SELECT
+                child_id AS node_id,
+                ARRAY[parent_id] AS pids
+              FROM %s
+              WHERE is_node_link IS FALSE AND parent_id = %s
+              UNION ALL
+              SELECT
+                R.child_id,
+                T.pids || R.parent_id
+              FROM tree AS T
+                JOIN %s AS R
+                  ON T.node_id = R.parent_id
+              WHERE R.is_node_link IS FALSE
+                AND NOT R.child_id = ANY(T.pids)
+            )
+        """
+        delete_sql = tree_sql + """
+            DELETE FROM %s
+            WHERE descendant_id IN (SELECT node_id FROM tree);
+        """
+        insert_sql = tree_sql + """, pairs AS (
+              SELECT
+                R.parent_id AS ancestor_id,
+                R.child_id AS descendant_id,
+                1 AS depth,
+                ARRAY[R.child_id] AS cids
+              FROM %s AS R
+              WHERE R.is_node_link IS FALSE
+                AND R.child_id IN (SELECT node_id FROM tree)
+              UNION ALL
+              SELECT
+                R.parent_id,
+                P.descendant_id,
+                P.depth + 1,
+                P.cids || R.child_id
+              FROM pairs AS P
+                JOIN %s AS R
+                  ON P.ancestor_id = R.child_id
+              WHERE R.is_node_link IS FALSE
+                AND NOT R.parent_id = ANY(P.cids)
+            )
+            INSERT INTO %s (ancestor_id, descendant_id, depth)
+            SELECT DISTINCT ON (ancestor_id, descendant_id) ancestor_id, descendant_id, depth
+            FROM pairs
+            ORDER BY ancestor_id, descendant_id, depth;
+        """
+        relation_table = AsIs(NodeRelation._meta.db_table)
+        table = AsIs(cls._meta.db_table)
+        tree_params = [relation_table, root_id, relation_table]
+        with connection.cursor() as cursor:
+            cursor.execute(delete_sql, tree_params + [table])
+            cursor.execute(insert_sql, tree_params + [relation_table, relation_table, table])
+            return cursor.rowcount
+
+
+@receiver(post_save, sender=NodeRelation)
+def add_node_closure(sender, instance, created, *args, **kwargs):
+    if created and not instance.is_node_link:
+        NodeClosure.add_subtree(instance.parent_id, instance.child_id)
+
+
+@receiver(post_delete, sender=NodeRelation)
+def remove_node_closure(sender, instance, *args, **kwargs):
+    if not instance.is_node_link:
+        NodeClosure.remove_subtree(instance.child_id)
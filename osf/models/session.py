@@ -5,6 +5,18 @@ from osf.utils.datetime_aware_jsonfield import DateTimeAwareJSONField
 class Session(ObjectIDMixin, BaseModel):
     data = DateTimeAwareJSONField(default=dict, blank=True)
 
+    def save(self, *args, **kwargs):
+        """Save through the configured session backend (see ``framework.sessions.backends``).
+        Explicit save options always go straight to the database.
+        """
+        if args or kwargs:
+            return self.save_to_database(*args, **kwargs)
+        from framework.sessions.backends import get_session_backend
+        get_session_backend().save(self)
+
+    def save_to_database(self, *args, **kwargs):
+        return super(Session, self).save(*args, **kwargs)
+
     @property
     def is_authenticated(self):
         return 'auth_user_id' in self.data
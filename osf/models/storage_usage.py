@@ -0,0 +1,51 @@
+from django.db import models
+from django.db.models import Case, F, Value, When
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from osf.utils.fields import NonNaiveDateTimeField
+
+
+class NodeStorageUsage(models.Model):
+    """Durable running total of the bytes a node stores in osfstorage.
+
+    The total is adjusted in the same transaction as the WaterButler file actions that change it
+    (see api.caching.tasks.update_storage_usage_with_size), and recomputed from the file versions
+    by update_storage_usage_cache. Totals that may have drifted from the file versions are marked
+    ``stale`` and recomputed by the reconcile_storage_usage command.
+    """
+    target = models.OneToOneField('AbstractNode', primary_key=True, related_name='storage_usage_ledger', on_delete=models.CASCADE)
+    total = models.BigIntegerField(default=0)
+    stale = models.BooleanField(default=False, db_index=True)
+    # When the total was last adjusted and last recomputed
+    modified = NonNaiveDateTimeField(default=timezone.now)
+    reconciled = NonNaiveDateTimeField(null=True, blank=True)
+
+    @classmethod
+    def adjust(cls, target_id, delta, exact=True):
+        """Add ``delta`` bytes to the total of ``target_id`` in one UPDATE.
+
+        Totals do not go below zero; a total that would have is marked stale, as is any total
+        adjusted by a size that is not ``exact``.
+        :returns: the new total, or None if the target has no ledger row yet
+        """
+        stale = Case(When(total__lt=-delta, then=Value(True)), default=F('stale'))
+        updated = cls.objects.filter(target_id=target_id).update(
+            total=Greatest(F('total') + delta, 0),
+            stale=stale if exact else Value(True),
+            modified=timezone.now(),
+        )
+        if not updated:
+            return None
+        return cls.objects.filter(target_id=target_id).values_list('total', flat=True).get()
+
+    @classmethod
+    def set_total(cls, target_id, total):
+        """Record a freshly computed total for ``target_id``."""
+        now = timezone.now()
+        cls.objects.update_or_create(target_id=target_id, defaults={
+            'total': total,
+            'stale': False,
+            'modified': now,
+            'reconciled': now,
+        })
@@ -34,6 +34,7 @@ from framework.auth.exceptions import (ChangePasswordError, ExpiredTokenError,
                                        MergeConfirmedRequiredError,
                                        MergeConflictError)
 from framework.exceptions import PermissionsError
+from framework.sessions.backends import get_session_backend
 from framework.sessions.utils import remove_sessions_for_user
 from osf.utils.requests import get_current_request
 from osf.exceptions import reraise_django_validation_errors, UserStateError
@@ -1752,7 +1753,7 @@ class OSFUser(DirtyFieldsMixin, GuidMixin, BaseModel, AbstractBaseUser, Permissi
         except itsdangerous.BadSignature:
             return None
 
-        user_session = Session.load(session_id)
+        user_session = get_session_backend().load(session_id)
         if user_session is None:
             return None
 
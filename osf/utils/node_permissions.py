@@ -0,0 +1,141 @@
+"""
+Cached sets of the nodes a user holds permissions on.
+
+Each set is computed with one Postgres query from the node group object permissions and,
+for readable nodes, the node closure table, then stored in the Postgres-backed
+``NODE_PERMISSIONS_CACHE_NAME`` cache so that listing a user's nodes does not re-plan
+the permission joins on every request.
+
+Sets are invalidated when group membership, group object permissions on nodes, or the
+node hierarchy change. Each user's sets are keyed on a generation token that invalidation
+replaces, so a set computed before an invalidation is stored under a key no reader uses.
+"""
+import uuid
+
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from osf.utils.permissions import ADMIN_NODE, READ_NODE
+
+# Nodes readable through a permission on the node itself or as an admin of a parent project
+READABLE = 'readable'
+
+NODE_PERMISSIONS_KEY = 'node_permissions:{user_id}:{generation}:{permission}'
+NODE_PERMISSIONS_GENERATION_KEY = 'node_permissions:{user_id}:generation'
+
+
+def get_cache():
+    return caches[settings.NODE_PERMISSIONS_CACHE_NAME]
+
+
+def get_generation(user_id):
+    """Return the token the current node id sets of ``user_id`` are keyed on."""
+    cache = get_cache()
+    key = NODE_PERMISSIONS_GENERATION_KEY.format(user_id=user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, uuid.uuid4().hex, None)
+        generation = cache.get(key)
+    return generation
+
+
+def _permitted_node_ids_query(user_id, permission):
+    NodeGroupObjectPermission = apps.get_model('osf.NodeGroupObjectPermission')
+    return NodeGroupObjectPermission.objects.filter(
+        group__user=user_id,
+        permission__codename=permission,
+    ).values_list('content_object_id', flat=True)
+
+
+def _readable_node_ids_query(user_id):
+    NodeClosure = apps.get_model('osf.NodeClosure')
+    implicit = NodeClosure.objects.filter(
+        ancestor__type='osf.node',
+        ancestor__nodegroupobjectpermission__group__user=user_id,
+        ancestor__nodegroupobjectpermission__permission__codename=ADMIN_NODE,
+    ).values_list('descendant_id', flat=True)
+    return _permitted_node_ids_query(user_id, READ_NODE).union(implicit)
+
+
+def get_node_ids_for_user(user, permission=READABLE):
+    """Return the ids of nodes ``user`` holds ``permission`` on through contributorship or
+    group membership. ``permission`` is one of ``PERMISSIONS`` or ``READABLE``.
+    Deleted nodes are not excluded.
+    """
+    if not user or user.is_anonymous:
+        return []
+    cache = get_cache()
+    # Read before the sets are computed, so a set computed from data an invalidation has since
+    # replaced is stored under the old generation
+    generation = get_generation(user.id)
+    key = NODE_PERMISSIONS_KEY.format(user_id=user.id, generation=generation, permission=permission)
+    node_ids = cache.get(key)
+    if node_ids is None:
+        if permission == READABLE:
+            node_ids = list(_readable_node_ids_query(user.id))
+        else:
+            node_ids = list(_permitted_node_ids_query(user.id, permission))
+        cache.set(key, node_ids, settings.NODE_PERMISSIONS_CACHE_TIMEOUT)
+    return node_ids
+
+
+def invalidate_node_ids(user_ids):
+    """Move ``user_ids`` to a new generation of cached node id sets, now and again once the
+    current transaction commits, so a set computed from uncommitted or since replaced data is
+    never read again.
+    """
+    keys = [NODE_PERMISSIONS_GENERATION_KEY.format(user_id=user_id) for user_id in user_ids]
+    if not keys:
+        return
+    cache = get_cache()
+
+    def new_generations():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, None)
+
+    new_generations()
+    transaction.on_commit(new_generations)
+
+
+def _get_group_user_ids(group_ids):
+    OSFUser = apps.get_model('osf.OSFUser')
+    return list(OSFUser.objects.filter(groups__in=group_ids).values_list('id', flat=True).distinct())
+
+
+@receiver(m2m_changed, sender='osf.OSFUser_groups')
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        invalidate_node_ids([instance.pk])
+    elif action == 'pre_clear':
+        invalidate_node_ids(_get_group_user_ids([instance.pk]))
+    else:
+        invalidate_node_ids(pk_set)
+
+
+@receiver(post_save, sender='osf.NodeGroupObjectPermission')
+@receiver(post_delete, sender='osf.NodeGroupObjectPermission')
+def node_group_permissions_changed(sender, instance, **kwargs):
+    invalidate_node_ids(_get_group_user_ids([instance.group_id]))
+
+
+@receiver(post_save, sender='osf.NodeRelation')
+@receiver(post_delete, sender='osf.NodeRelation')
+def node_hierarchy_changed(sender, instance, **kwargs):
+    # Admins of the parent or anything above it gain or lose implicit read on the subtree
+    if instance.is_node_link:
+        return
+    NodeClosure = apps.get_model('osf.NodeClosure')
+    NodeGroupObjectPermission = apps.get_model('osf.NodeGroupObjectPermission')
+    ancestor_ids = NodeClosure.objects.filter(descendant_id=instance.parent_id).values('ancestor_id')
+    group_ids = NodeGroupObjectPermission.objects.filter(
+        permission__codename=ADMIN_NODE,
+    ).filter(
+        Q(content_object_id=instance.parent_id) | Q(content_object_id__in=ancestor_ids)
+    ).values('group_id')
+    invalidate_node_ids(_get_group_user_ids(group_ids))
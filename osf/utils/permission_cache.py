@@ -0,0 +1,119 @@
+"""
+A request-scoped cache of the object permissions users hold through group membership.
+
+Within a Flask or Django request, a user's group permissions on an object are loaded
+once and reused by every later permission check in that request. A page of objects
+can be loaded with one query per model with `prefetch_permissions`. Outside of a
+request nothing is cached.
+
+The cache is cleared whenever group membership, group object permissions or the
+node hierarchy change.
+"""
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from guardian.shortcuts import get_group_perms
+from guardian.utils import get_group_obj_perms_model
+
+from osf.utils.requests import DummyRequest, get_current_request
+
+_group_obj_perms_models = {}
+
+
+def get_permission_cache():
+    """Return the permission cache of the current request, or None outside of a request."""
+    req = get_current_request()
+    if isinstance(req, DummyRequest):
+        return None
+    if getattr(req, '_permission_cache', None) is None:
+        req._permission_cache = {}
+    return req._permission_cache
+
+
+def clear_permission_cache():
+    cache = get_permission_cache()
+    if cache:
+        cache.clear()
+
+
+def _get_perms_model(obj):
+    model = type(obj)
+    if model not in _group_obj_perms_models:
+        _group_obj_perms_models[model] = get_group_obj_perms_model(model)
+    return _group_obj_perms_models[model]
+
+
+def _load_group_perms(user, perms_model, objs):
+    if perms_model.objects.is_generic():
+        content_type = ContentType.objects.get_for_model(objs[0])
+        rows = perms_model.objects.filter(content_type=content_type, object_pk__in=[str(obj.pk) for obj in objs])
+        pk_field = 'object_pk'
+    else:
+        rows = perms_model.objects.filter(content_object_id__in=[obj.pk for obj in objs])
+        pk_field = 'content_object_id'
+    perms = defaultdict(set)
+    for pk, codename in rows.filter(group__user=user).values_list(pk_field, 'permission__codename'):
+        perms[str(pk)].add(codename)
+    return perms
+
+
+def prefetch_permissions(user, objs):
+    """Load ``user``'s group permissions on every object in ``objs`` that is not cached yet,
+    with one query per model. Objects without object permissions are skipped.
+    """
+    cache = get_permission_cache()
+    if cache is None or not user or user.is_anonymous:
+        return
+    to_load = defaultdict(list)
+    for obj in objs:
+        if getattr(obj, 'guardian_object_type', None) is None:
+            continue
+        perms_model = _get_perms_model(obj)
+        if (user.id, perms_model, obj.pk) not in cache:
+            to_load[perms_model].append(obj)
+    for perms_model, model_objs in to_load.items():
+        perms = _load_group_perms(user, perms_model, model_objs)
+        for obj in model_objs:
+            cache[(user.id, perms_model, obj.pk)] = frozenset(perms.get(str(obj.pk), ()))
+
+
+def get_cached_group_perms(user, obj):
+    """Drop-in for guardian's ``get_group_perms(user, obj)`` that reads through the request cache."""
+    cache = get_permission_cache()
+    if cache is None or user.is_anonymous:
+        return get_group_perms(user, obj)
+    key = (user.id, _get_perms_model(obj), obj.pk)
+    if key not in cache:
+        prefetch_permissions(user, [obj])
+    return cache[key]
+
+
+def get_ancestors(node):
+    """Return ``node``'s primary ancestors, nearest first, cached for the request."""
+    cache = get_permission_cache()
+    key = ('ancestors', node.pk)
+    if cache is not None and key in cache:
+        return cache[key]
+    AbstractNode = apps.get_model('osf.AbstractNode')
+    ancestors = list(AbstractNode.objects.filter(
+        _descendant_closures__descendant_id=node.pk,
+    ).order_by('_descendant_closures__depth'))
+    if cache is not None:
+        cache[key] = ancestors
+    return ancestors
+
+
+@receiver(m2m_changed, sender='osf.OSFUser_groups')
+@receiver(post_save, sender='osf.NodeGroupObjectPermission')
+@receiver(post_delete, sender='osf.NodeGroupObjectPermission')
+@receiver(post_save, sender='osf.PreprintGroupObjectPermission')
+@receiver(post_delete, sender='osf.PreprintGroupObjectPermission')
+@receiver(post_save, sender='osf.DraftRegistrationGroupObjectPermission')
+@receiver(post_delete, sender='osf.DraftRegistrationGroupObjectPermission')
+@receiver(post_save, sender='osf.NodeRelation')
+@receiver(post_delete, sender='osf.NodeRelation')
+def invalidate_permission_cache(*args, **kwargs):
+    clear_permission_cache()
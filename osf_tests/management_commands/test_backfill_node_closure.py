@@ -0,0 +1,40 @@
+import pytest
+
+from osf.management.commands.backfill_node_closure import (
+    backfill_node_closure,
+    find_closure_mismatches,
+)
+from osf.models import NodeClosure
+from osf_tests.factories import NodeFactory, ProjectFactory
+
+
+@pytest.mark.django_db
+class TestBackfillNodeClosure:
+
+    @pytest.fixture()
+    def project(self):
+        return ProjectFactory()
+
+    @pytest.fixture()
+    def child(self, project):
+        return NodeFactory(parent=project)
+
+    @pytest.fixture()
+    def grandchild(self, child):
+        return NodeFactory(parent=child)
+
+    def test_backfill(self, project, child, grandchild):
+        expected = set(NodeClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth'))
+        NodeClosure.objects.all().delete()
+        NodeClosure.objects.create(ancestor=grandchild, descendant=project, depth=1)
+
+        backfill_node_closure()
+
+        assert set(NodeClosure.objects.values_list('ancestor_id', 'descendant_id', 'depth')) == expected
+        assert (project.id, grandchild.id, 2) in expected
+
+    def test_find_closure_mismatches(self, project, child, grandchild):
+        assert find_closure_mismatches() == []
+
+        NodeClosure.objects.filter(ancestor=project, descendant=grandchild).delete()
+        assert find_closure_mismatches() == [('missing', project.id, grandchild.id, 2)]
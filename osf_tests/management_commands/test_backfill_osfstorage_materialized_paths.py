@@ -0,0 +1,38 @@
+import pytest
+
+from addons.osfstorage.models import OsfStorageFileNode
+from osf.management.commands.backfill_osfstorage_materialized_paths import (
+    backfill_materialized_paths,
+    verify_materialized_paths,
+)
+from osf_tests.factories import ProjectFactory
+
+
+def stored_path(file_node):
+    return OsfStorageFileNode.objects.filter(id=file_node.id).values_list('_materialized_path', flat=True)[0]
+
+
+@pytest.mark.django_db
+class TestBackfillOsfStorageMaterializedPaths:
+
+    @pytest.fixture()
+    def root(self):
+        return ProjectFactory().get_addon('osfstorage').get_root()
+
+    def test_backfill(self, root):
+        folder = root.append_folder('Cloud')
+        child = folder.append_file('Carp')
+        OsfStorageFileNode.objects.filter(id__in=[root.id, folder.id, child.id]).update(_materialized_path='')
+
+        backfill_materialized_paths()
+
+        assert stored_path(root) == '/'
+        assert stored_path(folder) == '/Cloud/'
+        assert stored_path(child) == '/Cloud/Carp'
+
+    def test_verify(self, root):
+        child = root.append_folder('Cloud').append_file('Carp')
+        assert verify_materialized_paths() == []
+
+        OsfStorageFileNode.objects.filter(id=child.id).update(_materialized_path='/Carp')
+        assert verify_materialized_paths() == [child._id]
@@ -435,6 +435,51 @@ class TestStorageAddonBase(ArchiverTestCase):
     def _test_addon(self, addon_short_name):
         self._test__get_file_tree(addon_short_name)
 
+    def test_crawl_file_tree_resumes_from_checkpoint(self):
+        listings = {
+            '/': [
+                {'path': '/a/', 'kind': 'folder', 'name': 'a'},
+                {'path': '/1', 'kind': 'file', 'name': '1'},
+                {'path': '/b/', 'kind': 'folder', 'name': 'b'},
+            ],
+            '/a/': [
+                {'path': '/a/2', 'kind': 'file', 'name': '2'},
+                {'path': '/a/c/', 'kind': 'folder', 'name': 'c'},
+            ],
+            '/b/': [{'path': '/b/3', 'kind': 'file', 'name': '3'}],
+            '/a/c/': [{'path': '/a/c/4', 'kind': 'file', 'name': '4'}],
+        }
+
+        def list_folder(filenode, user, cookie=None, version=None, owner_guid=None):
+            assert_equal(owner_guid, self.src._id)
+            return [dict(child) for child in listings[filenode['path']]]
+
+        addon = self.src.get_addon('osfstorage')
+        with mock.patch.object(type(addon), '_get_fileobj_child_metadata', side_effect=list_folder):
+            crawler = addon.crawl_file_tree(user=self.user)
+            files = crawler.iter_files()
+            assert_equal([next(files)['path'], next(files)['path']], ['/1', '/a/2'])
+            checkpoint = crawler.checkpoint
+            assert_equal([folder['path'] for folder in checkpoint], ['/a/', '/b/'])
+            files.close()
+
+            resumed = addon.crawl_file_tree(user=self.user, checkpoint=checkpoint)
+            assert_equal([f['path'] for f in resumed.iter_files()], ['/a/2', '/b/3', '/a/c/4'])
+
+            tree = addon._get_file_tree(user=self.user)
+            assert_equal([child['name'] for child in tree['children'][0]['children']], ['2', 'c'])
+            assert_equal(tree['children'][0]['children'][1]['children'][0]['path'], '/a/c/4')
+            assert_is(addon._get_file_tree(user=self.user), tree)
+
+    @mock.patch('addons.base.crawler.time')
+    def test_crawl_file_tree_workers_share_rate_limit(self, mock_time):
+        mock_time.monotonic.return_value = 100.0
+        crawler = self.src.get_addon('osfstorage').crawl_file_tree(user=self.user)
+        with mock.patch.object(settings, 'FILE_TREE_CRAWLER_REQUESTS_PER_SECOND', 5):
+            for _ in range(3):
+                crawler._throttle()
+        assert_equal([call[0][0] for call in mock_time.sleep.call_args_list], [pytest.approx(0.2), pytest.approx(0.4)])
+
     # @pytest.mark.skip('Unskip when figshare addon is implemented')
     def test_addons(self):
         #  Test that each addon in settings.ADDONS_ARCHIVABLE other than wiki/forward implements the StorageAddonBase interface
@@ -909,6 +954,19 @@ class TestArchiverUtils(ArchiverTestCase):
             archiver_utils.get_file_map(node)
             assert_equal(mock_get_file_tree.call_count, call_count)
 
+    def test_get_file_index(self):
+        node = factories.NodeFactory()
+        file_tree = file_tree_factory(2, 2, 2)
+        duplicate = file_factory(sha256=file_tree['children'][0]['extra']['hashes']['sha256'])
+        file_tree['children'].append(duplicate)
+        with mock.patch.object(BaseStorageAddon, '_get_file_tree', mock.Mock(return_value=file_tree)):
+            file_map = list(archiver_utils.get_file_map(node))
+            file_index = archiver_utils.get_file_index(node)
+
+        assert_equal(sum(len(entries) for entries in file_index.values()), len(file_map))
+        for position, (sha256, file_info, node_id) in enumerate(file_map):
+            assert_in((position, file_info, node_id), file_index[sha256])
+        assert_equal(len(file_index[duplicate['extra']['hashes']['sha256']]), 2)
 
 class TestArchiverListeners(ArchiverTestCase):
 
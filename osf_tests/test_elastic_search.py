@@ -9,12 +9,14 @@ import functools
 
 from nose.tools import *  # noqa: F403
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from framework.auth.core import Auth
 
 from website import settings
 import website.search.search as search
-from website.search import elastic_search
+from website.search import debounce, elastic_search
 from website.search.util import build_query
 from website.search_migration.migrate import migrate
 from osf.models import (
@@ -1540,3 +1542,128 @@ class TestSearchFiles(OsfTestCase):
         assert_equal(file_.path, path)
         assert_equal(find[0]['guid_url'], None)
         assert_equal(find[0]['deep_url'], deep_url)
+
+
+class TestBulkIndexing(unittest.TestCase):
+
+    def setUp(self):
+        super(TestBulkIndexing, self).setUp()
+        client_patch = mock.patch('website.search.elastic_search.client')
+        self.mock_client = client_patch.start()
+        self.addCleanup(client_patch.stop)
+        bulk_patch = mock.patch('website.search.elastic_search.helpers.bulk', return_value=(0, []))
+        self.mock_bulk = bulk_patch.start()
+        self.addCleanup(bulk_patch.stop)
+
+    def test_buffered_documents_are_sent_in_chunks(self):
+        with elastic_search.bulk_indexing(chunk_size=2):
+            for i in range(5):
+                elastic_search.index_doc(TEST_INDEX, 'file', 'file{}'.format(i), {'name': i})
+            assert_equal(self.mock_bulk.call_count, 2)
+        assert_equal(self.mock_bulk.call_count, 3)
+        sent = [action['_id'] for call in self.mock_bulk.call_args_list for action in call[0][1]]
+        assert_equal(sent, ['file0', 'file1', 'file2', 'file3', 'file4'])
+        assert_false(self.mock_client.return_value.index.called)
+        self.mock_client.return_value.indices.refresh.assert_called_once_with(index=TEST_INDEX)
+
+    def test_nested_blocks_share_outer_buffer(self):
+        with elastic_search.bulk_indexing():
+            elastic_search.remove_doc(TEST_INDEX, 'user', 'abcde')
+            with elastic_search.bulk_indexing():
+                elastic_search.index_doc(TEST_INDEX, 'file', 'fghij', {})
+            assert_false(self.mock_bulk.called)
+        assert_equal(self.mock_bulk.call_count, 1)
+        actions = self.mock_bulk.call_args[0][1]
+        assert_equal([action['_op_type'] for action in actions], ['delete', 'index'])
+        assert_is_none(elastic_search.get_indexing_buffer())
+
+    def test_buffer_discarded_on_error(self):
+        with assert_raises(ValueError):
+            with elastic_search.bulk_indexing():
+                elastic_search.index_doc(TEST_INDEX, 'file', 'fghij', {})
+                raise ValueError
+        assert_false(self.mock_bulk.called)
+        assert_is_none(elastic_search.get_indexing_buffer())
+
+    def test_failed_documents_raise(self):
+        self.mock_bulk.return_value = (0, [
+            {'delete': {'_type': 'user', '_id': 'abcde', 'status': 404}},
+            {'index': {'_type': 'file', '_id': 'fghij', 'status': 400, 'error': 'mapper_parsing_exception'}},
+        ])
+        with assert_raises(elastic_search.helpers.BulkIndexError) as e:
+            with elastic_search.bulk_indexing():
+                elastic_search.remove_doc(TEST_INDEX, 'user', 'abcde')
+                elastic_search.index_doc(TEST_INDEX, 'file', 'fghij', {})
+        assert_equal(e.exception.errors, [self.mock_bulk.return_value[1][1]])
+
+    def test_missing_deletes_do_not_raise(self):
+        self.mock_bulk.return_value = (0, [{'delete': {'_type': 'user', '_id': 'abcde', 'status': 404}}])
+        with elastic_search.bulk_indexing():
+            elastic_search.remove_doc(TEST_INDEX, 'user', 'abcde')
+        self.mock_client.return_value.indices.refresh.assert_called_once_with(index=TEST_INDEX)
+
+    def test_unbuffered_documents_are_indexed_directly(self):
+        elastic_search.index_doc(TEST_INDEX, 'file', 'fghij', {})
+        self.mock_client.return_value.index.assert_called_once_with(
+            index=TEST_INDEX, doc_type='file', id='fghij', body={}, refresh=True
+        )
+        assert_false(self.mock_bulk.called)
+
+
+@pytest.mark.django_db
+class TestSearchPrefetch:
+
+    def count_serialize_queries(self, nodes):
+        with CaptureQueriesContext(connection) as ctx:
+            with elastic_search.prefetched_search_data(nodes):
+                docs = [elastic_search.serialize_node(node, 'component') for node in nodes]
+        return len(ctx.captured_queries), docs
+
+    def test_serialize_nodes_in_fixed_number_of_queries(self):
+        project = factories.ProjectFactory(is_public=True)
+        few = [factories.NodeFactory(parent=project, is_public=True) for _ in range(2)]
+        many = [factories.NodeFactory(parent=project, is_public=True) for _ in range(6)]
+        for node in few + many:
+            node.add_tag('Bruce', auth=Auth(project.creator), save=False)
+
+        few_queries, _ = self.count_serialize_queries([type(n).objects.get(id=n.id) for n in few])
+        many_queries, docs = self.count_serialize_queries([type(n).objects.get(id=n.id) for n in many])
+        assert few_queries == many_queries
+        for doc in docs:
+            assert doc['parent_id'] == project._id
+            assert doc['tags'] == ['Bruce']
+            assert doc['contributors'][0]['fullname'] == project.creator.fullname
+
+    def test_prefetched_data_is_discarded(self):
+        node = factories.ProjectFactory(is_public=True)
+        with elastic_search.prefetched_search_data([node]):
+            assert elastic_search.serialize_node(node, 'project')['tags'] == []
+        node.add_tag('Springsteen', auth=Auth(node.creator))
+        with elastic_search.prefetched_search_data([node]):
+            assert elastic_search.serialize_node(node, 'project')['tags'] == ['Springsteen']
+
+
+@pytest.mark.django_db
+class TestReindexDebounce:
+
+    def test_repeated_updates_are_coalesced(self):
+        signature = mock.Mock()
+        coalesced = debounce.get_coalesced_count()
+        for _ in range(3):
+            debounce.schedule_reindex('node', 'abcde', signature)
+        signature.apply_async.assert_called_once_with(countdown=settings.SEARCH_REINDEX_DEBOUNCE)
+        assert debounce.get_coalesced_count() == coalesced + 2
+
+    def test_updates_are_keyed_by_doc_type_and_id(self):
+        signature = mock.Mock()
+        debounce.schedule_reindex('node', 'abcde', signature)
+        debounce.schedule_reindex('node', 'fghij', signature)
+        debounce.schedule_reindex('user', 'abcde', signature)
+        assert signature.apply_async.call_count == 3
+
+    def test_update_after_task_starts_is_scheduled(self):
+        signature = mock.Mock()
+        debounce.schedule_reindex('preprint', 'abcde', signature)
+        debounce.clear_pending('preprint', 'abcde')
+        debounce.schedule_reindex('preprint', 'abcde', signature)
+        assert signature.apply_async.call_count == 2
@@ -3,9 +3,11 @@ import pytest
 from django.contrib.contenttypes.models import ContentType
 from nose.tools import assert_raises
 
+from addons.github.models import GithubFile, GithubFileNode, GithubFolder
 from addons.osfstorage.models import NodeSettings
 from addons.osfstorage import settings as osfstorage_settings
 from osf.models import BaseFileNode, Folder, File, FileVersion
+from osf.models.files import UnableToResolveFileClass
 from osf_tests.factories import (
     UserFactory,
     ProjectFactory,
@@ -199,3 +201,14 @@ def test_file_shared_purged(project, create_test_file):
     assert freed == sum(list(test_file_1.versions.values_list('size', flat=True)))
     assert test_file_1.purged is not None
     assert version_0.purged is not None
+
+
+def test_resolve_class():
+    assert BaseFileNode.resolve_class('github', BaseFileNode.FILE) is GithubFile
+    assert BaseFileNode.resolve_class('github', BaseFileNode.FOLDER) is GithubFolder
+    assert BaseFileNode.resolve_class('github', BaseFileNode.ANY) is GithubFileNode
+    assert BaseFileNode.resolve_classes([('github', BaseFileNode.FILE), ('github', BaseFileNode.FILE)]) == {
+        ('github', BaseFileNode.FILE): GithubFile
+    }
+    with assert_raises(UnableToResolveFileClass):
+        BaseFileNode.resolve_class('nope', BaseFileNode.FILE)
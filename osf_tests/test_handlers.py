@@ -1,7 +1,11 @@
+import functools
+
+import mock
 import pytest
 from nose.tools import assert_raises
 
 from framework.celery_tasks import handlers
+from framework.postcommit_tasks import handlers as postcommit_handlers
 from website.project.tasks import on_node_updated
 
 
@@ -40,3 +44,59 @@ class TestCeleryHandlers:
                 'website.project.tasks.on_node_updated',
                 predicate=lambda task: task.kwargs['node_id'] == 'woop'
             )
+
+
+def succeed():
+    pass
+
+
+def fail():
+    raise ValueError()
+
+
+class TestPostcommitHandlers:
+
+    @pytest.fixture(autouse=True)
+    def clean_queues(self):
+        postcommit_handlers.postcommit_before_request()
+        postcommit_handlers.reset_postcommit_stats()
+        yield
+        postcommit_handlers.postcommit_before_request()
+        postcommit_handlers.reset_postcommit_stats()
+
+    def test_run_postcommit_task_records_duration(self):
+        postcommit_handlers.run_postcommit_task(functools.partial(succeed))
+        postcommit_handlers.run_postcommit_task(succeed)
+        stats = postcommit_handlers.get_postcommit_stats()['osf_tests.test_handlers.succeed']
+        assert stats['calls'] == 2
+        assert stats['failures'] == 0
+        assert stats['max_time'] <= stats['total_time']
+
+    def test_run_postcommit_task_records_failures(self):
+        with assert_raises(ValueError):
+            postcommit_handlers.run_postcommit_task(fail)
+        stats = postcommit_handlers.get_postcommit_stats()['osf_tests.test_handlers.fail']
+        assert stats['calls'] == 1
+        assert stats['failures'] == 1
+
+    def test_after_request_runs_queued_functions(self):
+        postcommit_handlers.postcommit_queue().update({'a': functools.partial(succeed), 'b': functools.partial(succeed)})
+        postcommit_handlers.postcommit_after_request(mock.Mock(status_code=200))
+        assert postcommit_handlers.get_postcommit_stats()['osf_tests.test_handlers.succeed']['calls'] == 2
+
+    def test_after_request_publishes_celery_tasks_as_group(self):
+        postcommit_handlers.postcommit_celery_queue().update({
+            'a': on_node_updated.si(node_id='woop', user_id='heyyo', first_save=False, saved_fields={'title'}),
+            'b': on_node_updated.si(node_id='woop', user_id='heyyo', first_save=False, saved_fields={'tags'}),
+        })
+        with mock.patch('framework.postcommit_tasks.handlers.settings.USE_CELERY', True), \
+                mock.patch('framework.postcommit_tasks.handlers.group') as mock_group:
+            postcommit_handlers.postcommit_after_request(mock.Mock(status_code=200))
+        assert mock_group.call_count == 1
+        assert len(mock_group.call_args[0][0]) == 2
+        mock_group.return_value.apply_async.assert_called_once_with()
+
+    def test_error_response_discards_queue(self):
+        postcommit_handlers.postcommit_queue().update({'a': functools.partial(fail)})
+        postcommit_handlers.postcommit_after_request(mock.Mock(status_code=500))
+        assert postcommit_handlers.get_postcommit_stats() == {}
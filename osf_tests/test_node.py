@@ -33,6 +33,7 @@ from osf.models import (
     NodeLog,
     Contributor,
     RegistrationSchema,
+    NodeClosure,
     NodeRelation,
     Registration,
     DraftRegistration,
@@ -574,6 +575,74 @@ class TestRoot:
                 assert p.parent_node._id in parent_list
 
 
+class TestNodeClosure:
+
+    def closure_rows(self, node):
+        return set(NodeClosure.objects.filter(descendant=node).values_list('ancestor_id', 'depth'))
+
+    def test_closure_rows_created(self):
+        project = ProjectFactory()
+        child = NodeFactory(parent=project)
+        grandchild = NodeFactory(parent=child)
+
+        assert self.closure_rows(project) == set()
+        assert self.closure_rows(child) == {(project.id, 1)}
+        assert self.closure_rows(grandchild) == {(child.id, 1), (project.id, 2)}
+        assert project.get_root() == project
+        assert grandchild.get_root() == project
+
+    def test_node_links_not_in_closure(self):
+        project = ProjectFactory()
+        linked = ProjectFactory()
+        project.add_node_link(linked, auth=Auth(project.creator), save=True)
+
+        assert self.closure_rows(linked) == set()
+        assert linked.get_root() == linked
+
+    def test_closure_rows_follow_moved_subtree(self):
+        project = ProjectFactory()
+        other = ProjectFactory()
+        child = NodeFactory(parent=project)
+        grandchild = NodeFactory(parent=child)
+
+        NodeRelation.objects.get(parent=project, child=child).delete()
+        assert self.closure_rows(child) == set()
+        assert self.closure_rows(grandchild) == {(child.id, 1)}
+
+        NodeRelation.objects.create(parent=other, child=child)
+        assert self.closure_rows(child) == {(other.id, 1)}
+        assert self.closure_rows(grandchild) == {(child.id, 1), (other.id, 2)}
+        assert grandchild.get_root() == other
+        assert set(Node.objects.get_children(child, include_root=True)) == {child, grandchild}
+
+    def test_has_permission_on_children(self):
+        user = UserFactory()
+        project = ProjectFactory()
+        child = NodeFactory(parent=project)
+        grandchild = NodeFactory(parent=child)
+        grandchild.add_contributor(user, permissions=WRITE, auth=Auth(grandchild.creator), save=True)
+
+        assert project.has_permission_on_children(user, WRITE)
+        assert not project.has_permission_on_children(user, ADMIN)
+
+        child.is_deleted = True
+        child.save()
+        assert not project.has_permission_on_children(user, WRITE)
+
+    def test_find_readable_descendants(self):
+        user = UserFactory()
+        project = ProjectFactory()
+        child = NodeFactory(parent=project)
+        readable_child = NodeFactory(parent=project)
+        readable_grandchild = NodeFactory(parent=child)
+        NodeFactory(parent=readable_grandchild)
+        for node in (readable_child, readable_grandchild):
+            node.add_contributor(user, permissions=READ, auth=Auth(node.creator), save=True)
+
+        readable = list(project.find_readable_descendants(Auth(user)))
+        assert readable == [readable_child, readable_grandchild]
+
+
 @pytest.mark.enable_implicit_clean
 class TestNodeMODMCompat:
 
@@ -4299,6 +4368,33 @@ class TestAddonMethods:
             addon_count
         )
 
+    def test_get_addons_cached(self, node, auth, django_assert_num_queries):
+        names = node.get_addon_names()
+        with django_assert_num_queries(0):
+            assert node.get_addon_names() == names
+            assert node.has_addon('wiki')
+            assert not node.has_addon('dropbox')
+
+        node.add_addon('dropbox', auth)
+        assert node.has_addon('dropbox')
+        node.delete_addon('dropbox', auth)
+        assert not node.has_addon('dropbox')
+        assert node.has_addon('dropbox', is_deleted=True)
+
+    def test_prefetch_addons(self, node, auth, django_assert_num_queries):
+        other = ProjectFactory()
+        other.add_addon('dropbox', auth)
+        addon_names = set(node.get_addon_names()) | set(other.get_addon_names())
+        nodes = [Node.load(node._id), Node.load(other._id)]
+
+        # One UNION query, then one query per addon either node has
+        with django_assert_num_queries(1 + len(addon_names)):
+            AbstractNode.prefetch_addons(nodes)
+        with django_assert_num_queries(0):
+            assert not nodes[0].has_addon('dropbox')
+            assert nodes[1].has_addon('dropbox')
+            assert nodes[1].get_addon('dropbox').owner is nodes[1]
+
 # copied from tests/test_models.py
 class TestAddonCallbacks:
     """Verify that callback functions are called at the right times, with the
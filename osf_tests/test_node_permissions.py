@@ -0,0 +1,75 @@
+import pytest
+
+from framework.auth import Auth
+from osf.models import Node
+from osf.utils.node_permissions import (
+    NODE_PERMISSIONS_KEY,
+    READABLE,
+    get_cache,
+    get_generation,
+    get_node_ids_for_user,
+    invalidate_node_ids,
+)
+from osf.utils.permissions import ADMIN, READ, READ_NODE, WRITE_NODE
+from osf_tests.factories import NodeFactory, ProjectFactory, UserFactory
+
+
+@pytest.fixture()
+def user():
+    return UserFactory()
+
+
+@pytest.fixture()
+def project():
+    return ProjectFactory()
+
+
+@pytest.mark.django_db
+class TestNodePermissionsCache:
+
+    def test_node_ids_are_cached(self, user, project):
+        project.add_contributor(user, permissions=READ, auth=Auth(project.creator), save=True)
+
+        assert get_node_ids_for_user(user, READ_NODE) == [project.id]
+        key = NODE_PERMISSIONS_KEY.format(user_id=user.id, generation=get_generation(user.id), permission=READ_NODE)
+        assert get_cache().get(key) == [project.id]
+        assert get_node_ids_for_user(user, WRITE_NODE) == []
+
+    def test_set_computed_before_invalidation_is_not_served(self, user, project):
+        project.add_contributor(user, permissions=READ, auth=Auth(project.creator), save=True)
+        generation = get_generation(user.id)
+        invalidate_node_ids([user.id])
+        # A reader that computed its set before the invalidation stores it afterwards
+        get_cache().set(
+            NODE_PERMISSIONS_KEY.format(user_id=user.id, generation=generation, permission=READ_NODE),
+            [project.id, project.id + 1],
+        )
+
+        assert get_generation(user.id) != generation
+        assert get_node_ids_for_user(user, READ_NODE) == [project.id]
+
+    def test_contributor_changes_invalidate(self, user, project):
+        auth = Auth(project.creator)
+        assert project not in Node.objects.can_view(user)
+
+        project.add_contributor(user, permissions=READ, auth=auth, save=True)
+        assert project in Node.objects.can_view(user)
+        assert project in Node.objects.get_nodes_for_user(user)
+
+        project.remove_contributor(user, auth=auth)
+        assert project not in Node.objects.can_view(user)
+        assert project not in Node.objects.get_nodes_for_user(user)
+
+    def test_admin_of_parent_can_view_components(self, user, project):
+        child = NodeFactory(parent=project)
+        project.add_contributor(user, permissions=ADMIN, auth=Auth(project.creator), save=True)
+        assert set(get_node_ids_for_user(user, READABLE)) == {project.id, child.id}
+
+        grandchild = NodeFactory(parent=child)
+        assert grandchild in Node.objects.can_view(user)
+        # Implicit read does not make nodes show up as the user's own
+        assert grandchild not in Node.objects.get_nodes_for_user(user)
+
+    def test_anonymous(self, project):
+        assert get_node_ids_for_user(None) == []
+        assert list(Node.objects.can_view(None)) == []
@@ -0,0 +1,75 @@
+import pytest
+from django.test import RequestFactory
+
+from api.base.api_globals import api_globals
+from framework.auth import Auth
+from osf.utils.permission_cache import get_permission_cache, prefetch_permissions
+from osf.utils.permissions import ADMIN, READ, WRITE
+from osf_tests.factories import NodeFactory, ProjectFactory, UserFactory
+
+
+@pytest.fixture()
+def request_context():
+    api_globals.request = RequestFactory().get('/')
+    yield api_globals.request
+    api_globals.request = None
+
+
+@pytest.fixture()
+def user():
+    return UserFactory()
+
+
+@pytest.fixture()
+def project():
+    return ProjectFactory()
+
+
+@pytest.mark.django_db
+class TestPermissionCache:
+
+    def test_no_cache_outside_request(self):
+        assert get_permission_cache() is None
+
+    def test_permissions_cached_for_request(self, request_context, user, project):
+        project.add_contributor(user, permissions=WRITE, auth=Auth(project.creator), save=True)
+
+        assert project.has_permission(user, WRITE)
+        assert project.get_permissions(user) == [READ, WRITE]
+        assert not project.has_permission(user, ADMIN)
+        assert len(get_permission_cache()) == 1
+
+    def test_prefetch_permissions(self, request_context, user, project, django_assert_num_queries):
+        other = ProjectFactory()
+        other.add_contributor(user, permissions=READ, auth=Auth(other.creator), save=True)
+        # Looks up the permission model and its content type once
+        prefetch_permissions(user, [ProjectFactory()])
+
+        with django_assert_num_queries(1):
+            prefetch_permissions(user, [project, other])
+        with django_assert_num_queries(0):
+            assert other.has_permission(user, READ, check_parent=False)
+            assert not project.has_permission(user, READ, check_parent=False)
+
+    def test_contributor_changes_clear_cache(self, request_context, user, project):
+        auth = Auth(project.creator)
+        assert not project.has_permission(user, READ)
+
+        project.add_contributor(user, permissions=WRITE, auth=auth, save=True)
+        assert project.has_permission(user, WRITE)
+
+        project.update_contributor(user, READ, True, auth=auth, save=True)
+        assert not project.has_permission(user, WRITE)
+
+        project.remove_contributor(user, auth=auth)
+        assert not project.has_permission(user, READ)
+
+    def test_admin_parent_from_ancestors(self, request_context, user, project):
+        child = NodeFactory(parent=project)
+        grandchild = NodeFactory(parent=child)
+        assert not grandchild.has_permission(user, READ)
+
+        project.add_contributor(user, permissions=ADMIN, auth=Auth(project.creator), save=True)
+        assert grandchild.has_permission(user, READ)
+        assert grandchild.is_admin_parent(user)
+        assert not grandchild.has_permission(user, WRITE)
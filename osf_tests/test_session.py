@@ -1,9 +1,14 @@
+import mock
 import pytest
+from django.conf import settings as django_settings
+from django.core.cache import caches
 
 from framework.sessions import utils
+from framework.sessions.backends import get_session_backend
 from tests.base import DbTestCase
 from osf_tests.factories import SessionFactory, UserFactory
 from osf.models import OSFUser, Session
+from website import settings
 
 @pytest.mark.django_db
 class TestSession:
@@ -31,6 +36,60 @@ class TestSession:
         assert Session.objects.count() == 1
 
 
+@pytest.mark.django_db
+class TestCacheSessionBackend:
+
+    @pytest.fixture(autouse=True)
+    def backend(self):
+        cache = caches[django_settings.SESSION_CACHE_NAME]
+        cache.clear()
+        with mock.patch.object(settings, 'SESSION_BACKEND', 'cache'):
+            yield get_session_backend()
+        cache.clear()
+
+    def test_new_session_is_written_to_database(self, backend):
+        session = Session(data={'auth_user_id': 'abc12'})
+        session.save()
+        assert Session.objects.get(_id=session._id).data == {'auth_user_id': 'abc12'}
+        assert backend.load(session._id).data == {'auth_user_id': 'abc12'}
+
+    def test_data_updates_are_written_behind(self, backend):
+        session = Session(data={'auth_user_id': 'abc12'})
+        session.save()
+        session.data['status'] = ['Saved']
+        session.save()
+        assert 'status' not in Session.objects.get(_id=session._id).data
+        assert backend.load(session._id).data['status'] == ['Saved']
+
+    def test_stale_database_copy_is_updated(self, backend):
+        session = Session(data={'auth_user_id': 'abc12'})
+        session.save()
+        session.synced_at -= settings.SESSION_WRITE_BEHIND_INTERVAL
+        session.data['status'] = ['Saved']
+        session.save()
+        assert Session.objects.get(_id=session._id).data['status'] == ['Saved']
+
+    def test_user_change_is_written_to_database(self, backend):
+        session = Session()
+        session.save()
+        session.data['auth_user_id'] = 'abc12'
+        session.save()
+        assert Session.objects.get(_id=session._id).data['auth_user_id'] == 'abc12'
+
+    def test_load_falls_back_to_database(self, backend):
+        session = Session(data={'auth_user_id': 'abc12'})
+        session.save_to_database()
+        assert backend.load(session._id).data == {'auth_user_id': 'abc12'}
+        assert backend.load('notasession') is None
+
+    def test_remove_sessions_for_user(self, backend):
+        user = UserFactory()
+        session = SessionFactory(user=user)
+        utils.remove_sessions_for_user(user)
+        assert backend.load(session._id) is None
+        assert not Session.objects.filter(_id=session._id).exists()
+
+
 class SessionUtilsTestCase(DbTestCase):
     def setUp(self, *args, **kwargs):
         super(SessionUtilsTestCase, self).setUp(*args, **kwargs)
@@ -3,7 +3,10 @@ import pytest
 from website.settings import StorageLimits, STORAGE_WARNING_THRESHOLD, STORAGE_LIMIT_PUBLIC, STORAGE_LIMIT_PRIVATE, GBs
 from osf_tests.factories import ProjectFactory
 from api.caching import settings as cache_settings
+from api.caching.tasks import adjust_storage_usage, get_storage_limit_statuses, get_storage_usages
 from api.caching.utils import storage_usage_cache
+from osf.management.commands.reconcile_storage_usage import reconcile_storage_usage
+from osf.models import NodeStorageUsage
 
 @pytest.mark.django_db
 @pytest.mark.enable_enqueue_task
@@ -63,3 +66,78 @@ class TestStorageUsageLimits:
         storage_usage_cache.set(key, node.custom_storage_usage_limit_public * GBs - 1)
 
         assert node.storage_limit_status is StorageLimits.APPROACHING_PUBLIC
+
+
+@pytest.mark.django_db
+class TestNodeStorageUsage:
+
+    @pytest.fixture()
+    def node(self):
+        return ProjectFactory()
+
+    @pytest.fixture()
+    def key(self, node):
+        return cache_settings.STORAGE_USAGE_KEY.format(target_id=node._id)
+
+    def test_usage_read_from_ledger(self, node, key):
+        NodeStorageUsage.set_total(node.id, 1337)
+        storage_usage_cache.delete(key)
+
+        assert node.storage_usage == 1337
+        assert storage_usage_cache.get(key) == 1337
+
+    def test_adjust_storage_usage(self, node, key):
+        storage_usage_cache.set(key, 100)
+
+        # Seeded from the cache and left for reconciliation to verify
+        adjust_storage_usage(node, 50)
+        ledger = NodeStorageUsage.objects.get(target=node)
+        assert ledger.total == 150
+        assert ledger.stale
+        assert storage_usage_cache.get(key) == 150
+
+        NodeStorageUsage.set_total(node.id, 150)
+        adjust_storage_usage(node, -50)
+        ledger.refresh_from_db()
+        assert ledger.total == 100
+        assert not ledger.stale
+
+        # Totals do not go negative, and one that would have has drifted
+        adjust_storage_usage(node, -200)
+        ledger.refresh_from_db()
+        assert ledger.total == 0
+        assert ledger.stale
+
+    def test_reconcile_storage_usage(self, node, key):
+        NodeStorageUsage.objects.create(target=node, total=1337, stale=True)
+
+        reconcile_storage_usage()
+
+        ledger = NodeStorageUsage.objects.get(target=node)
+        assert ledger.total == 0
+        assert not ledger.stale
+        assert ledger.reconciled is not None
+        assert storage_usage_cache.get(key) == 0
+
+    def test_get_storage_usages(self, node, key):
+        ledger_node = ProjectFactory()
+        cold_node = ProjectFactory()
+        storage_usage_cache.set(key, int(STORAGE_LIMIT_PRIVATE * GBs))
+        NodeStorageUsage.set_total(ledger_node.id, 5)
+        storage_usage_cache.delete(cache_settings.STORAGE_USAGE_KEY.format(target_id=ledger_node._id))
+        storage_usage_cache.delete(cache_settings.STORAGE_USAGE_KEY.format(target_id=cold_node._id))
+
+        assert get_storage_usages([node, ledger_node, cold_node], compute_missing=False) == {
+            node.id: int(STORAGE_LIMIT_PRIVATE * GBs),
+            ledger_node.id: 5,
+            cold_node.id: None,
+        }
+
+        statuses = get_storage_limit_statuses([node, ledger_node, cold_node])
+        assert statuses == {
+            node.id: StorageLimits.OVER_PRIVATE,
+            ledger_node.id: StorageLimits.DEFAULT,
+            cold_node.id: StorageLimits.DEFAULT,
+        }
+        assert NodeStorageUsage.objects.get(target=cold_node).total == 0
+        assert storage_usage_cache.get(cache_settings.STORAGE_USAGE_KEY.format(target_id=cold_node._id)) == 0
@@ -2,6 +2,8 @@ import collections
 import mock
 from babel import dates, Locale
 from schema import Schema, And, Use, Or
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils import timezone
 
 from nose.tools import *  # noqa PEP8 asserts
@@ -14,6 +16,7 @@ from website.notifications.exceptions import InvalidSubscriptionError
 from website.notifications import constants
 from website.notifications import emails
 from website.notifications import utils
+from website.notifications.resolver import SubscriptionResolver
 from website import mails
 from website.profile.utils import get_profile_image_url
 from website.project.signals import contributor_removed, node_deleted
@@ -1284,6 +1287,21 @@ class TestCompileSubscriptions(NotificationTestCase):
         subs = emails.compile_subscriptions(node5, 'file_updated')
         assert_equal(subs, {'email_transactional': [], 'email_digest': [self.user_1._id], 'none': []})
 
+    def test_resolver_queries_do_not_grow_with_depth(self):
+        self.base_sub.email_transactional.add(self.user_1)
+        self.shared_sub.email_digest.add(self.user_2)
+        node = factories.NodeFactory(parent=self.shared_node, creator=self.user_1)
+        with CaptureQueriesContext(connection) as shallow_queries:
+            subs = SubscriptionResolver(node).resolve('file_updated')
+        assert_equal(subs, {'email_transactional': [self.user_1._id], 'email_digest': [self.user_2._id], 'none': []})
+
+        for _ in range(4):
+            node = factories.NodeFactory(parent=node, creator=self.user_1)
+        with CaptureQueriesContext(connection) as deep_queries:
+            subs = SubscriptionResolver(node).resolve('file_updated')
+        assert_equal(subs, {'email_transactional': [self.user_1._id], 'email_digest': [self.user_2._id], 'none': []})
+        assert_equal(len(deep_queries), len(shallow_queries))
+
 
 class TestMoveSubscription(NotificationTestCase):
     def setUp(self):
@@ -1580,6 +1598,29 @@ class TestSendEmails(NotificationTestCase):
         subs = emails.check_node(self.project, 'comments')
         assert_equal(subs, {'email_transactional': [self.project.creator._id], 'email_digest': [], 'none': []})
 
+    @mock.patch('website.mails.render_message', return_value='message')
+    def test_store_emails_renders_once_and_bulk_creates(self, mock_render):
+        recipients = [factories.UserFactory() for _ in range(3)]
+        time_now = timezone.now()
+        emails.store_emails([recipient._id for recipient in recipients], 'email_transactional', 'comments',
+                            self.user, self.node, time_now)
+        assert_equal(mock_render.call_count, 1)
+        digests = NotificationDigest.objects.filter(user__in=recipients)
+        assert_equal(digests.count(), 3)
+        for digest in digests:
+            assert_equal(digest.message, 'message')
+            assert_equal(digest.node_lineage, [self.project._id, self.node._id])
+
+    @mock.patch('website.notifications.emails.enqueue_task')
+    @mock.patch('website.mails.render_message', return_value='message')
+    def test_store_emails_over_threshold_enqueues(self, mock_render, mock_enqueue):
+        recipients = [factories.UserFactory() for _ in range(3)]
+        with mock.patch.object(settings, 'NOTIFICATION_DIGEST_ASYNC_THRESHOLD', 2):
+            emails.store_emails([recipient._id for recipient in recipients], 'email_transactional', 'comments',
+                                self.user, self.node, timezone.now())
+        assert_true(mock_enqueue.called)
+        assert_false(NotificationDigest.objects.filter(user__in=recipients).exists())
+
     @mock.patch('website.project.views.comment.notify')
     def test_check_user_comment_reply_subscription_if_email_not_sent_to_target_user(self, mock_notify):
         # user subscribed to comment replies
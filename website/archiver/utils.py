@@ -1,7 +1,8 @@
 import bleach
 import functools
 
-from collections import defaultdict
+from collections import OrderedDict, defaultdict, deque
+from operator import itemgetter
 from django.db.models import CharField, OuterRef, Subquery
 from framework.auth import Auth
 
@@ -186,25 +187,30 @@ def _do_get_file_map(file_tree):
     """Reduces a tree of folders and files into a list of (<sha256>, <file_metadata>) pairs
     """
     file_map = []
-    stack = [file_tree]
-    while len(stack):
-        tree_node = stack.pop(0)
+    queue = deque([file_tree])
+    while queue:
+        tree_node = queue.popleft()
         if tree_node['kind'] == 'file':
             file_map.append((tree_node['extra']['hashes']['sha256'], tree_node))
         else:
-            stack = stack + tree_node['children']
+            queue.extend(tree_node['children'])
     return file_map
 
 def _memoize_get_file_map(func):
-    cache = {}
+    # Least recently used file maps are dropped once there are more than ARCHIVE_FILE_MAP_CACHE_SIZE
+    cache = OrderedDict()
 
     @functools.wraps(func)
     def wrapper(node):
         from osf.models import OSFUser
-        if node._id not in cache:
+        if node._id in cache:
+            cache.move_to_end(node._id)
+        else:
             osf_storage = node.get_addon('osfstorage')
             file_tree = osf_storage._get_file_tree(user=OSFUser.load(list(node.admin_contributor_or_group_member_ids)[0]))
             cache[node._id] = _do_get_file_map(file_tree)
+            while len(cache) > settings.ARCHIVE_FILE_MAP_CACHE_SIZE:
+                cache.popitem(last=False)
         return func(node, cache[node._id])
     return wrapper
 
@@ -221,6 +227,17 @@ def get_file_map(node, file_map):
         for key, value, node_id in get_file_map(child):
             yield (key, value, node_id)
 
+def get_file_index(registration):
+    """Index the archived files of a registration and its components by sha256, in one pass.
+
+    Returns a dictionary mapping each hash to a list of (<position>, <file_metadata>, <node_id>),
+    where position is the file's place in get_file_map(registration).
+    """
+    file_index = defaultdict(list)
+    for position, (file_sha, file_info, node_id) in enumerate(get_file_map(registration)):
+        file_index[file_sha].append((position, file_info, node_id))
+    return file_index
+
 
 def get_title_for_question(schema, qid):
     annotated_blocks = schema.schema_blocks.filter(
@@ -250,7 +267,8 @@ def migrate_file_metadata(dst):
         return
 
     file_response_keys_by_hash = _get_file_response_hashes(dst, file_input_qids)
-    updated_file_responses = _get_updated_file_references(dst, file_response_keys_by_hash)
+    file_index = get_file_index(dst)
+    updated_file_responses = _get_updated_file_references(dst, file_response_keys_by_hash, file_index)
 
     _validate_updated_responses(dst, file_input_qids, updated_file_responses)
 
@@ -281,40 +299,50 @@ def _get_file_response_hashes(registration, file_input_qids):
     return file_response_keys_by_hash
 
 
-def _get_updated_file_references(registration, file_response_keys_by_hash):
-    '''Loop through archived files to get the updated references for the registration responses.
+def _get_updated_file_references(registration, file_response_keys_by_hash, file_index=None):
+    '''Look up the archived files of each file response to get the updated references for the registration responses.
 
-    Returns a dictionary mapping each qid to its list of updated responses
+    Returns a dictionary mapping each qid to its list of updated responses, in archived file order
     '''
     from osf.models import Guid
-    original_responses = registration.schema_responses.get().all_responses
-    updated_file_responses = defaultdict(list)
-    previous_node_id = ''
-    for file_sha, file_info, archived_node_id in get_file_map(registration):
-        # cache the guid of the source project for the current file tree
-        if archived_node_id != previous_node_id:
-            previous_node_id = archived_node_id
-            source_project_id = Guid.objects.get(_id=archived_node_id).referent.registered_from._id
-
-        if file_sha in file_response_keys_by_hash:
+    if file_index is None:
+        file_index = get_file_index(registration)
+    original_entries = _index_entries_by_hash(registration.schema_responses.get().all_responses)
+    # guids of the source projects of the archived nodes
+    source_project_ids = {}
+    matches = defaultdict(list)
+    for file_sha, qids in file_response_keys_by_hash.items():
+        for position, file_info, archived_node_id in file_index.get(file_sha, []):
+            if archived_node_id not in source_project_ids:
+                source_project_ids[archived_node_id] = Guid.objects.get(_id=archived_node_id).referent.registered_from._id
+            source_project_id = source_project_ids[archived_node_id]
+
             response_value = _make_file_response(file_info, archived_node_id)
-            for qid in file_response_keys_by_hash[file_sha]:
+            for qid in qids:
                 # Handle the case where the same file exists in multiple components
-                original_response = _get_response_entry_for_hash(original_responses, qid, file_sha)
+                original_response = original_entries[(qid, file_sha)]
                 if (
                     source_project_id in original_response['file_urls']['html']
                     and response_value['file_name'] == original_response['file_name']
                 ):
-                    updated_file_responses[qid].append(response_value)
+                    matches[qid].append((position, response_value))
 
+    updated_file_responses = defaultdict(list)
+    for qid, entries in matches.items():
+        updated_file_responses[qid] = [response_value for _, response_value in sorted(entries, key=itemgetter(0))]
     return updated_file_responses
 
 
-def _get_response_entry_for_hash(response_dict, qid, file_hash):
-    for entry in response_dict[qid]:
-        if entry['file_hashes']['sha256'] == file_hash:
-            return entry
-    return None
+def _index_entries_by_hash(response_dict):
+    '''Map each (qid, hash) to the first entry of the qid's response with that hash.'''
+    entries = {}
+    for qid, response in response_dict.items():
+        if not isinstance(response, list):
+            continue
+        for entry in response:
+            if isinstance(entry, dict) and 'file_hashes' in entry:
+                entries.setdefault((qid, entry['file_hashes']['sha256']), entry)
+    return entries
 
 
 def _make_file_response(file_info, parent_guid):
@@ -338,14 +366,14 @@ def _make_file_response(file_info, parent_guid):
 def _validate_updated_responses(registration, file_input_qids, updated_responses):
     '''Confirm that every file response has an updated value and that nothing fishy happened.'''
     schema = registration.registration_schema
+    updated_entries = _index_entries_by_hash(updated_responses)
     missing_responses = []
     for qid in file_input_qids:
         question_title = ''
         for entry in registration.registration_responses.get(qid, []):
             file_name = entry['file_name']
             file_hash = entry['file_hashes']['sha256']
-            matching_entry = _get_response_entry_for_hash(updated_responses, qid, file_hash)
-            if not matching_entry:
+            if (qid, file_hash) not in updated_entries:
                 question_title = question_title or get_title_for_question(schema, qid)
                 missing_responses.append({'file_name': file_name, 'question_title': question_title})
 
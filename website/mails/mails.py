@@ -18,8 +18,10 @@ Usage: ::
     mails.send_mail('foo@bar.com', mails.CONFIRM_EMAIL, user=user)
 
 """
+import functools
 import os
 import logging
+import re
 import waffle
 
 from mako.lookup import TemplateLookup, Template
@@ -76,6 +78,20 @@ def render_message(tpl_name, **context):
     return tpl.render(**context)
 
 
+_INHERIT_RE = re.compile(r"_inherit_from\(context, '([^']+)'")
+
+
+@functools.lru_cache(maxsize=None)
+def template_uses(tpl_name, name):
+    """Whether the email template ``tpl_name``, or a template it inherits from, reads ``name``
+    from its context.
+    """
+    code = _tpl_lookup.get_template(tpl_name).code
+    if "context.get('{}'".format(name) in code:
+        return True
+    return any(template_uses(parent, name) for parent in _INHERIT_RE.findall(code))
+
+
 def send_mail(
         to_addr, mail, from_addr=None, mailer=None, celery=True,
         username=None, password=None, callback=None, attachment_name=None,
@@ -1,10 +1,13 @@
 from babel import dates, core, Locale
 
-from osf.models import AbstractNode, OSFUser, NotificationDigest, NotificationSubscription
+from framework.celery_tasks.handlers import enqueue_task
+from osf.models import AbstractNode, OSFUser, NotificationSubscription
 from osf.utils.permissions import ADMIN, READ
-from website import mails
+from website import mails, settings
 from website.notifications import constants
+from website.notifications import tasks
 from website.notifications import utils
+from website.notifications.resolver import SubscriptionResolver
 from website.util import web_url_for
 
 
@@ -32,7 +35,7 @@ def notify(event, user, node, timestamp, **context):
         subscriptions = get_user_subscriptions(target_user, event_type)
     else:
         # local project user
-        subscriptions = compile_subscriptions(node, event_type, event)
+        subscriptions = SubscriptionResolver(node).resolve(event_type, event)
 
     for notification_type in subscriptions:
         if notification_type == 'none' or not subscriptions[notification_type]:
@@ -63,13 +66,18 @@ def notify_global_event(event, sender_user, node, timestamp, recipients, templat
     if not context:
         context = {}
 
+    recipients = list(recipients)
+    resolver = SubscriptionResolver(node)
+    notification_types = resolver.get_user_notification_types(recipients, event_type)
+    if node.provider:
+        resolver.prefetch_permissions(recipients)
+
     for recipient in recipients:
-        subscriptions = get_user_subscriptions(recipient, event_type)
         context['is_creator'] = recipient == node.creator
         if node.provider:
-            context['has_psyarxiv_chronos_text'] = node.has_permission(recipient, ADMIN) and 'psyarxiv' in node.provider.name.lower()
-        for notification_type in subscriptions:
-            if (notification_type != 'none' and subscriptions[notification_type] and recipient._id in subscriptions[notification_type]):
+            context['has_psyarxiv_chronos_text'] = resolver.has_permission(recipient, ADMIN) and 'psyarxiv' in node.provider.name.lower()
+        for notification_type in notification_types[recipient._id]:
+            if notification_type != 'none':
                 store_emails([recipient._id], notification_type, event, sender_user, node, timestamp, template=template, **context)
                 sent_users.append(recipient._id)
 
@@ -98,56 +106,55 @@ def store_emails(recipient_ids, notification_type, event, user, node, timestamp,
     # user whose action triggered email sending
     context['user'] = user
     node_lineage_ids = get_node_lineage(node) if node else []
-
+    recipients = {
+        recipient._id: recipient
+        for recipient in OSFUser.objects.filter(guids___id__in=recipient_ids)
+    }
+
+    # Templates that do not depend on the recipient are rendered once per localized timestamp
+    per_recipient = mails.template_uses(template, 'recipient')
+    messages = []
+    message_indexes = {}
+    recipient_messages = []
     for recipient_id in recipient_ids:
         if recipient_id == user._id:
             continue
-        recipient = OSFUser.load(recipient_id)
+        recipient = recipients[recipient_id]
         if recipient.is_disabled:
             continue
         context['localized_timestamp'] = localize_timestamp(timestamp, recipient)
         context['recipient'] = recipient
-        message = mails.render_message(template, **context)
-        digest = NotificationDigest(
-            timestamp=timestamp,
-            send_type=notification_type,
-            event=event,
-            user=recipient,
-            message=message,
-            node_lineage=node_lineage_ids,
-            provider=abstract_provider
+        key = recipient_id if per_recipient else context['localized_timestamp']
+        if key not in message_indexes:
+            message_indexes[key] = len(messages)
+            messages.append(mails.render_message(template, **context))
+        recipient_messages.append((recipient.pk, message_indexes[key]))
+
+    if not recipient_messages:
+        return
+    provider_id = abstract_provider.pk if abstract_provider else None
+    threshold = settings.NOTIFICATION_DIGEST_ASYNC_THRESHOLD
+    if threshold is not None and len(recipient_messages) > threshold:
+        enqueue_task(tasks.store_digests.s(
+            notification_type, event, timestamp.isoformat(), node_lineage_ids, messages, recipient_messages,
+            provider_id=provider_id,
+        ))
+    else:
+        tasks.create_digests(
+            notification_type, event, timestamp, node_lineage_ids, messages, recipient_messages,
+            provider_id=provider_id,
         )
-        digest.save()
 
 
-def compile_subscriptions(node, event_type, event=None, level=0):
-    """Recurse through node and parents for subscriptions.
+def compile_subscriptions(node, event_type, event=None):
+    """Compile the subscriptions of a node and its parents.
 
     :param node: current node
     :param event_type: Generally node_subscriptions_available
     :param event: Particular event such a file_updated that has specific file subs
-    :param level: How deep the recursion is
     :return: a dict of notification types with lists of users.
     """
-    subscriptions = check_node(node, event_type)
-    if event:
-        subscriptions = check_node(node, event)  # Gets particular event subscriptions
-        parent_subscriptions = compile_subscriptions(node, event_type, level=level + 1)  # get node and parent subs
-    elif getattr(node, 'parent_id', False):
-        parent_subscriptions = \
-            compile_subscriptions(AbstractNode.load(node.parent_id), event_type, level=level + 1)
-    else:
-        parent_subscriptions = check_node(None, event_type)
-    for notification_type in parent_subscriptions:
-        p_sub_n = parent_subscriptions[notification_type]
-        p_sub_n.extend(subscriptions[notification_type])
-        for nt in subscriptions:
-            if notification_type != nt:
-                p_sub_n = list(set(p_sub_n).difference(set(subscriptions[nt])))
-        if level == 0:
-            p_sub_n, removed = utils.separate_users(node, p_sub_n)
-        parent_subscriptions[notification_type] = p_sub_n
-    return parent_subscriptions
+    return SubscriptionResolver(node).resolve(event_type, event)
 
 
 def check_node(node, event):
@@ -178,16 +185,7 @@ def get_node_lineage(node):
     """ Get a list of node ids in order from the node to top most project
         e.g. [parent._id, node._id]
     """
-    from osf.models import Preprint
-    lineage = [node._id]
-    if isinstance(node, Preprint):
-        return lineage
-
-    while node.parent_id:
-        node = node.parent_node
-        lineage = [node._id] + lineage
-
-    return lineage
+    return SubscriptionResolver(node).lineage_ids
 
 
 def get_settings_url(uid, user):
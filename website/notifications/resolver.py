@@ -0,0 +1,162 @@
+"""
+Resolve the recipients of a node's notifications in bulk.
+
+A SubscriptionResolver loads the node's lineage, the subscriptions of every level of it and the
+node group permissions of the subscribed users on the lineage with a constant number of queries,
+then works out who gets which kind of notification in memory.
+"""
+from collections import defaultdict
+
+from django.apps import apps
+
+from osf.utils.permission_cache import get_ancestors
+from osf.utils.permissions import ADMIN, READ
+from website.notifications import constants
+from website.notifications import utils
+
+
+class SubscriptionResolver(object):
+
+    def __init__(self, node):
+        AbstractNode = apps.get_model('osf.AbstractNode')
+        self.node = node
+        # Nearest first; preprints and other targets have no lineage of their own
+        if isinstance(node, AbstractNode):
+            self.lineage = [node] + get_ancestors(node)
+        else:
+            self.lineage = [node]
+        self._node_lineage = isinstance(node, AbstractNode)
+        # (node pk, user pk) -> codenames of the user's group permissions on the node
+        self._permissions = defaultdict(set)
+        self._permission_user_ids = set()
+        self._users = {}
+
+    @property
+    def lineage_ids(self):
+        """Guids of the node and its ancestors, top most project first"""
+        return [node._id for node in reversed(self.lineage)]
+
+    def _load_subscriptions(self, keys):
+        """Return {<key>: {<notification type>: {<user guid>: <user pk>}}} for the subscriptions
+        with the given keys, without disabled users.
+        """
+        NotificationSubscription = apps.get_model('osf.NotificationSubscription')
+        subscriptions = {
+            key: {notification_type: {} for notification_type in constants.NOTIFICATION_TYPES}
+            for key in keys
+        }
+        subscription_keys = dict(NotificationSubscription.objects.filter(_id__in=keys).values_list('id', '_id'))
+        if not subscription_keys:
+            return subscriptions
+        for notification_type in constants.NOTIFICATION_TYPES:
+            through = getattr(NotificationSubscription, notification_type).through
+            members = through.objects.filter(
+                notificationsubscription_id__in=list(subscription_keys),
+                osfuser__date_disabled__isnull=True,
+            ).values_list('notificationsubscription_id', 'osfuser__guids___id', 'osfuser_id')
+            for subscription_id, user_guid, user_id in members:
+                subscriptions[subscription_keys[subscription_id]][notification_type][user_guid] = user_id
+        return subscriptions
+
+    def _load_permissions(self, user_ids):
+        missing = set(user_ids) - self._permission_user_ids
+        if not missing:
+            return
+        self._permission_user_ids.update(missing)
+        if self._node_lineage:
+            NodeGroupObjectPermission = apps.get_model('osf.NodeGroupObjectPermission')
+            rows = NodeGroupObjectPermission.objects.filter(
+                content_object_id__in=[node.pk for node in self.lineage],
+                group__user__in=missing,
+            ).values_list('content_object_id', 'group__user', 'permission__codename')
+            for node_id, user_id, codename in rows:
+                self._permissions[(node_id, user_id)].add(codename)
+        else:
+            OSFUser = apps.get_model('osf.OSFUser')
+            self._users.update(OSFUser.objects.in_bulk(missing - set(self._users)))
+
+    def _has_permission(self, user_id, permission, level=0):
+        """Mirror ``node.has_permission(user, permission)`` for the node ``level`` steps up the lineage."""
+        node = self.lineage[level]
+        if not self._node_lineage:
+            return node.has_permission(self._users.get(user_id), permission)
+        perm = '{}_{}'.format(permission, node.guardian_object_type)
+        if perm in self._permissions[(node.pk, user_id)]:
+            return True
+        if permission != READ:
+            return False
+        # Admins of the node or anything above it can read it
+        admin = '{}_{}'.format(ADMIN, node.guardian_object_type)
+        return any(admin in self._permissions[(ancestor.pk, user_id)] for ancestor in self.lineage[level:])
+
+    def resolve(self, event_type, event=None):
+        """Return {<notification type>: [<user guid>]} for ``event_type`` on the node, as
+        ``emails.compile_subscriptions``: each user gets the notification type of the nearest
+        subscription they can read, and ``event`` (e.g. a particular file's updates) beats
+        ``event_type``. Users who cannot read the node are left out.
+        """
+        # (node, subscription key) from the top most project down
+        levels = [
+            (level, utils.to_subscription_key(node._id, event_type))
+            for level, node in reversed(list(enumerate(self.lineage)))
+        ]
+        if event:
+            levels.append((0, utils.to_subscription_key(self.node._id, event)))
+        subscriptions = self._load_subscriptions({key for _, key in levels})
+        user_ids = {}
+        for members_by_type in subscriptions.values():
+            for members in members_by_type.values():
+                user_ids.update(members)
+        self._load_permissions(user_ids.values())
+
+        resolved = {notification_type: set() for notification_type in constants.NOTIFICATION_TYPES}
+        for level, key in levels:
+            level_subscriptions = {
+                notification_type: {
+                    guid for guid, user_id in members.items()
+                    if self._has_permission(user_id, READ, level)
+                }
+                for notification_type, members in subscriptions[key].items()
+            }
+            for notification_type in resolved:
+                others = set().union(*(
+                    users for nt, users in level_subscriptions.items() if nt != notification_type
+                ))
+                resolved[notification_type] = (resolved[notification_type] | level_subscriptions[notification_type]) - others
+
+        return {
+            notification_type: sorted(guid for guid in guids if self._has_permission(user_ids[guid], READ))
+            for notification_type, guids in resolved.items()
+        }
+
+    def get_user_notification_types(self, users, event):
+        """Return {<user guid>: [<notification type>]} of each user's own subscription to ``event``,
+        as ``emails.get_user_subscriptions``. Disabled users have none.
+        """
+        users = list(users)
+        keys = {user._id: utils.to_subscription_key(user._id, event) for user in users}
+        subscriptions = self._load_subscriptions(set(keys.values()))
+        return {
+            guid: [
+                notification_type
+                for notification_type, members in subscriptions[key].items()
+                if guid in members
+            ]
+            for guid, key in keys.items()
+        }
+
+    def has_permission(self, user, permission):
+        """``node.has_permission(user, permission)``, with the permissions of all users checked
+        through this resolver loaded together.
+        """
+        if not user or user.is_anonymous:
+            return False
+        self._users.setdefault(user.pk, user)
+        self._load_permissions([user.pk])
+        return self._has_permission(user.pk, permission)
+
+    def prefetch_permissions(self, users):
+        """Load the permissions of ``users`` on the lineage for ``has_permission`` together."""
+        for user in users:
+            self._users.setdefault(user.pk, user)
+        self._load_permissions([user.pk for user in users])
@@ -4,6 +4,7 @@ Tasks for making even transactional emails consolidated.
 import itertools
 
 from django.db import connection
+from django.utils.dateparse import parse_datetime
 
 from framework.celery_tasks import app as celery_app
 from framework.sentry import log_exception
@@ -21,6 +22,34 @@ from website import mails, settings
 from website.notifications.utils import NotificationsDict
 
 
+def create_digests(send_type, event, timestamp, node_lineage, messages, recipient_messages, provider_id=None):
+    """Insert the NotificationDigests of one event with a single bulk insert.
+
+    :param list messages: distinct rendered messages
+    :param list recipient_messages: (<user pk>, <index into messages>) for each recipient
+    """
+    NotificationDigest.objects.bulk_create([
+        NotificationDigest(
+            timestamp=timestamp,
+            send_type=send_type,
+            event=event,
+            user_id=user_id,
+            message=messages[message_index],
+            node_lineage=node_lineage,
+            provider_id=provider_id,
+        )
+        for user_id, message_index in recipient_messages
+    ])
+
+
+@celery_app.task(name='website.notifications.tasks.store_digests', max_retries=0)
+def store_digests(send_type, event, timestamp, node_lineage, messages, recipient_messages, provider_id=None):
+    """Insert the NotificationDigests of an event with many recipients outside of the request.
+    ``timestamp`` is an ISO 8601 string; see create_digests for the other parameters.
+    """
+    create_digests(send_type, event, parse_datetime(timestamp), node_lineage, messages, recipient_messages, provider_id=provider_id)
+
+
 @celery_app.task(name='website.notifications.tasks.send_users_email', max_retries=0)
 def send_users_email(send_type):
     """Send pending emails.
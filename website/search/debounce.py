@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Coalesce search reindex tasks for objects that are saved repeatedly.
+
+Once a request has committed, the first update of an object marks it as pending and
+schedules its reindex task ``SEARCH_REINDEX_DEBOUNCE`` seconds later. Updates that
+arrive while the mark is set are dropped: they are already committed, so the pending
+task will read them from the database. The task clears the mark before it loads the
+object, so anything saved after that point schedules a new task.
+"""
+import logging
+
+from django.conf import settings as django_settings
+from django.core.cache import caches
+from flask import _app_ctx_stack as context_stack
+
+from api.base.api_globals import api_globals
+from framework.celery_tasks.handlers import enqueue_task
+from framework.postcommit_tasks.handlers import enqueue_postcommit_task
+from website import settings
+
+logger = logging.getLogger(__name__)
+
+COALESCED_COUNT_KEY = 'search-reindex:coalesced'
+
+
+def get_cache():
+    return caches[django_settings.SEARCH_REINDEX_CACHE_NAME]
+
+
+def get_pending_key(doc_type, object_id):
+    return 'search-reindex:{}:{}'.format(doc_type, object_id)
+
+
+def get_coalesced_count():
+    """Return how many search updates were folded into an already scheduled reindex."""
+    return get_cache().get(COALESCED_COUNT_KEY, 0)
+
+
+def record_coalesced():
+    cache = get_cache()
+    try:
+        cache.incr(COALESCED_COUNT_KEY)
+    except ValueError:
+        cache.add(COALESCED_COUNT_KEY, 1, timeout=None)
+
+
+def schedule_reindex(doc_type, object_id, signature):
+    if get_cache().add(get_pending_key(doc_type, object_id), True, timeout=settings.SEARCH_REINDEX_PENDING_TIMEOUT):
+        signature.apply_async(countdown=settings.SEARCH_REINDEX_DEBOUNCE)
+    else:
+        record_coalesced()
+        logger.debug('Coalesced search reindex of {} {}'.format(doc_type, object_id))
+
+
+def clear_pending(doc_type, object_id):
+    get_cache().delete(get_pending_key(doc_type, object_id))
+
+
+def enqueue_reindex(doc_type, object_id, signature):
+    """Schedule ``signature`` to reindex an object once the current request commits,
+    unless a reindex of the same object is already pending. Outside of a request the
+    task runs immediately, as with ``enqueue_task``.
+    """
+    if (
+        context_stack.top is None and
+        getattr(api_globals, 'request', None) is None
+    ):  # Not in a request context
+        enqueue_task(signature)
+    else:
+        enqueue_postcommit_task(schedule_reindex, (doc_type, object_id, signature), {}, celery=False)
@@ -2,12 +2,15 @@
 
 from __future__ import division
 
+import contextlib
 import copy
 import functools
 import logging
 import math
 import re
+import threading
 import unicodedata
+from collections import defaultdict
 from framework import sentry
 
 import six
@@ -15,12 +18,19 @@ import six
 from django.apps import apps
 from django.core.paginator import Paginator
 from django.contrib.contenttypes.models import ContentType
-from django.db.models import Q
+from django.db import connection
+from django.db.models import F, Max, Prefetch, Q, prefetch_related_objects
 from elasticsearch2 import (ConnectionError, Elasticsearch, NotFoundError,
                            RequestError, TransportError, helpers)
 from framework.celery_tasks import app as celery_app
 from framework.database import paginated
 from osf.models import AbstractNode
+from osf.models import Contributor
+from osf.models import Guid
+from osf.models import NodeLicenseRecord
+from osf.models import NodeRelation
+from osf.models import PreprintContributor
+from osf.models import Tag
 from osf.models import OSFUser
 from osf.models import BaseFileNode
 from osf.models import Institution
@@ -28,14 +38,16 @@ from osf.models import OSFGroup
 from osf.models import QuickFilesNode
 from osf.models import Preprint
 from osf.models import SpamStatus
-from addons.wiki.models import WikiPage
+from addons.wiki.models import WikiVersion
 from osf.models import CollectionSubmission
 from osf.utils.sanitize import unescape_entities
 from osf.utils.workflows import CollectionSubmissionStates
 from website import settings
 from website.filters import profile_image_url
 from osf.models.licenses import serialize_node_license_record
-from website.search import exceptions
+from osf.models.node import NodeGroupObjectPermission
+from osf.models.osf_group import OSFGroupGroupObjectPermission
+from website.search import debounce, exceptions
 from website.search.util import build_query, clean_splitters
 from website.views import validate_page_num
 
@@ -142,6 +154,108 @@ def requires_search(func):
     return wrapped
 
 
+_local = threading.local()
+
+
+class IndexingBuffer(object):
+    """Collects index and delete actions and sends them to elasticsearch in chunked
+    bulk requests. Rather than refreshing once per document, every index touched by
+    the buffer is refreshed a single time when the buffer is flushed.
+    """
+
+    def __init__(self, chunk_size=None, refresh=True):
+        self.chunk_size = chunk_size or settings.ELASTIC_BULK_CHUNK_SIZE
+        self.refresh = refresh
+        self.actions = []
+        self.touched_indices = set()
+
+    def index(self, index, doc_type, id_, body):
+        self._add({
+            '_op_type': 'index',
+            '_index': index,
+            '_type': doc_type,
+            '_id': id_,
+            '_source': body,
+        })
+
+    def delete(self, index, doc_type, id_):
+        self._add({
+            '_op_type': 'delete',
+            '_index': index,
+            '_type': doc_type,
+            '_id': id_,
+        })
+
+    def _add(self, action):
+        self.actions.append(action)
+        if len(self.actions) >= self.chunk_size:
+            self._send()
+
+    def _send(self):
+        actions, self.actions = self.actions, []
+        if not actions:
+            return
+        self.touched_indices.update(action['_index'] for action in actions)
+        _, errors = helpers.bulk(client(), actions, chunk_size=self.chunk_size, raise_on_error=False)
+        failed = []
+        for error in errors:
+            op_type, item = list(error.items())[0]
+            # Deleting a document that was never indexed is not a failure
+            if op_type == 'delete' and item.get('status') == 404:
+                continue
+            logger.error('Bulk {} of {} document {} failed: {}'.format(
+                op_type, item.get('_type'), item.get('_id'), item.get('error')
+            ))
+            failed.append(error)
+        if failed:
+            # Raised so that the task that buffered the documents is retried
+            raise helpers.BulkIndexError('{} document(s) failed to index.'.format(len(failed)), failed)
+
+    def flush(self):
+        self._send()
+        if self.refresh and self.touched_indices:
+            client().indices.refresh(index=','.join(sorted(self.touched_indices)))
+        self.touched_indices = set()
+
+
+def get_indexing_buffer():
+    return getattr(_local, 'indexing_buffer', None)
+
+
+@contextlib.contextmanager
+def bulk_indexing(chunk_size=None, refresh=True):
+    """Buffer every document indexed or deleted inside the block and send them to
+    elasticsearch with the bulk API on exit. Nested blocks share the outermost
+    buffer, which is only flushed once the outermost block exits cleanly.
+    """
+    buffer = get_indexing_buffer()
+    if buffer is not None:
+        yield buffer
+        return
+    buffer = _local.indexing_buffer = IndexingBuffer(chunk_size=chunk_size, refresh=refresh)
+    try:
+        yield buffer
+    finally:
+        _local.indexing_buffer = None
+    buffer.flush()
+
+
+def index_doc(index, doc_type, id_, body):
+    buffer = get_indexing_buffer()
+    if buffer is not None:
+        buffer.index(index, doc_type, id_, body)
+    else:
+        client().index(index=index, doc_type=doc_type, id=id_, body=body, refresh=True)
+
+
+def remove_doc(index, doc_type, id_):
+    buffer = get_indexing_buffer()
+    if buffer is not None:
+        buffer.delete(index, doc_type, id_)
+    else:
+        client().delete(index=index, doc_type=doc_type, id=id_, refresh=True, ignore=[404])
+
+
 @requires_search
 def get_aggregations(query, doc_type):
     query['aggregations'] = {
@@ -356,6 +470,7 @@ def get_doctype_from_node(node):
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
 def update_node_async(self, node_id, index=None, bulk=False):
+    debounce.clear_pending('node', node_id)
     AbstractNode = apps.get_model('osf.AbstractNode')
     node = AbstractNode.load(node_id)
     try:
@@ -365,6 +480,7 @@ def update_node_async(self, node_id, index=None, bulk=False):
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
 def update_preprint_async(self, preprint_id, index=None, bulk=False):
+    debounce.clear_pending('preprint', preprint_id)
     Preprint = apps.get_model('osf.Preprint')
     preprint = Preprint.load(preprint_id)
     try:
@@ -383,6 +499,7 @@ def update_group_async(self, group_id, index=None, bulk=False, deleted_id=None):
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
 def update_user_async(self, user_id, index=None):
+    debounce.clear_pending('user', user_id)
     OSFUser = apps.get_model('osf.OSFUser')
     user = OSFUser.objects.get(id=user_id)
     try:
@@ -390,6 +507,185 @@ def update_user_async(self, user_id, index=None):
     except Exception as exc:
         self.retry(exc)
 
+# Same lookup as AbstractNode.LICENSE_QUERY, for many nodes at once
+INHERITED_LICENSES_QUERY = re.sub(r'\s+', ' ', """WITH RECURSIVE ascendants AS (
+        SELECT
+            R.child_id AS node_id,
+            N.node_license_id,
+            R.parent_id
+        FROM "{noderelation}" AS R
+            JOIN "{abstractnode}" AS N ON N.id = R.parent_id
+        WHERE R.is_node_link IS FALSE
+            AND R.child_id = ANY(%s)
+    UNION ALL
+        SELECT
+            D.node_id,
+            N.node_license_id,
+            R.parent_id
+        FROM ascendants AS D
+            JOIN "{noderelation}" AS R ON D.parent_id = R.child_id
+            JOIN "{abstractnode}" AS N ON N.id = R.parent_id
+        WHERE R.is_node_link IS FALSE
+        AND D.node_license_id IS NULL
+) SELECT node_id, node_license_id FROM ascendants WHERE node_license_id IS NOT NULL;""")
+
+
+SEARCH_DATA_ATTRS = (
+    'search_contributors',
+    'search_tags',
+    'search_institutions',
+    'search_groups',
+    'search_license',
+    'search_wikis',
+    'search_guid',
+)
+
+
+def prefetch_search_data(objs, file_targets=True):
+    """Load the related data the search serializers need for a batch of nodes, preprints
+    or files with a fixed number of grouped queries, and cache it on each instance.
+    Objects that have already been prefetched are skipped.
+
+    :param bool file_targets: Load the whole search data of the targets of files, rather than
+    only the tags that file documents read
+    :return list: Every instance that was populated, including the targets of files
+    """
+    objs = [obj for obj in objs if not hasattr(obj, 'search_tags')]
+    nodes = [obj for obj in objs if isinstance(obj, AbstractNode)]
+    preprints = [obj for obj in objs if isinstance(obj, Preprint)]
+    files = [obj for obj in objs if isinstance(obj, BaseFileNode)]
+    prefetched = nodes + preprints + files
+    if nodes:
+        _prefetch_node_search_data(nodes)
+    if preprints:
+        _prefetch_preprint_search_data(preprints)
+    if files:
+        prefetched.extend(_prefetch_file_search_data(files, full_targets=file_targets))
+    return prefetched
+
+
+@contextlib.contextmanager
+def prefetched_search_data(objs, file_targets=True):
+    """Prefetch search data for ``objs`` for the duration of the block. The cached data
+    is discarded on exit so that a later update of the same instance sees fresh values.
+    """
+    prefetched = prefetch_search_data(objs, file_targets=file_targets)
+    try:
+        yield
+    finally:
+        for obj in prefetched:
+            for attr in SEARCH_DATA_ATTRS:
+                obj.__dict__.pop(attr, None)
+
+
+def _prefetch_node_search_data(nodes):
+    node_ids = [node.id for node in nodes]
+    prefetch_related_objects(
+        nodes,
+        Prefetch(
+            'contributor_set',
+            queryset=Contributor.objects.filter(visible=True).select_related('user').prefetch_related('user__guids').order_by('_order'),
+            to_attr='search_contributors',
+        ),
+        Prefetch('tags', queryset=Tag.objects.all(), to_attr='search_tags'),
+        Prefetch('affiliated_institutions', to_attr='search_institutions'),
+        'guids',
+    )
+
+    parents = {}
+    for relation in NodeRelation.objects.filter(child_id__in=node_ids, is_node_link=False).select_related('parent').prefetch_related('parent__guids'):
+        parents.setdefault(relation.child_id, relation.parent)
+
+    member_groups = defaultdict(set)
+    for node_id, group_id in NodeGroupObjectPermission.objects.filter(
+        content_object_id__in=node_ids,
+        group__name__icontains='osfgroup',
+    ).values_list('content_object_id', 'group_id'):
+        member_groups[node_id].add(group_id)
+    osf_groups = defaultdict(dict)
+    for group_id, osf_group_id, name, _id in OSFGroupGroupObjectPermission.objects.filter(
+        group_id__in=set().union(*member_groups.values()),
+    ).values_list('group_id', 'content_object_id', 'content_object__name', 'content_object___id'):
+        osf_groups[group_id][osf_group_id] = {'name': name, '_id': _id}
+
+    license_ids = {node.id: node.node_license_id for node in nodes if node.node_license_id}
+    inherits_license = [node.id for node in nodes if not node.node_license_id]
+    if inherits_license:
+        with connection.cursor() as cursor:
+            cursor.execute(INHERITED_LICENSES_QUERY.format(
+                abstractnode=AbstractNode._meta.db_table,
+                noderelation=NodeRelation._meta.db_table,
+            ), [inherits_license])
+            license_ids.update(cursor.fetchall())
+    licenses = NodeLicenseRecord.objects.select_related('node_license').in_bulk(set(license_ids.values()))
+
+    wikis = defaultdict(list)
+    for wiki in WikiVersion.objects.annotate(
+        newest_version=Max('wiki_page__versions__identifier'),
+    ).filter(
+        identifier=F('newest_version'),
+        wiki_page__node_id__in=node_ids,
+        wiki_page__deleted__isnull=True,
+    ).select_related('wiki_page'):
+        wikis[wiki.wiki_page.node_id].append(wiki)
+
+    for node in nodes:
+        if 'parent_node' not in node.__dict__:
+            node.parent_node = parents.get(node.id)
+        groups = {}
+        for group_id in member_groups[node.id]:
+            groups.update(osf_groups[group_id])
+        node.search_groups = list(groups.values())
+        node.search_license = licenses.get(license_ids.get(node.id))
+        node.search_wikis = wikis[node.id]
+
+
+def _prefetch_preprint_search_data(preprints):
+    prefetch_related_objects(
+        preprints,
+        Prefetch(
+            'preprintcontributor_set',
+            queryset=PreprintContributor.objects.filter(visible=True).select_related('user').prefetch_related('user__guids').order_by('_order'),
+            to_attr='search_contributors',
+        ),
+        Prefetch('tags', queryset=Tag.objects.all(), to_attr='search_tags'),
+        'license__node_license',
+        'guids',
+    )
+    for preprint in preprints:
+        preprint.search_license = preprint.license
+
+
+def _prefetch_file_search_data(files, full_targets=True):
+    prefetch_related_objects(
+        files,
+        Prefetch('tags', queryset=Tag.objects.all(), to_attr='search_tags'),
+        'target',
+    )
+    guids = {}
+    for object_id, _id in Guid.objects.filter(
+        content_type=ContentType.objects.get_for_model(BaseFileNode),
+        object_id__in=[file_.id for file_ in files],
+    ).order_by('-created').values_list('object_id', '_id'):
+        guids.setdefault(object_id, _id)
+    targets = {}
+    for file_ in files:
+        file_.search_guid = guids.get(file_.id)
+        target = file_.target
+        if target is not None:
+            targets[(type(target), target.id)] = target
+    if full_targets:
+        return prefetch_search_data(list(targets.values()))
+
+    targets_by_type = defaultdict(list)
+    for target in targets.values():
+        if not hasattr(target, 'search_tags'):
+            targets_by_type[type(target)].append(target)
+    for same_type_targets in targets_by_type.values():
+        prefetch_related_objects(same_type_targets, Prefetch('tags', queryset=Tag.objects.all(), to_attr='search_tags'))
+    return [target for same_type_targets in targets_by_type.values() for target in same_type_targets]
+
+
 def serialize_node(node, category):
     parent_id = node.parent_id
 
@@ -402,24 +698,23 @@ def serialize_node(node, category):
         'id': node._id,
         'contributors': [
             {
-                'fullname': x['user__fullname'],
-                'url': '/{}/'.format(x['user__guids___id']) if x['user__is_active'] else None
+                'fullname': contributor.user.fullname,
+                'url': '/{}/'.format(contributor.user._id) if contributor.user.is_active else None
             }
-            for x in node.contributor_set.filter(visible=True).order_by('_order')
-            .values('user__fullname', 'user__guids___id', 'user__is_active')
+            for contributor in node.search_contributors
         ],
         'groups': [
             {
                 'name': x['name'],
                 'url': '/{}/'.format(x['_id'])
             }
-            for x in node.osf_groups.values('name', '_id')
+            for x in node.search_groups
         ],
         'title': node.title,
         'normalized_title': normalized_title,
         'category': category,
         'public': node.is_public,
-        'tags': list(node.tags.filter(system=False).values_list('name', flat=True)),
+        'tags': [tag.name for tag in node.search_tags],
         'description': node.description,
         'url': node.url,
         'is_registration': node.is_registration,
@@ -432,13 +727,13 @@ def serialize_node(node, category):
         'wikis': {},
         'parent_id': parent_id,
         'date_created': node.created,
-        'license': serialize_node_license_record(node.license),
-        'affiliated_institutions': list(node.affiliated_institutions.values_list('name', flat=True)),
+        'license': serialize_node_license_record(node.search_license),
+        'affiliated_institutions': [institution.name for institution in node.search_institutions],
         'boost': int(not node.is_registration) + 1,  # This is for making registered projects less relevant
         'extra_search_terms': clean_splitters(node.title),
     }
     if not node.is_retracted:
-        for wiki in WikiPage.objects.get_wiki_pages_latest(node):
+        for wiki in node.search_wikis:
             # '.' is not allowed in field names in ES2
             elastic_document['wikis'][wiki.wiki_page.page_name.replace('.', ' ')] = wiki.raw_text(node)
 
@@ -454,11 +749,10 @@ def serialize_preprint(preprint, category):
         'id': preprint._id,
         'contributors': [
             {
-                'fullname': x['user__fullname'],
-                'url': '/{}/'.format(x['user__guids___id']) if x['user__is_active'] else None
+                'fullname': contributor.user.fullname,
+                'url': '/{}/'.format(contributor.user._id) if contributor.user.is_active else None
             }
-            for x in preprint.contributor_set.filter(visible=True).order_by('_order')
-            .values('user__fullname', 'user__guids___id', 'user__is_active')
+            for contributor in preprint.search_contributors
         ],
         'title': preprint.title,
         'normalized_title': normalized_title,
@@ -466,11 +760,11 @@ def serialize_preprint(preprint, category):
         'public': preprint.is_public,
         'published': preprint.verified_publishable,
         'is_retracted': preprint.is_retracted,
-        'tags': list(preprint.tags.filter(system=False).values_list('name', flat=True)),
+        'tags': [tag.name for tag in preprint.search_tags],
         'description': preprint.description,
         'url': preprint.url,
         'date_created': preprint.created,
-        'license': serialize_node_license_record(preprint.license),
+        'license': serialize_node_license_record(preprint.search_license),
         'boost': 2,  # More relevant than a registration
         'extra_search_terms': clean_splitters(preprint.title),
     }
@@ -514,37 +808,49 @@ def serialize_group(group, category):
 def update_node(node, index=None, bulk=False, async_update=False):
     from addons.osfstorage.models import OsfStorageFile
     index = index or INDEX
-    for file_ in paginated(OsfStorageFile, Q(target_content_type=ContentType.objects.get_for_model(type(node)), target_object_id=node.id)):
-        update_file(file_, index=index)
-
-    is_qa_node = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(node.tags.all().values_list('name', flat=True))) or any(substring in node.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
-    if node.is_deleted or not node.is_public or node.archiving or node.is_spam or (node.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH) or node.is_quickfiles or is_qa_node:
-        delete_doc(node._id, node, index=index)
-    else:
-        category = get_doctype_from_node(node)
-        elastic_document = serialize_node(node, category)
-        if bulk:
-            return elastic_document
+    with bulk_indexing(), prefetched_search_data([node]):
+        for files in paginated(OsfStorageFile, Q(target_content_type=ContentType.objects.get_for_model(type(node)), target_object_id=node.id), each=False):
+            files = list(files)
+            for file_ in files:
+                file_.target = node
+            with prefetched_search_data(files):
+                for file_ in files:
+                    update_file(file_, index=index)
+
+        is_qa_node = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(tag.name for tag in node.search_tags)) or any(substring in node.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
+        if node.is_deleted or not node.is_public or node.archiving or node.is_spam or (node.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH) or node.is_quickfiles or is_qa_node:
+            delete_doc(node._id, node, index=index)
         else:
-            client().index(index=index, doc_type=category, id=node._id, body=elastic_document, refresh=True)
+            category = get_doctype_from_node(node)
+            elastic_document = serialize_node(node, category)
+            if bulk:
+                return elastic_document
+            else:
+                index_doc(index, category, node._id, elastic_document)
 
 @requires_search
 def update_preprint(preprint, index=None, bulk=False, async_update=False):
     from addons.osfstorage.models import OsfStorageFile
     index = index or INDEX
-    for file_ in paginated(OsfStorageFile, Q(target_content_type=ContentType.objects.get_for_model(type(preprint)), target_object_id=preprint.id)):
-        update_file(file_, index=index)
-
-    is_qa_preprint = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(preprint.tags.all().values_list('name', flat=True))) or any(substring in preprint.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
-    if not preprint.verified_publishable or preprint.is_spam or (preprint.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH) or is_qa_preprint:
-        delete_doc(preprint._id, preprint, category='preprint', index=index)
-    else:
-        category = 'preprint'
-        elastic_document = serialize_preprint(preprint, category)
-        if bulk:
-            return elastic_document
+    with bulk_indexing(), prefetched_search_data([preprint]):
+        for files in paginated(OsfStorageFile, Q(target_content_type=ContentType.objects.get_for_model(type(preprint)), target_object_id=preprint.id), each=False):
+            files = list(files)
+            for file_ in files:
+                file_.target = preprint
+            with prefetched_search_data(files):
+                for file_ in files:
+                    update_file(file_, index=index)
+
+        is_qa_preprint = bool(set(settings.DO_NOT_INDEX_LIST['tags']).intersection(tag.name for tag in preprint.search_tags)) or any(substring in preprint.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
+        if not preprint.verified_publishable or preprint.is_spam or (preprint.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH) or is_qa_preprint:
+            delete_doc(preprint._id, preprint, category='preprint', index=index)
         else:
-            client().index(index=index, doc_type=category, id=preprint._id, body=elastic_document, refresh=True)
+            category = 'preprint'
+            elastic_document = serialize_preprint(preprint, category)
+            if bulk:
+                return elastic_document
+            else:
+                index_doc(index, category, preprint._id, elastic_document)
 
 @requires_search
 def update_group(group, index=None, bulk=False, async_update=False, deleted_id=None):
@@ -558,7 +864,7 @@ def update_group(group, index=None, bulk=False, async_update=False, deleted_id=N
         if bulk:
             return elastic_document
         else:
-            client().index(index=index, doc_type=category, id=group._id, body=elastic_document, refresh=True)
+            index_doc(index, category, group._id, elastic_document)
 
 def bulk_update_nodes(serialize, nodes, index=None, category=None):
     """Updates the list of input projects
@@ -569,18 +875,20 @@ def bulk_update_nodes(serialize, nodes, index=None, category=None):
     :return:
     """
     index = index or INDEX
+    nodes = list(nodes)
     actions = []
-    for node in nodes:
-        serialized = serialize(node)
-        if serialized:
-            actions.append({
-                '_op_type': 'update',
-                '_index': index,
-                '_id': node._id,
-                '_type': category or get_doctype_from_node(node),
-                'doc': serialized,
-                'doc_as_upsert': True,
-            })
+    with bulk_indexing(), prefetched_search_data(nodes):
+        for node in nodes:
+            serialized = serialize(node)
+            if serialized:
+                actions.append({
+                    '_op_type': 'update',
+                    '_index': index,
+                    '_id': node._id,
+                    '_type': category or get_doctype_from_node(node),
+                    'doc': serialized,
+                    'doc_as_upsert': True,
+                })
     if actions:
         return helpers.bulk(client(), actions)
 
@@ -672,19 +980,14 @@ def update_user(user, index=None):
     index = index or INDEX
     if not user.is_active:
         try:
-            client().delete(index=index, doc_type='user', id=user._id, refresh=True, ignore=[404])
-            # update files in their quickfiles node if the user has been marked as spam
-            if user.spam_status == SpamStatus.SPAM:
-                quickfiles = QuickFilesNode.objects.get_for_user(user)
-                if quickfiles:
-                    for quickfile_id in quickfiles.files.values_list('_id', flat=True):
-                        client().delete(
-                            index=index,
-                            doc_type='file',
-                            id=quickfile_id,
-                            refresh=True,
-                            ignore=[404]
-                        )
+            with bulk_indexing():
+                remove_doc(index, 'user', user._id)
+                # update files in their quickfiles node if the user has been marked as spam
+                if user.spam_status == SpamStatus.SPAM:
+                    quickfiles = QuickFilesNode.objects.get_for_user(user)
+                    if quickfiles:
+                        for quickfile_id in quickfiles.files.values_list('_id', flat=True):
+                            remove_doc(index, 'file', quickfile_id)
         except NotFoundError:
             pass
         return
@@ -723,40 +1026,33 @@ def update_user(user, index=None):
         'boost': 2,  # TODO(fabianvf): Probably should make this a constant or something
     }
 
-    client().index(index=index, doc_type='user', body=user_doc, id=user._id, refresh=True)
+    index_doc(index, 'user', user._id, user_doc)
 
 @requires_search
 def update_file(file_, index=None, delete=False):
+    # A file document only reads its target's tags, not the target's whole search data
+    with prefetched_search_data([file_], file_targets=False):
+        _update_file(file_, index=index, delete=delete)
+
+def _update_file(file_, index=None, delete=False):
     index = index or INDEX
     target = file_.target
 
     # TODO: Can remove 'not file_.name' if we remove all base file nodes with name=None
     file_node_is_qa = bool(
-        set(settings.DO_NOT_INDEX_LIST['tags']).intersection(file_.tags.all().values_list('name', flat=True))
+        set(settings.DO_NOT_INDEX_LIST['tags']).intersection(tag.name for tag in file_.search_tags)
     ) or bool(
-        set(settings.DO_NOT_INDEX_LIST['tags']).intersection(target.tags.all().values_list('name', flat=True))
+        set(settings.DO_NOT_INDEX_LIST['tags']).intersection(tag.name for tag in target.search_tags)
     ) or any(substring in target.title for substring in settings.DO_NOT_INDEX_LIST['titles'])
     if not file_.name or not target.is_public or delete or file_node_is_qa or getattr(target, 'is_deleted', False) or getattr(target, 'archiving', False) or target.is_spam or (
             target.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH):
-        client().delete(
-            index=index,
-            doc_type='file',
-            id=file_._id,
-            refresh=True,
-            ignore=[404]
-        )
+        remove_doc(index, 'file', file_._id)
         return
 
     if isinstance(target, Preprint):
-        if not getattr(target, 'verified_publishable', False) or target.primary_file != file_ or target.is_spam or (
+        if not getattr(target, 'verified_publishable', False) or target.primary_file_id != file_.id or target.is_spam or (
                 target.spam_status == SpamStatus.FLAGGED and settings.SPAM_FLAGGED_REMOVE_FROM_SEARCH):
-            client().delete(
-                index=index,
-                doc_type='file',
-                id=file_._id,
-                refresh=True,
-                ignore=[404]
-            )
+            remove_doc(index, 'file', file_._id)
             return
 
     # We build URLs manually here so that this function can be
@@ -772,16 +1068,15 @@ def update_file(file_, index=None, delete=False):
         node_url = '/{target_id}/'.format(target_id=target._id)
 
     guid_url = None
-    file_guid = file_.get_guid(create=False)
-    if file_guid:
-        guid_url = '/{file_guid}/'.format(file_guid=file_guid._id)
+    if file_.search_guid:
+        guid_url = '/{file_guid}/'.format(file_guid=file_.search_guid)
     # File URL's not provided for preprint files, because the File Detail Page will
     # just reroute to preprints detail
     file_doc = {
         'id': file_._id,
         'deep_url': None if isinstance(target, Preprint) else file_deep_url,
         'guid_url': None if isinstance(target, Preprint) else guid_url,
-        'tags': list(file_.tags.filter(system=False).values_list('name', flat=True)),
+        'tags': [tag.name for tag in file_.search_tags],
         'name': file_.name,
         'category': 'file',
         'node_url': node_url,
@@ -792,20 +1087,14 @@ def update_file(file_, index=None, delete=False):
         'extra_search_terms': clean_splitters(file_.name),
     }
 
-    client().index(
-        index=index,
-        doc_type='file',
-        body=file_doc,
-        id=file_._id,
-        refresh=True
-    )
+    index_doc(index, 'file', file_._id, file_doc)
 
 @requires_search
 def update_institution(institution, index=None):
     index = index or INDEX
     id_ = institution._id
     if institution.deleted or institution.deactivated:
-        client().delete(index=index, doc_type='institution', id=id_, refresh=True, ignore=[404])
+        remove_doc(index, 'institution', id_)
     else:
         institution_doc = {
             'id': id_,
@@ -815,7 +1104,7 @@ def update_institution(institution, index=None):
             'name': institution.name,
         }
 
-        client().index(index=index, doc_type='institution', body=institution_doc, id=id_, refresh=True)
+        index_doc(index, 'institution', id_, institution_doc)
 
 
 @celery_app.task(bind=True, max_retries=5, default_retry_delay=60)
@@ -830,31 +1119,32 @@ def update_collection_submission_async(self, node_id, collection_id=None, op='up
     if collection_id:
         qs = qs.filter(collection_id=collection_id)
 
-    for collection_submission in qs:
-        if op == 'update':
-            if not collection_submission.guid.referent.is_public:
-                continue
-            if collection_submission.guid.referent.deleted:
-                continue
-            if collection_submission.state in [
-                CollectionSubmissionStates.REMOVED,
-                CollectionSubmissionStates.REJECTED,
-                CollectionSubmissionStates.PENDING
-            ]:
-                continue
-        try:
-            update_collection_submission(collection_submission, op=op, index=index)
-        except Exception as exc:
-            self.retry(exc=exc)
+    try:
+        with bulk_indexing():
+            for collection_submission in qs:
+                if op == 'update':
+                    if not collection_submission.guid.referent.is_public:
+                        continue
+                    if collection_submission.guid.referent.deleted:
+                        continue
+                    if collection_submission.state in [
+                        CollectionSubmissionStates.REMOVED,
+                        CollectionSubmissionStates.REJECTED,
+                        CollectionSubmissionStates.PENDING
+                    ]:
+                        continue
+                update_collection_submission(collection_submission, op=op, index=index)
+    except Exception as exc:
+        self.retry(exc=exc)
 
 @requires_search
 def update_collection_submission(collection_submission, op='update', index=None):
     index = index or INDEX
     if op == 'delete':
-        client().delete(index=index, doc_type='collectionSubmission', id=collection_submission._id, refresh=True, ignore=[404])
+        remove_doc(index, 'collectionSubmission', collection_submission._id)
         return
     collection_submission_doc = serialize_collection_submission(collection_submission)
-    client().index(index=index, doc_type='collectionSubmission', body=collection_submission_doc, id=collection_submission._id, refresh=True)
+    index_doc(index, 'collectionSubmission', collection_submission._id, collection_submission_doc)
 
 @requires_search
 def delete_all():
@@ -946,12 +1236,12 @@ def delete_doc(elastic_document_id, node, index=None, category=None):
             category = 'registration'
         else:
             category = node.project_or_component
-    client().delete(index=index, doc_type=category, id=elastic_document_id, refresh=True, ignore=[404])
+    remove_doc(index, category, elastic_document_id)
 
 @requires_search
 def delete_group_doc(deleted_id, index=None):
     index = index or INDEX
-    client().delete(index=index, doc_type='group', id=deleted_id, refresh=True, ignore=[404])
+    remove_doc(index, 'group', deleted_id)
 
 @requires_search
 def search_contributor(query, page=0, size=10, exclude=None, current_user=None):
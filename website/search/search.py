@@ -3,6 +3,7 @@ import logging
 from framework.celery_tasks.handlers import enqueue_task
 
 from website import settings
+from website.search import debounce
 
 logger = logging.getLogger(__name__)
 
@@ -37,7 +38,7 @@ def update_node(node, index=None, bulk=False, async_update=True, saved_fields=No
         # database in order for method that updates the Node's elastic search document
         # to run correctly.
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_node_async.s(node_id=node_id, **kwargs))
+            debounce.enqueue_reindex('node', node_id, search_engine.update_node_async.s(node_id=node_id, **kwargs))
         else:
             search_engine.update_node_async(node_id=node_id, **kwargs)
     else:
@@ -54,7 +55,7 @@ def update_preprint(preprint, index=None, bulk=False, async_update=True, saved_f
         preprint_id = preprint._id
         # We need the transaction to be committed before trying to run celery tasks.
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_preprint_async.s(preprint_id=preprint_id, **kwargs))
+            debounce.enqueue_reindex('preprint', preprint_id, search_engine.update_preprint_async.s(preprint_id=preprint_id, **kwargs))
         else:
             search_engine.update_preprint_async(preprint_id=preprint_id, **kwargs)
     else:
@@ -105,7 +106,7 @@ def update_user(user, index=None, async_update=True):
     if async_update:
         user_id = user.id
         if settings.USE_CELERY:
-            enqueue_task(search_engine.update_user_async.s(user_id, index=index))
+            debounce.enqueue_reindex('user', user_id, search_engine.update_user_async.s(user_id, index=index))
         else:
             search_engine.update_user_async(user_id, index=index)
     else:
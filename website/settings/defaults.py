@@ -108,6 +108,8 @@ SEARCH_ENGINE = 'elastic'  # Can be 'elastic', or None
 ELASTIC_URI = '127.0.0.1:9200'
 ELASTIC_TIMEOUT = 10
 ELASTIC_INDEX = 'website'
+# Number of index/delete actions sent per bulk request when indexing is buffered
+ELASTIC_BULK_CHUNK_SIZE = 500
 ELASTIC_KWARGS = {
     # 'use_ssl': False,
     # 'verify_certs': True,
@@ -122,6 +124,11 @@ COOKIE_NAME = 'osf'
 OSF_COOKIE_DOMAIN = None
 # server-side verification timeout
 OSF_SESSION_TIMEOUT = 30 * 24 * 60 * 60  # 30 days in seconds
+# Where sessions are stored, 'db' or 'cache'. See framework/sessions/backends.py.
+# 'cache' requires SESSION_CACHE_NAME to point at a cache shared by all processes, e.g. Redis
+SESSION_BACKEND = 'db'
+# With the 'cache' backend, how stale the database copy of a session may get
+SESSION_WRITE_BEHIND_INTERVAL = 5 * 60
 # TODO: Override SECRET_KEY in local.py in production
 SECRET_KEY = 'CHANGEME'
 SESSION_COOKIE_SECURE = SECURE_MODE
@@ -186,6 +193,20 @@ MAILGUN_API_KEY = None
 # Use Celery for file rendering
 USE_CELERY = True
 
+# Search updates of the same object within this many seconds of the first one are
+# coalesced into a single reindex task. See website/search/debounce.py
+SEARCH_REINDEX_DEBOUNCE = 5
+# Upper bound on how long an object stays marked as having a reindex pending
+SEARCH_REINDEX_PENDING_TIMEOUT = 60 * 5
+
+# Maximum number of postcommit functions run at once across all requests in a process.
+# Each may hold a database connection; capped by DATABASES['default']['OPTIONS']['MAX_CONNS'] if set
+POSTCOMMIT_MAX_CONCURRENCY = 30
+# Seconds a request waits for its postcommit functions before moving on
+POSTCOMMIT_TIMEOUT = 5.0
+# Postcommit tasks taking at least this many seconds are logged
+POSTCOMMIT_SLOW_TASK_THRESHOLD = 1.0
+
 # Trashed File Retention
 PURGE_DELTA = timedelta(days=30)
 
@@ -308,6 +329,10 @@ GROUP_MEMBER_ADDED_EMAIL_THROTTLE = 24 * 3600
 # Seconds before another notification email can be sent to group members when added to a project
 GROUP_CONNECTED_EMAIL_THROTTLE = 24 * 3600
 
+# Notification digests for more recipients than this are written by a celery task instead of
+# during the request. None writes them during the request.
+NOTIFICATION_DIGEST_ASYNC_THRESHOLD = 100
+
 # Google Analytics
 GOOGLE_ANALYTICS_ID = None
 GOOGLE_SITE_VERIFICATION = None
@@ -374,6 +399,12 @@ ARCHIVE_PROVIDER = 'osfstorage'
 MAX_ARCHIVE_SIZE = 5 * 1024 ** 3  # == math.pow(1024, 3) == 1 GB
 
 ARCHIVE_TIMEOUT_TIMEDELTA = timedelta(1)  # 24 hours
+# Number of folders listed from WaterButler at once when crawling an addon's file tree
+FILE_TREE_CRAWLER_MAX_WORKERS = 4
+# Folder listings requested from WaterButler per second by a crawl, across all of its workers
+FILE_TREE_CRAWLER_REQUESTS_PER_SECOND = 5
+# Number of nodes whose archived file maps are kept in memory by the archiver
+ARCHIVE_FILE_MAP_CACHE_SIZE = 100
 STUCK_FILES_DELETE_TIMEOUT = timedelta(days=45) # Registration files stuck for x days are marked as deleted.
 
 ENABLE_ARCHIVER = True
@@ -454,7 +485,8 @@ class CeleryConfig:
         'website.archiver.tasks',
         'scripts.add_missing_identifiers_to_preprints',
         'osf.management.commands.approve_pending_schema_response',
-        'osf.management.commands.fix_quickfiles_waterbutler_logs'
+        'osf.management.commands.fix_quickfiles_waterbutler_logs',
+        'osf.management.commands.reconcile_storage_usage',
     }
 
     try:
@@ -527,6 +559,7 @@ class CeleryConfig:
         'osf.management.commands.cumulative_plos_metrics',
         'api.providers.tasks',
         'osf.management.commands.daily_reporters_go',
+        'osf.management.commands.reconcile_storage_usage',
     )
 
     # Modules that need metrics and release requirements
@@ -663,6 +696,10 @@ class CeleryConfig:
                 'task': 'management.commands.update_institution_project_counts',
                 'schedule': crontab(minute=0, hour=9), # Daily 05:00 a.m. EDT
             },
+            'reconcile_storage_usage': {
+                'task': 'management.commands.reconcile_storage_usage',
+                'schedule': crontab(minute=30, hour=8),  # Daily 3:30 a.m.
+            },
 #            'archive_registrations_on_IA': {
 #                'task': 'osf.management.commands.archive_registrations_on_IA',
 #                'schedule': crontab(minute=0, hour=5),  # Daily 4:00 a.m.